@@ -1,5 +1,7 @@
 from typing import Optional
+import numpy as np
 from data.insider_fetcher import has_significant_insider_buy
+from analysis.indicators import column
 import settings as _settings
 
 
@@ -69,6 +71,63 @@ def calculate_atr_take_profit(price: float, atr: float, multiplier: float = 3.5)
     return round(price + (atr * multiplier), 2)
 
 
+# ── Skälkoder ───────────────────────────────────────────────────────────
+#
+# Poängfunktionerna returnerar skälkoder (kod, *payload) i stället för färdig text.
+# Texten byggs först när en signal sparas, notifieras eller visas
+# (render_reasons) — pre-score- och rotationsanropen i varje loop betalar
+# aldrig för f-strängarna.
+
+_REASON_TEXT = {
+    "rsi_oversold_uptrend":    "RSI: {0:.1f} (översålt i upptrend)",
+    "rsi_oversold":            "RSI: {0:.1f} (översålt men under MA200 — svagare signal)",
+    "macd_cross_up":           "MACD crossover uppåt (histogram positivt)",
+    "macd_cross_up_weak":      "MACD crossover uppåt (histogram ej bekräftat)",
+    "macd_momentum":           "MACD momentum: histogram stigande ({0:.4f})",
+    "ma50_bounce":             "Pris studsar på MA50 ovanifrån ({0:.2f})",
+    "ma50_breakdown":          "Pris precis under MA50 ({0:.2f}) — nedbrott -10p",
+    "ma200_bounce":            "Pris studsar på MA200 ovanifrån ({0:.2f})",
+    "ma200_breakdown":         "Pris precis under MA200 ({0:.2f}) — varning -15p",
+    "volume_up_strong":        "Volym: +{0:.0f}% vs snitt (stark uppgång)",
+    "volume_up":               "Volym: +{0:.0f}% vs snitt (uppgång)",
+    "volume_unclear":          "Volym: +{0:.0f}% vs snitt (riktning oklar)",
+    "sentiment_positive":      "Gemini: Positivt sentiment ({0})",
+    "insider_buy":             "Insiderköp >500 000 kr (FI)",
+    "bollinger_touch":         "Bollinger: Touch undre band ({0:.2f}, bekräftat av RSI)",
+    "pullback_uptrend":        "Pullback i upptrend: RSI {0:.0f}, pris > MA50 > MA200",
+    "golden_cross":            "Trendstyrka: MA50 > MA200 (Golden Cross)",
+    "report_soon":             "⚠️ Rapport inom 48h (penalty -25p)",
+    "rs_strong":               "RS vs OMXS30: +{0:.0f}% (stark outperformance)",
+    "rs_outperform":           "RS vs OMXS30: +{0:.0f}% (outperformance)",
+    "rs_underperform_buy":     "RS vs OMXS30: {0:.0f}% (underperformance, -10p)",
+    "rsi_overbought":          "RSI: {0:.1f} (överköpt)",
+    "macd_cross_down":         "MACD crossover nedåt",
+    "loss_2_atr":              "Förlust {0:.1f}% > 2× ATR ({1:.1f}%) — allvarlig",
+    "loss_1_5_atr":            "Förlust {0:.1f}% > 1.5× ATR ({1:.1f}%)",
+    "gain_4_atr":              "Vinst {0:.1f}% > 4× ATR — överväg att ta hem",
+    "sentiment_negative":      "Gemini: Negativt sentiment ({0})",
+    "below_ma50":              "Pris under MA50 ({0:.2f})",
+    "rs_underperform_sell":    "RS vs OMXS30: {0:.0f}% (underperformance)",
+    "momentum_fading":         "Momentum avtar: MACD histogram sjunkande ({0:.4f})",
+}
+
+
+# Ett skäl är en vanlig tuple (kod, *payload) — billigare att skapa än en f-sträng
+Reason = tuple
+
+
+def reason_text(reason) -> str:
+    """Swedish text for one reason code (a plain string is returned as is)."""
+    if isinstance(reason, str):
+        return reason
+    return _REASON_TEXT[reason[0]].format(*reason[1:])
+
+
+def render_reasons(reasons: list) -> list[str]:
+    """Swedish text for a list of reason codes — call where reasons are saved, sent or shown."""
+    return [reason_text(r) for r in reasons]
+
+
 def score_buy_signal(
     ticker: str,
     indicators: dict,
@@ -77,10 +136,11 @@ def score_buy_signal(
     has_open_report_soon: bool = False,
     relative_strength: Optional[float] = None,
     market_regime: str = "NEUTRAL",
-) -> tuple[int, list[str]]:
+) -> tuple[int, list[Reason]]:
     """
     Calculate buy signal score.
     Returns (score, reasons). Signal fires if score >= threshold (default 60).
+    Reasons are codes (code, *payload) — render_reasons() turns them into text.
     """
     score = 0
     reasons = []
@@ -108,20 +168,20 @@ def score_buy_signal(
         in_uptrend = ma200 and current_price and current_price > ma200
         if in_uptrend:
             score += 25
-            reasons.append(f"RSI: {rsi:.1f} (översålt i upptrend)")
+            reasons.append(("rsi_oversold_uptrend", rsi))
         else:
             score += 10
-            reasons.append(f"RSI: {rsi:.1f} (översålt men under MA200 — svagare signal)")
+            reasons.append(("rsi_oversold", rsi))
 
     # MACD bullish crossover + positivt histogram → +20p
     if None not in (macd, macd_signal, macd_prev, macd_signal_prev):
         if macd_prev < macd_signal_prev and macd > macd_signal:
             if macd_histogram is not None and macd_histogram > 0:
                 score += 20
-                reasons.append("MACD crossover uppåt (histogram positivt)")
+                reasons.append(("macd_cross_up",))
             else:
                 score += 10
-                reasons.append("MACD crossover uppåt (histogram ej bekräftat)")
+                reasons.append(("macd_cross_up_weak",))
 
     # MACD momentum: histogram positivt OCH stigande → +10p
     # Fångar pågående bullish momentum EFTER crossover (varar 5–10 dagar),
@@ -129,7 +189,7 @@ def score_buy_signal(
     if (macd_histogram is not None and macd_histogram_prev is not None
             and macd_histogram > 0 and macd_histogram > macd_histogram_prev):
         score += 10
-        reasons.append(f"MACD momentum: histogram stigande ({macd_histogram:.4f})")
+        reasons.append(("macd_momentum", macd_histogram))
 
     # MA50-studs: pris precis OVANFÖR MA50 (0–2%) → +20p
     # Pris precis UNDER MA50 (-2%–0) → -10p (nedbrott, ej studs)
@@ -137,10 +197,10 @@ def score_buy_signal(
         pct_from_ma50 = (current_price - ma50) / ma50
         if 0 <= pct_from_ma50 < 0.02:
             score += 20
-            reasons.append(f"Pris studsar på MA50 ovanifrån ({ma50:.2f})")
+            reasons.append(("ma50_bounce", ma50))
         elif -0.02 <= pct_from_ma50 < 0:
             score -= 10
-            reasons.append(f"Pris precis under MA50 ({ma50:.2f}) — nedbrott -10p")
+            reasons.append(("ma50_breakdown", ma50))
 
     # MA200-studs: pris precis OVANFÖR MA200 (0–2%) → +20p
     # Pris precis UNDER MA200 (-2%–0) → -15p
@@ -148,10 +208,10 @@ def score_buy_signal(
         pct_from_ma200 = (current_price - ma200) / ma200
         if 0 <= pct_from_ma200 < 0.02:
             score += 20
-            reasons.append(f"Pris studsar på MA200 ovanifrån ({ma200:.2f})")
+            reasons.append(("ma200_bounce", ma200))
         elif -0.02 <= pct_from_ma200 < 0:
             score -= 15
-            reasons.append(f"Pris precis under MA200 ({ma200:.2f}) — varning -15p")
+            reasons.append(("ma200_breakdown", ma200))
 
     # Volymbekräftelse — direction-adjusted
     # >150% på uppgångsdag: starkt bekräftelsesignal (+15p)
@@ -160,31 +220,31 @@ def score_buy_signal(
     if daily_return is not None and daily_return > 0:
         if volume_ratio >= 1.5:
             score += 15
-            reasons.append(f"Volym: +{(volume_ratio - 1) * 100:.0f}% vs snitt (stark uppgång)")
+            reasons.append(("volume_up_strong", (volume_ratio - 1) * 100))
         elif volume_ratio >= 1.2:
             score += 8
-            reasons.append(f"Volym: +{(volume_ratio - 1) * 100:.0f}% vs snitt (uppgång)")
+            reasons.append(("volume_up", (volume_ratio - 1) * 100))
     elif daily_return is not None and daily_return < 0:
         pass  # Hög volym på nedgång — säljpress, ej köpsignal
     elif volume_ratio >= 1.5:
         score += 5
-        reasons.append(f"Volym: +{(volume_ratio - 1) * 100:.0f}% vs snitt (riktning oklar)")
+        reasons.append(("volume_unclear", (volume_ratio - 1) * 100))
 
     # Gemini positive sentiment → +15p
     if news_sentiment and news_sentiment.get("sentiment") == "POSITIVE":
         score += 15
-        reasons.append(f"Gemini: Positivt sentiment ({news_sentiment.get('reason', '')})")
+        reasons.append(("sentiment_positive", news_sentiment.get("reason", "")))
 
     # Insider buy >500k SEK → +10p
     if insider_trades and has_significant_insider_buy(insider_trades):
         score += 10
-        reasons.append("Insiderköp >500 000 kr (FI)")
+        reasons.append(("insider_buy",))
 
     # Bollinger lower band touch (within 1%) → +10p, kräver även RSI < 45
     if current_price and bb_lower and current_price <= bb_lower * 1.01:
         if rsi is not None and rsi < 45:
             score += 10
-            reasons.append(f"Bollinger: Touch undre band ({bb_lower:.2f}, bekräftat av RSI)")
+            reasons.append(("bollinger_touch", bb_lower))
 
     # ── BULL-MARKET SIGNALS ────────────────────────────────────────────
 
@@ -199,30 +259,30 @@ def score_buy_signal(
             and current_price and ma50 and ma200
             and current_price > ma50 and ma50 > ma200):
         score += 15
-        reasons.append(f"Pullback i upptrend: RSI {rsi:.0f}, pris > MA50 > MA200")
+        reasons.append(("pullback_uptrend", rsi))
 
     # Trendstyrka: MA50 > MA200 (Golden Cross) → +10p
     # Bekräftar att aktien är i en etablerad upptrend.
     if ma50 and ma200 and ma50 > ma200:
         score += 10
-        reasons.append("Trendstyrka: MA50 > MA200 (Golden Cross)")
+        reasons.append(("golden_cross",))
 
     # Rapport within 48h → -25p hard penalty
     if has_open_report_soon:
         score -= 25
-        reasons.append("⚠️ Rapport inom 48h (penalty -25p)")
+        reasons.append(("report_soon",))
 
     # Relative strength vs OMXS30 (20-day)
     if relative_strength is not None:
         if relative_strength >= 1.15:
             score += 20
-            reasons.append(f"RS vs OMXS30: +{(relative_strength - 1) * 100:.0f}% (stark outperformance)")
+            reasons.append(("rs_strong", (relative_strength - 1) * 100))
         elif relative_strength >= 1.05:
             score += 10
-            reasons.append(f"RS vs OMXS30: +{(relative_strength - 1) * 100:.0f}% (outperformance)")
+            reasons.append(("rs_outperform", (relative_strength - 1) * 100))
         elif relative_strength < 0.90:
             score -= 10
-            reasons.append(f"RS vs OMXS30: {(relative_strength - 1) * 100:.0f}% (underperformance, -10p)")
+            reasons.append(("rs_underperform_buy", (relative_strength - 1) * 100))
 
     return score, reasons
 
@@ -233,10 +293,10 @@ def score_sell_signal(
     position: dict,
     news_sentiment: Optional[dict] = None,
     relative_strength: Optional[float] = None,
-) -> tuple[int, list[str]]:
+) -> tuple[int, list[Reason]]:
     """
     Calculate sell signal score based on technical analysis and sentiment.
-    Returns (score, reasons). Signal fires if score >= sell_threshold.
+    Returns (score, reason codes). Signal fires if score >= sell_threshold.
     No automatic stop-loss — the agent only recommends, the user decides.
     """
     score = 0
@@ -257,13 +317,13 @@ def score_sell_signal(
     # RSI > 70 → +25p
     if rsi is not None and rsi > 70:
         score += 25
-        reasons.append(f"RSI: {rsi:.1f} (överköpt)")
+        reasons.append(("rsi_overbought", rsi))
 
     # MACD bearish crossover → +20p
     if None not in (macd, macd_signal, macd_prev, macd_signal_prev):
         if macd_prev > macd_signal_prev and macd < macd_signal:
             score += 20
-            reasons.append("MACD crossover nedåt")
+            reasons.append(("macd_cross_down",))
 
     # ATR-relativ P&L-bedömning — anpassar sig till aktiens volatilitet
     atr = indicators.get("atr", 0)
@@ -275,29 +335,29 @@ def score_sell_signal(
         # Förlust > 2× ATR → stark säljsignal (anpassad till volatilitet)
         if pnl_pct < -(atr_pct * 2.0):
             score += 25
-            reasons.append(f"Förlust {pnl_pct:.1f}% > 2× ATR ({atr_pct:.1f}%) — allvarlig")
+            reasons.append(("loss_2_atr", pnl_pct, atr_pct))
         elif pnl_pct < -(atr_pct * 1.5):
             score += 15
-            reasons.append(f"Förlust {pnl_pct:.1f}% > 1.5× ATR ({atr_pct:.1f}%)")
+            reasons.append(("loss_1_5_atr", pnl_pct, atr_pct))
         # Vinst > 4× ATR → överväg realisering
         elif pnl_pct > atr_pct * 4.0:
             score += 15
-            reasons.append(f"Vinst {pnl_pct:.1f}% > 4× ATR — överväg att ta hem")
+            reasons.append(("gain_4_atr", pnl_pct))
 
     # Gemini negative sentiment → +15p
     if news_sentiment and news_sentiment.get("sentiment") == "NEGATIVE":
         score += 15
-        reasons.append(f"Gemini: Negativt sentiment ({news_sentiment.get('reason', '')})")
+        reasons.append(("sentiment_negative", news_sentiment.get("reason", "")))
 
     # Close below MA50 → +20p
     if current_price and ma50 and current_price < ma50:
         score += 20
-        reasons.append(f"Pris under MA50 ({ma50:.2f})")
+        reasons.append(("below_ma50", ma50))
 
     # Relative strength vs OMXS30 — persistent underperformance → sell
     if relative_strength is not None and relative_strength < 0.90:
         score += 15
-        reasons.append(f"RS vs OMXS30: {(relative_strength - 1) * 100:.0f}% (underperformance)")
+        reasons.append(("rs_underperform_sell", (relative_strength - 1) * 100))
 
     # Momentum avtar: MACD histogram positivt men sjunkande → +10p
     # Fångar "momentum dying" INNAN teknisk breakdown (under MA50, MACD cross).
@@ -306,7 +366,7 @@ def score_sell_signal(
     if (macd_histogram is not None and macd_histogram_prev is not None
             and macd_histogram > 0 and macd_histogram < macd_histogram_prev):
         score += 10
-        reasons.append(f"Momentum avtar: MACD histogram sjunkande ({macd_histogram:.4f})")
+        reasons.append(("momentum_fading", macd_histogram))
 
     return score, reasons
 
@@ -456,3 +516,184 @@ def calculate_opportunity_score(
         score += 2
 
     return round(score, 1)
+
+
+# ── Batch-scoring (NumPy) ───────────────────────────────────────────────
+#
+# Samma regler som score_buy_signal / score_sell_signal / calculate_opportunity_score,
+# men över en kolumnmatris (analysis.indicators.stack eller indicator_history):
+# en rad per ticker eller per datum. Ger bara poäng — skälen tas fram med de
+# skalära funktionerna för de rader som faktiskt ger signal.
+
+def _col(X: np.ndarray, name: str) -> np.ndarray:
+    return X[:, column(name)]
+
+
+def _truthy(x: np.ndarray) -> np.ndarray:
+    """Python truthiness for a float column where NaN stands for None."""
+    return ~np.isnan(x) & (x != 0)
+
+
+def _flags(values, n: int) -> np.ndarray:
+    if values is None:
+        return np.zeros(n, dtype=bool)
+    return np.broadcast_to(np.asarray(values, dtype=bool), (n,))
+
+
+def _floats(values, n: int) -> np.ndarray:
+    if values is None:
+        return np.full(n, np.nan)
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (n,))
+
+
+def score_buy_batch(
+    X: np.ndarray,
+    news_positive=None,
+    insider_buy=None,
+    report_soon=None,
+    relative_strength=None,
+) -> np.ndarray:
+    """Buy scores for every row of an indicator matrix (int64 array).
+
+    news_positive / insider_buy / report_soon are bool arrays (or scalars),
+    relative_strength a float array with NaN for "unknown". Equals
+    score_buy_signal row by row.
+    """
+    n = len(X)
+    rsi = _col(X, "rsi")
+    price = _col(X, "current_price")
+    ma50 = _col(X, "ma50")
+    ma200 = _col(X, "ma200")
+    bb_lower = _col(X, "bollinger_lower")
+    macd = _col(X, "macd")
+    macd_sig = _col(X, "macd_signal")
+    macd_prev = _col(X, "macd_prev")
+    macd_sig_prev = _col(X, "macd_signal_prev")
+    hist = _col(X, "macd_histogram")
+    hist_prev = _col(X, "macd_histogram_prev")
+    daily_return = _col(X, "daily_return")
+    volume_ratio = np.where(np.isnan(_col(X, "volume_ratio")), 1.0, _col(X, "volume_ratio"))
+    rs = _floats(relative_strength, n)
+
+    has_price, has_ma50, has_ma200 = _truthy(price), _truthy(ma50), _truthy(ma200)
+    score = np.zeros(n, dtype=np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # RSI < 35
+        oversold = rsi < 35
+        uptrend = has_ma200 & has_price & (price > ma200)
+        score += np.where(oversold & uptrend, 25, np.where(oversold, 10, 0))
+
+        # MACD crossover uppåt
+        macd_known = ~(np.isnan(macd) | np.isnan(macd_sig) | np.isnan(macd_prev) | np.isnan(macd_sig_prev))
+        cross_up = macd_known & (macd_prev < macd_sig_prev) & (macd > macd_sig)
+        score += np.where(cross_up & (hist > 0), 20, np.where(cross_up, 10, 0))
+
+        # MACD momentum
+        score += np.where((hist > 0) & (hist > hist_prev), 10, 0)
+
+        # MA50 / MA200 studs eller nedbrott
+        pct50 = (price - ma50) / ma50
+        near50 = has_price & has_ma50
+        score += np.where(near50 & (pct50 >= 0) & (pct50 < 0.02), 20, 0)
+        score -= np.where(near50 & (pct50 >= -0.02) & (pct50 < 0), 10, 0)
+        pct200 = (price - ma200) / ma200
+        near200 = has_price & has_ma200
+        score += np.where(near200 & (pct200 >= 0) & (pct200 < 0.02), 20, 0)
+        score -= np.where(near200 & (pct200 >= -0.02) & (pct200 < 0), 15, 0)
+
+        # Volym, riktningsjusterad (daily_return == 0 eller okänd → "riktning oklar")
+        up_day = daily_return > 0
+        unclear = ~(up_day | (daily_return < 0))
+        score += np.where(up_day & (volume_ratio >= 1.5), 15,
+                          np.where(up_day & (volume_ratio >= 1.2), 8, 0))
+        score += np.where(unclear & (volume_ratio >= 1.5), 5, 0)
+
+        score += np.where(_flags(news_positive, n), 15, 0)
+        score += np.where(_flags(insider_buy, n), 10, 0)
+
+        # Bollinger-touch bekräftad av RSI < 45
+        score += np.where(has_price & _truthy(bb_lower) & (price <= bb_lower * 1.01) & (rsi < 45), 10, 0)
+
+        # Pullback i upptrend och Golden Cross
+        trend = has_price & has_ma50 & has_ma200 & (price > ma50) & (ma50 > ma200)
+        score += np.where(trend & (rsi >= 35) & (rsi <= 55), 15, 0)
+        score += np.where(has_ma50 & has_ma200 & (ma50 > ma200), 10, 0)
+
+        score -= np.where(_flags(report_soon, n), 25, 0)
+
+        score += np.where(rs >= 1.15, 20, np.where(rs >= 1.05, 10, np.where(rs < 0.90, -10, 0)))
+    return score
+
+
+def score_sell_batch(
+    X: np.ndarray,
+    buy_price,
+    news_negative=None,
+    relative_strength=None,
+) -> np.ndarray:
+    """Sell scores for every row (int64 array). buy_price is the entry price per row.
+
+    Equals score_sell_signal row by row.
+    """
+    n = len(X)
+    rsi = _col(X, "rsi")
+    price = _col(X, "current_price")
+    ma50 = _col(X, "ma50")
+    macd = _col(X, "macd")
+    macd_sig = _col(X, "macd_signal")
+    macd_prev = _col(X, "macd_prev")
+    macd_sig_prev = _col(X, "macd_signal_prev")
+    hist = _col(X, "macd_histogram")
+    hist_prev = _col(X, "macd_histogram_prev")
+    atr = _col(X, "atr")
+    entry = np.nan_to_num(_floats(buy_price, n), nan=0.0)
+    rs = _floats(relative_strength, n)
+
+    has_price = _truthy(price)
+    score = np.zeros(n, dtype=np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score += np.where(rsi > 70, 25, 0)
+
+        macd_known = ~(np.isnan(macd) | np.isnan(macd_sig) | np.isnan(macd_prev) | np.isnan(macd_sig_prev))
+        score += np.where(macd_known & (macd_prev > macd_sig_prev) & (macd < macd_sig), 20, 0)
+
+        # ATR-relativ P&L
+        held = has_price & (entry > 0)
+        pnl_pct = (price - entry) / entry * 100
+        atr_pct = np.where(_truthy(atr) & (entry > 0), atr / entry * 100, 3.0)
+        score += np.where(held & (pnl_pct < -(atr_pct * 2.0)), 25,
+                          np.where(held & (pnl_pct < -(atr_pct * 1.5)), 15,
+                                   np.where(held & (pnl_pct > atr_pct * 4.0), 15, 0)))
+
+        score += np.where(_flags(news_negative, n), 15, 0)
+        score += np.where(has_price & _truthy(ma50) & (price < ma50), 20, 0)
+        score += np.where(rs < 0.90, 15, 0)
+        score += np.where((hist > 0) & (hist < hist_prev), 10, 0)
+    return score
+
+
+def opportunity_score_batch(
+    buy_score,
+    relative_strength=None,
+    atr_pct=None,
+    volume_ratio=None,
+    market_regime: str = "NEUTRAL",
+) -> np.ndarray:
+    """calculate_opportunity_score over arrays (float64, rounded to 1 decimal)."""
+    score = np.asarray(buy_score, dtype=np.float64).copy()
+    n = len(score)
+    rs = _floats(relative_strength, n)
+    atr_pct = np.nan_to_num(_floats(atr_pct, n), nan=0.0)
+    volume_ratio = np.nan_to_num(_floats(volume_ratio, n), nan=1.0)
+
+    with np.errstate(invalid="ignore"):
+        score += np.where(rs >= 1.15, 8, np.where(rs >= 1.05, 4, np.where(rs < 0.95, -6, 0)))
+    score += np.where(volume_ratio >= 1.5, 3, np.where(volume_ratio < 0.8, -2, 0))
+    score -= np.where(atr_pct > 0.06, 8, np.where(atr_pct > 0.04, 4, 0))
+    if market_regime == "BEAR":
+        score -= 5
+    elif market_regime == "BULL":
+        score += 2
+    return np.round(score, 1)
@@ -1,10 +1,120 @@
 import logging
+from collections.abc import Mapping
 from typing import Optional
+import numpy as np
 import pandas as pd
-import pandas_ta as pta
 
 logger = logging.getLogger(__name__)
 
+# Fast layout för indikatorvärden — samma ordning i snapshot, array och stack()
+SNAPSHOT_FIELDS = (
+    "rsi", "macd", "macd_signal", "macd_histogram", "macd_histogram_prev",
+    "macd_prev", "macd_signal_prev", "ma20", "ma50", "ma200", "ema20",
+    "bollinger_upper", "bollinger_lower", "bollinger_mid", "atr",
+    "volume_ratio", "daily_return", "current_price",
+)
+# Sätts i efterhand av process_ticker — syns som nycklar först när de har ett värde
+_EXTRA_FIELDS = ("relative_strength", "buy_score", "signal_description")
+_FIELD_INDEX = {f: i for i, f in enumerate(SNAPSHOT_FIELDS)}
+_BASE = frozenset(SNAPSHOT_FIELDS)
+
+
+class IndicatorSnapshot(Mapping):
+    """Indicator values for one ticker and bar, in fixed slots.
+
+    Reads like the dict calculate_indicators used to return (.get, [],
+    `**`, .items(), .copy(), .pop() for the extra keys), so scoring, DB and
+    API code take either. Uses a fraction of the memory of an 18-key dict
+    and converts to a float row (as_array) for contiguous batch storage.
+    """
+
+    __slots__ = SNAPSHOT_FIELDS + _EXTRA_FIELDS
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.pop(name, None))
+        if values:
+            raise TypeError(f"Okända indikatorfält: {sorted(values)}")
+
+    def __getitem__(self, key):
+        if key in _BASE:
+            return getattr(self, key)
+        if key in _EXTRA_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in _BASE and key not in _EXTRA_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        if key in _BASE:
+            return getattr(self, key)
+        if key in _EXTRA_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __iter__(self):
+        yield from SNAPSHOT_FIELDS
+        for name in _EXTRA_FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+
+    def __len__(self):
+        return len(SNAPSHOT_FIELDS) + sum(getattr(self, n) is not None for n in _EXTRA_FIELDS)
+
+    def __repr__(self):
+        return f"IndicatorSnapshot({self.to_dict()!r})"
+
+    def pop(self, key, *default):
+        """Remove an extra key (relative_strength, buy_score, signal_description)."""
+        if key in _EXTRA_FIELDS and getattr(self, key) is not None:
+            value = getattr(self, key)
+            setattr(self, key, None)
+            return value
+        if key in _BASE:
+            raise KeyError(f"{key} är ett fast indikatorfält")
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def copy(self) -> "IndicatorSnapshot":
+        return IndicatorSnapshot(**{n: getattr(self, n) for n in self.__slots__})
+
+    def to_dict(self) -> dict:
+        return {k: self[k] for k in self}
+
+    def as_array(self) -> np.ndarray:
+        """The SNAPSHOT_FIELDS values as float64 (None -> NaN)."""
+        return np.array(
+            [np.nan if (v := getattr(self, f)) is None else v for f in SNAPSHOT_FIELDS],
+            dtype=np.float64,
+        )
+
+
+def stack(snapshots: list) -> np.ndarray:
+    """Contiguous (n, len(SNAPSHOT_FIELDS)) float64 matrix, one row per snapshot.
+
+    Accepts snapshots or plain indicator dicts; missing values become NaN.
+    Column i is SNAPSHOT_FIELDS[i] (see column()).
+    """
+    out = np.full((len(snapshots), len(SNAPSHOT_FIELDS)), np.nan, dtype=np.float64)
+    for row, snap in enumerate(snapshots):
+        for col, name in enumerate(SNAPSHOT_FIELDS):
+            value = snap.get(name)
+            if value is not None:
+                out[row, col] = value
+    return out
+
+
+def column(name: str) -> int:
+    """Column index of an indicator in stack() / as_array() output."""
+    return _FIELD_INDEX[name]
+
 
 def calculate_market_regime(index_df: pd.DataFrame) -> str:
     """
@@ -61,10 +171,14 @@ def calculate_relative_strength(
     return round(float(rs), 4)
 
 
-def calculate_indicators(df: pd.DataFrame) -> dict:
-    """Calculate all technical indicators from an OHLCV DataFrame."""
+def calculate_indicators(df: pd.DataFrame) -> IndicatorSnapshot | dict:
+    """Calculate all technical indicators from an OHLCV DataFrame.
+
+    Returns an IndicatorSnapshot, or an empty dict if there is too little data.
+    """
     if df.empty or len(df) < 20:
         return {}
+    import pandas_ta as pta  # ~0.4 s import (numba) — laddas först när den behövs
 
     close = df["close"]
     high = df["high"]
@@ -128,23 +242,86 @@ def calculate_indicators(df: pd.DataFrame) -> dict:
     bb_lower = [c for c in bb_df.columns if "BBL" in c][0] if bb_df is not None else None
     bb_mid   = [c for c in bb_df.columns if "BBM" in c][0] if bb_df is not None else None
 
-    return {
-        "rsi":              last(rsi_s),
-        "macd":             last(macd_df[macd_col]) if macd_col else None,
-        "macd_signal":      last(macd_df[sig_col])  if sig_col  else None,
-        "macd_histogram":   last(macd_df[hist_col]) if hist_col else None,
-        "macd_histogram_prev": prev(macd_df[hist_col]) if hist_col else None,
-        "macd_prev":        prev(macd_df[macd_col]) if macd_col else None,
-        "macd_signal_prev": prev(macd_df[sig_col])  if sig_col  else None,
-        "ma20":             last(ma20_s),
-        "ma50":             last(ma50_s),
-        "ma200":            last(ma200_s),
-        "ema20":            last(ema20_s),
-        "bollinger_upper":  last(bb_df[bb_upper]) if bb_upper else None,
-        "bollinger_lower":  last(bb_df[bb_lower]) if bb_lower else None,
-        "bollinger_mid":    last(bb_df[bb_mid])   if bb_mid   else None,
-        "atr":              last(atr_s),
-        "volume_ratio":     round(volume_ratio, 2),
-        "daily_return":     daily_return,
-        "current_price":    round(float(close.iloc[-1]), 2),
+    return IndicatorSnapshot(
+        rsi=last(rsi_s),
+        macd=last(macd_df[macd_col]) if macd_col else None,
+        macd_signal=last(macd_df[sig_col]) if sig_col else None,
+        macd_histogram=last(macd_df[hist_col]) if hist_col else None,
+        macd_histogram_prev=prev(macd_df[hist_col]) if hist_col else None,
+        macd_prev=prev(macd_df[macd_col]) if macd_col else None,
+        macd_signal_prev=prev(macd_df[sig_col]) if sig_col else None,
+        ma20=last(ma20_s),
+        ma50=last(ma50_s),
+        ma200=last(ma200_s),
+        ema20=last(ema20_s),
+        bollinger_upper=last(bb_df[bb_upper]) if bb_upper else None,
+        bollinger_lower=last(bb_df[bb_lower]) if bb_lower else None,
+        bollinger_mid=last(bb_df[bb_mid]) if bb_mid else None,
+        atr=last(atr_s),
+        volume_ratio=round(volume_ratio, 2),
+        daily_return=daily_return,
+        current_price=round(float(close.iloc[-1]), 2),
+    )
+
+
+def indicator_history(df: pd.DataFrame) -> np.ndarray:
+    """Indicator matrix with one row per bar of `df` (same columns as stack()).
+
+    Row i equals calculate_indicators(df.iloc[:i + 1]) — all indicators are
+    causal — so historical replays can be scored with the batch scorers in
+    one pass. Rows before the first 20 bars are NaN.
+    """
+    n = len(df)
+    out = np.full((n, len(SNAPSHOT_FIELDS)), np.nan, dtype=np.float64)
+    if n < 20:
+        return out
+    import pandas_ta as pta
+
+    close = df["close"]
+    volume = df["volume"]
+    macd_df = pta.macd(close, fast=12, slow=26, signal=9)
+    bb_df = pta.bbands(close, length=20, std=2)
+
+    def pick(frame, prefix):
+        if frame is None:
+            return None
+        return frame[[c for c in frame.columns if c.startswith(prefix)][0]]
+
+    macd_s, sig_s, hist_s = pick(macd_df, "MACD_"), pick(macd_df, "MACDs_"), pick(macd_df, "MACDh_")
+    series = {
+        "rsi": pta.rsi(close, length=14),
+        "macd": macd_s,
+        "macd_signal": sig_s,
+        "macd_histogram": hist_s,
+        "macd_histogram_prev": hist_s.shift(1) if hist_s is not None else None,
+        "macd_prev": macd_s.shift(1) if macd_s is not None else None,
+        "macd_signal_prev": sig_s.shift(1) if sig_s is not None else None,
+        "ma20": pta.sma(close, length=20),
+        "ma50": pta.sma(close, length=50) if n >= 50 else None,
+        "ma200": pta.sma(close, length=200) if n >= 200 else None,
+        "ema20": pta.ema(close, length=20),
+        "bollinger_upper": pick(bb_df, "BBU"),
+        "bollinger_lower": pick(bb_df, "BBL"),
+        "bollinger_mid": pick(bb_df, "BBM"),
+        "atr": pta.atr(df["high"], df["low"], close, length=14),
     }
+    for name, s in series.items():
+        if s is not None:
+            out[:, _FIELD_INDEX[name]] = np.round(s.to_numpy(dtype=np.float64), 4)
+
+    vol_avg = volume.rolling(20).mean().to_numpy(dtype=np.float64)
+    vol = volume.to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where((vol_avg > 0) & ~np.isnan(vol), vol / vol_avg, 1.0)
+    out[:, _FIELD_INDEX["volume_ratio"]] = np.round(ratio, 2)
+
+    c = close.to_numpy(dtype=np.float64)
+    prev = np.concatenate(([np.nan], c[:-1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[:, _FIELD_INDEX["daily_return"]] = np.where(prev > 0, np.round((c - prev) / prev, 4), np.nan)
+    out[:, _FIELD_INDEX["current_price"]] = np.round(c, 2)
+    out[:19] = np.nan
+    # pandas_ta.macd ger inget alls för kortare serier än slow + signal - 1 staplar
+    macd_cols = [_FIELD_INDEX[f] for f in SNAPSHOT_FIELDS if f.startswith("macd")]
+    out[:26 + 9 - 2, macd_cols] = np.nan
+    return out
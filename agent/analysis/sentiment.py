@@ -4,15 +4,29 @@ import logging
 import re
 import time
 from datetime import date, datetime, timezone
-from google import genai
-from google.genai import types
-from config import GEMINI_API_KEY, GEMINI_MODEL
+from config import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_BASE_URL
+import metrics
+import tracing
 
 logger = logging.getLogger(__name__)
 
-_client = genai.Client(api_key=GEMINI_API_KEY)
+_client = None
 
-# Cache: headline -> (result, expires_at) — 6 timmars TTL
+
+def get_client():
+    """Gemini client, built on first use — google-genai takes ~0.5 s to import."""
+    global _client
+    if _client is None:
+        from google import genai
+        from google.genai import types
+        _client = genai.Client(
+            api_key=GEMINI_API_KEY,
+            http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+        )
+    return _client
+
+
+# Cache: rubrikens innehållshash -> (result, expires_at) — 6 timmars TTL
 _sentiment_cache: dict[str, tuple] = {}
 _SENTIMENT_TTL = 6 * 3600  # 6 timmar
 
@@ -126,6 +140,33 @@ def record_cache_hit(call_type: str = "sentiment"):
     _persist_stats()
 
 
+def restore_cache(rows: list[dict]) -> int:
+    """Seed the sentiment cache from headlines already analysed (stock_news rows).
+
+    Used by the startup warm-up so a restart does not re-ask Gemini about
+    headlines it answered less than _SENTIMENT_TTL ago. Returns entries added.
+    """
+    from data.news_fetcher import content_hash
+    now, now_wall = time.monotonic(), time.time()
+    added = 0
+    for row in rows:
+        if not row.get("sentiment") or row.get("gemini_reason") == "Analys misslyckades":
+            continue  # fallback-svar cachas inte heller vid körning
+        try:
+            age = now_wall - datetime.fromisoformat(row["created_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            continue
+        key = content_hash(row["headline"])
+        if age >= _SENTIMENT_TTL or key in _sentiment_cache:
+            continue
+        _sentiment_cache[key] = (
+            {"sentiment": row["sentiment"], "score": float(row.get("sentiment_score") or 0.0), "reason": row.get("gemini_reason") or ""},
+            now + _SENTIMENT_TTL - age,
+        )
+        added += 1
+    return added
+
+
 def _is_rate_limit(exc: Exception) -> bool:
     msg = str(exc).lower()
     return "429" in msg or "quota" in msg or "rate" in msg or "resource_exhausted" in msg
@@ -139,7 +180,17 @@ async def _call_gemini(prompt: str, temperature: float = 0.1, context: str = "")
         temperature: Modellens temperatur.
         context: Beskrivning av anropet för loggning (t.ex. 'sentiment:EVO', 'description:SINCH:BUY').
     """
+    # Köns djup: anrop som väntar på svar eller på retry efter 429
+    metrics.gemini_inflight.inc()
+    try:
+        return await _call_gemini_with_retry(prompt, temperature, context)
+    finally:
+        metrics.gemini_inflight.dec()
+
+
+async def _call_gemini_with_retry(prompt: str, temperature: float, context: str) -> str | None:
     global _gemini_call_count
+    from google.genai import types
     _reset_stats_if_new_period()
     _gemini_call_count += 1
     call_id = _gemini_call_count
@@ -155,12 +206,13 @@ async def _call_gemini(prompt: str, temperature: float = 0.1, context: str = "")
     for attempt in range(2):
         try:
             # Kör synkrona Gemini-anropet i en thread för att inte blockera event loop
-            response = await asyncio.to_thread(
-                _client.models.generate_content,
-                model=GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(temperature=temperature),
-            )
+            with tracing.span("http.gemini", context=context, attempt=attempt + 1):
+                response = await asyncio.to_thread(
+                    get_client().models.generate_content,
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(temperature=temperature),
+                )
             elapsed = time.monotonic() - t0
             response_text = response.text.strip()
 
@@ -203,8 +255,16 @@ async def _call_gemini(prompt: str, temperature: float = 0.1, context: str = "")
 
 
 async def analyze_sentiment(ticker: str, headline: str) -> dict:
-    """Send a news headline to Gemini for short-term sentiment analysis."""
-    entry = _sentiment_cache.get(headline)
+    """Send a news headline to Gemini for short-term sentiment analysis.
+
+    Cached per content hash, so the same story under several tickers
+    (banks, A/B share classes) is only analysed once.
+    """
+    from data.news_fetcher import content_hash
+    cache_key = content_hash(headline)
+    entry = _sentiment_cache.get(cache_key)
+    tracing.annotate(cache_hit=bool(entry and time.monotonic() < entry[1]))
+    metrics.cache_lookup("sentiment", bool(entry and time.monotonic() < entry[1]))
     if entry and time.monotonic() < entry[1]:
         record_cache_hit("sentiment")
         logger.info(f"[Gemini CACHE HIT] sentiment:{ticker} | headline='{headline[:60]}...'")
@@ -231,7 +291,7 @@ async def analyze_sentiment(ticker: str, headline: str) -> dict:
                     "score": float(result.get("score", 0.0)),
                     "reason": result.get("reason", ""),
                 }
-                _sentiment_cache[headline] = (sentiment, time.monotonic() + _SENTIMENT_TTL)
+                _sentiment_cache[cache_key] = (sentiment, time.monotonic() + _SENTIMENT_TTL)
                 logger.info(
                     f"[Gemini RESULTAT] sentiment:{ticker} | {sentiment['sentiment']} "
                     f"(score={sentiment['score']:.2f}) | {sentiment['reason'][:80]}"
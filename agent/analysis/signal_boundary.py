@@ -0,0 +1,175 @@
+"""
+Signal-boundary index — "could this ticker signal at this price?" in O(log n).
+
+With RSI, MACD, volume, RS and the moving averages fixed for the current
+bar, score_buy_signal and score_sell_signal are piecewise constant in
+price: they only change at a handful of levels (MA50/MA200 bounce zone
+edges, the Bollinger touch level, the ATR P&L levels of a held position).
+We evaluate the real scoring functions once per segment when the bar
+changes and keep the resulting step function per ticker. A lookup is then
+a bisect over ~12 breakpoints instead of a full scoring pass.
+
+The score still lacks news sentiment, insider buys and the report
+penalty, so callers add the best-case bonus (OPTIMISTIC_BUY_BONUS /
+OPTIMISTIC_SELL_BONUS) before comparing with the threshold. A ticker that
+cannot reach the threshold even then can skip news, FI, earnings and
+Gemini work.
+"""
+from bisect import bisect_left
+from typing import Optional
+
+from analysis.decision_engine import (
+    score_buy_signal,
+    score_sell_signal,
+    calculate_atr_stop_loss,
+    calculate_atr_take_profit,
+)
+
+# Bästa möjliga tillskott från det som inte är känt utan nätverksanrop
+OPTIMISTIC_BUY_BONUS = 15 + 10   # positivt sentiment + insiderköp
+OPTIMISTIC_SELL_BONUS = 15       # negativt sentiment
+
+
+def price_levels(indicators: dict, position: Optional[dict] = None) -> dict[str, float]:
+    """Price levels where the buy/sell score of a ticker can change.
+
+    Mirrors the price-dependent rules in score_buy_signal / score_sell_signal,
+    plus ATR stop/take-profit for held positions.
+    """
+    levels = {}
+    ma50 = indicators.get("ma50")
+    ma200 = indicators.get("ma200")
+    bb_lower = indicators.get("bollinger_lower")
+    atr = indicators.get("atr") or 0
+
+    if ma50:
+        levels["ma50_low"] = ma50 * 0.98
+        levels["ma50"] = ma50
+        levels["ma50_high"] = ma50 * 1.02
+    if ma200:
+        levels["ma200_low"] = ma200 * 0.98
+        levels["ma200"] = ma200
+        levels["ma200_high"] = ma200 * 1.02
+    if bb_lower:
+        levels["bollinger_touch"] = bb_lower * 1.01
+
+    if position and position.get("price"):
+        entry = position["price"]
+        if atr > 0:
+            levels["atr_stop"] = calculate_atr_stop_loss(entry, atr)
+            levels["atr_take_profit"] = calculate_atr_take_profit(entry, atr)
+            levels["loss_1_5_atr"] = entry - atr * 1.5
+            levels["loss_2_atr"] = entry - atr * 2.0
+            levels["gain_4_atr"] = entry + atr * 4.0
+        else:
+            # score_sell_signal faller tillbaka på 3% ATR när ATR saknas
+            levels["loss_1_5_atr"] = entry * (1 - 0.045)
+            levels["loss_2_atr"] = entry * (1 - 0.06)
+            levels["gain_4_atr"] = entry * (1 + 0.12)
+    return levels
+
+
+class ScoreBoundary:
+    """Step function price -> score, built from a scoring callback."""
+
+    __slots__ = ("breakpoints", "point_scores", "segment_scores")
+
+    def __init__(self, score_at_price, levels):
+        bps = sorted({round(float(l), 6) for l in levels if l and l > 0})
+        self.breakpoints = bps
+        self.point_scores = [score_at_price(b) for b in bps]
+        if bps:
+            reps = [bps[0] * 0.5]
+            reps += [(a + b) / 2 for a, b in zip(bps, bps[1:])]
+            reps.append(bps[-1] * 1.5)
+        else:
+            reps = [1.0]
+        self.segment_scores = [score_at_price(r) for r in reps]
+
+    def score_at(self, price: float) -> int:
+        i = bisect_left(self.breakpoints, price)
+        if i < len(self.breakpoints) and self.breakpoints[i] == price:
+            return self.point_scores[i]
+        return self.segment_scores[i]
+
+    def max_score(self) -> int:
+        return max(self.segment_scores + self.point_scores)
+
+    def intervals(self, threshold: float) -> list[tuple[float, float]]:
+        """Price intervals (lo, hi) where the score reaches `threshold` (open/closed ends ignored)."""
+        bps = self.breakpoints
+        edges = [0.0] + bps + [float("inf")]
+        pieces = []  # segment, brytpunkt, segment, ... i prisordning
+        for i, s in enumerate(self.segment_scores):
+            pieces.append((edges[i], edges[i + 1], s))
+            if i < len(bps):
+                pieces.append((bps[i], bps[i], self.point_scores[i]))
+
+        out: list[tuple[float, float]] = []
+        prev_ok = False
+        for lo, hi, s in pieces:
+            if s < threshold:
+                prev_ok = False
+                continue
+            if prev_ok:
+                out[-1] = (out[-1][0], hi)
+            else:
+                out.append((lo, hi))
+            prev_ok = True
+        return out
+
+
+# ticker -> (key, buy_boundary, sell_boundary | None)
+_index: dict[str, tuple] = {}
+
+
+def get_boundaries(
+    ticker: str,
+    indicators: dict,
+    bar_key,
+    relative_strength: Optional[float] = None,
+    market_regime: str = "NEUTRAL",
+    position: Optional[dict] = None,
+) -> tuple[ScoreBoundary, Optional[ScoreBoundary]]:
+    """Return the (buy, sell) boundaries for `ticker`, rebuilding them only when
+    the bar (`bar_key`), RS or the held position changed."""
+    key = (bar_key, relative_strength, market_regime, position.get("price") if position else None)
+    cached = _index.get(ticker)
+    if cached and cached[0] == key:
+        return cached[1], cached[2]
+
+    levels = price_levels(indicators, position).values()
+
+    def buy_at(p):
+        return score_buy_signal(
+            ticker, {**indicators, "current_price": p},
+            relative_strength=relative_strength, market_regime=market_regime,
+        )[0]
+
+    buy = ScoreBoundary(buy_at, levels)
+    sell = None
+    if position:
+        def sell_at(p):
+            return score_sell_signal(
+                ticker, {**indicators, "current_price": p}, position,
+                relative_strength=relative_strength,
+            )[0]
+        sell = ScoreBoundary(sell_at, levels)
+
+    _index[ticker] = (key, buy, sell)
+    return buy, sell
+
+
+def could_signal(
+    buy: ScoreBoundary,
+    sell: Optional[ScoreBoundary],
+    prices: list[float],
+    buy_threshold: int,
+    sell_threshold: int,
+) -> tuple[bool, bool]:
+    """(could_buy, could_sell) at any of `prices`, assuming best-case sentiment/insider data."""
+    could_buy = any(buy.score_at(p) + OPTIMISTIC_BUY_BONUS >= buy_threshold for p in prices if p)
+    could_sell = sell is not None and any(
+        sell.score_at(p) + OPTIMISTIC_SELL_BONUS >= sell_threshold for p in prices if p
+    )
+    return could_buy, could_sell
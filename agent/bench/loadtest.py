@@ -0,0 +1,195 @@
+"""
+Load test: run the real trading loop against the upstream simulator.
+
+Starts bench.simulator in a subprocess (or uses --url), points every
+upstream at it through the env overrides in config.py, seeds a watchlist
+of --tickers tickers (the universe first, then synthetic SIMnnn names) and
+runs trading_loop() --loops times. Per loop it reports wall time, tickers
+processed/deferred and the ticker and per-stage latency distribution;
+at the end the simulator's per-service request and status counts (429s,
+5xx) and the agent's news/FI counters.
+
+    cd agent
+    python -m bench.loadtest --tickers 300 --loops 3
+    python -m bench.loadtest --tickers 300 --latency-ms 150 --jitter-ms 100 --error-rate 0.02
+    python -m bench.loadtest --set market.rate_limit=10 --set gemini.rate_limit=0.17 --news-ingest
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bench.simulator import add_arguments
+from bench.upstream import FAKE_SUPABASE_KEY
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1))))]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_simulator(args) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    argv = [sys.executable, "-m", "bench.simulator", "--port", str(port),
+            "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+            "--error-rate", str(args.error_rate), "--rate-limit", str(args.rate_limit),
+            "--burst", str(args.burst), "--seed", str(args.seed)]
+    for item in args.set or []:
+        argv += ["--set", item]
+    proc = subprocess.Popen(argv, cwd=AGENT_DIR)
+    url = f"http://127.0.0.1:{port}"
+
+    import httpx
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/_sim/stats", timeout=1)
+            return proc, url
+        except httpx.HTTPError:
+            if proc.poll() is not None:
+                sys.exit("Simulatorn startade inte")
+            time.sleep(0.1)
+    proc.terminate()
+    sys.exit("Simulatorn svarade inte inom 10 s")
+
+
+def _point_env_at(url: str):
+    """Must run before any agent module is imported — config.py reads the env at import."""
+    for key in ("FRONTEND_URL", "SUPABASE_URL", "GOOGLE_NEWS_URL", "FI_URL", "NTFY_SERVER", "GEMINI_BASE_URL"):
+        os.environ[key] = url
+    os.environ["SUPABASE_KEY"] = FAKE_SUPABASE_KEY
+    os.environ["GEMINI_API_KEY"] = "loadtest"
+
+
+def _seed(url: str, n_tickers: int, n_positions: int) -> list[str]:
+    import httpx
+    from datetime import datetime, timezone
+    import instruments
+    from db.supabase_client import get_client
+    httpx.post(f"{url}/_sim/reset", params={"store": 1})
+
+    universe = [(i.ticker, i.name) for i in instruments.universe()]
+    extra = [(f"SIM{i:03d}", f"Simbolag {i}") for i in range(max(0, n_tickers - len(universe)))]
+    watch = (universe + extra)[:n_tickers]
+    now = datetime.now(timezone.utc).isoformat()
+    client = get_client()
+    client.table("stock_watchlist").insert([
+        {"ticker": t, "name": n, "strategy": "trend", "active": True, "created_at": now} for t, n in watch
+    ]).execute()
+    if n_positions:
+        from data.yahoo_client import get_current_price
+        rows = []
+        for t, _ in watch[:n_positions]:
+            price = asyncio.run(get_current_price(t))["price"] or 100.0
+            rows.append({"ticker": t, "status": "open", "entry_price": round(price * 0.97, 2),
+                         "quantity": 10, "opened_at": now})
+        client.table("stock_trades").insert(rows).execute()
+    return [t for t, _ in watch]
+
+
+async def _run(args, tickers: list[str]) -> list[dict]:
+    import settings
+    import scheduler
+    from data import earnings_calendar
+    from data.insider_fetcher import refresh_insider_register
+
+    # Samma uppstart som lifespan i main.py (kalendern hämtas direkt i stället för från DB)
+    await settings.load()
+    await scheduler.load_open_positions()
+    await refresh_insider_register(force=True)
+    await earnings_calendar.refresh_earnings_calendar(tickers)
+
+    loops = []
+    for n in range(args.loops):
+        before = dict(scheduler.loop_stats)
+        ingest = asyncio.create_task(scheduler.news_ingest()) if args.news_ingest else None
+        t0 = time.monotonic()
+        await scheduler.trading_loop()
+        wall = time.monotonic() - t0
+        if ingest:
+            await ingest
+
+        ran = [t for t, s in scheduler.ticker_state.items() if s.get("last_seq") == scheduler._loop_seq]
+        timings = [scheduler.stage_latency[t] for t in ran if t in scheduler.stage_latency]
+        stages = sorted({k for t in timings for k in t} - {"total"})
+        totals = [t["total"] for t in timings]
+        loops.append({
+            "loop": n + 1,
+            "wall_s": round(wall, 2),
+            "processed": scheduler.loop_stats["tickers_processed"] - before["tickers_processed"],
+            "deferred": scheduler.loop_stats["tickers_deferred"] - before["tickers_deferred"],
+            "ticker_p50_s": round(_percentile(totals, 50), 3),
+            "ticker_p95_s": round(_percentile(totals, 95), 3),
+            "ticker_max_s": round(max(totals, default=0.0), 3),
+            "stage_p95_s": {s: round(_percentile([t[s] for t in timings if s in t], 95), 3) for s in stages},
+        })
+        if args.interval and n + 1 < args.loops:
+            await asyncio.sleep(args.interval)
+    return loops
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="kör mot en redan startad simulator i stället för att starta en")
+    ap.add_argument("--tickers", type=int, default=200)
+    ap.add_argument("--positions", type=int, default=3, help="öppna positioner att seeda")
+    ap.add_argument("--loops", type=int, default=3)
+    ap.add_argument("--interval", type=float, default=0.0, help="sekunder mellan looparna (produktion: 120)")
+    ap.add_argument("--news-ingest", action="store_true", help="kör nyhetsinläsningen parallellt med varje loop")
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--verbose", action="store_true")
+    add_arguments(ap)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = _start_simulator(args)
+    try:
+        _point_env_at(url.rstrip("/"))
+        tickers = _seed(url, args.tickers, args.positions)
+        loops = asyncio.run(_run(args, tickers))
+
+        import httpx
+        from data.insider_fetcher import insider_stats
+        from data.news_fetcher import news_stats
+        sim = httpx.get(f"{url}/_sim/stats").json()
+        report = {"loops": loops, "upstream": sim, "news": news_stats, "insider": insider_stats}
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"\n{len(tickers)} tickers mot {url}\n")
+    print(f"{'loop':>4}{'vägg s':>9}{'körda':>7}{'vilande':>9}{'p50 s':>8}{'p95 s':>8}{'max s':>8}  steg p95")
+    for r in loops:
+        stages = " ".join(f"{k}={v}" for k, v in r["stage_p95_s"].items())
+        print(f"{r['loop']:>4}{r['wall_s']:>9.2f}{r['processed']:>7}{r['deferred']:>9}"
+              f"{r['ticker_p50_s']:>8.3f}{r['ticker_p95_s']:>8.3f}{r['ticker_max_s']:>8.3f}  {stages}")
+    print("\nupstream:")
+    for name, s in sim["services"].items():
+        print(f"  {name:<9}{s['requests']:>7} anrop {s['rps']:>7.1f}/s  status {s['status']}  injicerad latens {s['injected_latency_s']}s")
+    print(f"\nnyheter: {news_stats}\nFI: {insider_stats}")
+
+
+if __name__ == "__main__":
+    main()
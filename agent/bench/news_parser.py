@@ -0,0 +1,89 @@
+"""
+Benchmark: streaming RSS parser (RssItemParser) vs full feedparser parse.
+
+Runs both parsers over the feeds in bench/fixtures/news/ and reports time
+per feed and peak allocated memory (tracemalloc). Also checks that both
+return the same headlines, links, sources and dates.
+
+    cd agent
+    python -m bench.news_parser                 # alla fixtures, max_items=5
+    python -m bench.news_parser --max-items 20
+    python -m bench.news_parser --record Volvo "Atlas Copco"   # spela in riktiga flöden
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from data.news_fetcher import _parse_entries, _feed_url, parse_feed
+
+FIXTURES = Path(__file__).parent / "fixtures" / "news"
+
+
+def _time_it(func, repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _peak_kib(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _same(a: list[dict], b: list[dict]) -> bool:
+    keys = ("headline", "url", "source", "published_at")
+    return [[x[k] for k in keys] for x in a] == [[x[k] for k in keys] for x in b]
+
+
+def run(max_items: int, repeat: int):
+    files = sorted(FIXTURES.glob("*.xml"))
+    if not files:
+        print(f"Inga fixtures i {FIXTURES}")
+        return
+    print(f"max_items={max_items}, {repeat} varv per flöde\n")
+    print(f"{'flöde':<28}{'KiB':>7}{'feedparser ms':>15}{'stream ms':>11}{'x':>6}{'fp KiB':>9}{'st KiB':>9}  lika")
+    for path in files:
+        data = path.read_bytes()
+        full = lambda: _parse_entries(data, "BENCH", max_items)
+        stream = lambda: parse_feed(data, "BENCH", max_items)
+        full(), stream()  # uppvärmning
+
+        fp_ms = statistics.median(_time_it(full, repeat)) * 1000
+        st_ms = statistics.median(_time_it(stream, repeat)) * 1000
+        print(
+            f"{path.stem:<28}{len(data) / 1024:>7.1f}{fp_ms:>15.2f}{st_ms:>11.2f}{fp_ms / st_ms:>6.1f}"
+            f"{_peak_kib(full):>9.0f}{_peak_kib(stream):>9.0f}  {'ja' if _same(full(), stream()) else 'NEJ'}"
+        )
+
+
+def record(companies: list[str]):
+    """Save live Google News feeds as fixtures."""
+    import httpx
+    FIXTURES.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(follow_redirects=True, timeout=15) as client:
+        for company in companies:
+            resp = client.get(_feed_url(company))
+            resp.raise_for_status()
+            path = FIXTURES / f"{company.lower().replace(' ', '_')}_live.xml"
+            path.write_bytes(resp.content)
+            print(f"{company}: {len(resp.content) / 1024:.1f} KiB -> {path}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--max-items", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--record", nargs="+", metavar="COMPANY")
+    args = ap.parse_args()
+    if args.record:
+        record(args.record)
+    else:
+        run(args.max_items, args.repeat)
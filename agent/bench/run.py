@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the agent's hot paths, run against local upstreams.
+
+Every upstream (Vercel market proxy, Google News, FI, Gemini, ntfy and
+Supabase) is served by bench.upstream.FakeUpstream, so the numbers measure
+the agent's own code — parsing, indicators, scoring, pipeline overhead —
+and are reproducible between runs and machines.
+
+Per case it reports throughput (units/s — tickers, rows or snapshots),
+latency percentiles per iteration and peak allocated memory (tracemalloc,
+one separate iteration). Results are compared against bench/baseline.json;
+a case whose fastest iteration or peak memory is more than --threshold
+worse than the baseline is a regression and the run exits with status 1.
+The fastest iteration is the least noisy figure on a shared machine — the
+percentiles show the spread.
+
+Time is compared relative to a fixed calibration loop (_calibrate) timed
+right before the iterations it is paired with, so a slower or busier machine moves the case and
+the calibration together and is not reported as a regression. Cases
+whose fastest iteration is only a few milliseconds also get a wider
+threshold (_NOISE_FLOOR_MS / min_ms), since scheduler jitter is a larger
+share of them.
+
+    cd agent
+    python -m bench.run                        # alla fall, jämför mot baseline
+    python -m bench.run indicators scan_discovery
+    python -m bench.run --save-baseline        # spara nuvarande siffror som baseline
+    python -m bench.run --record VOLV\\ B ERIC\\ B  # spela in riktig historik via FRONTEND_URL
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench.upstream import FIXTURES, FakeUpstream, install, _fixture_name
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+WATCHLIST_SIZE = 15
+OPEN_POSITIONS = 2
+SCORING_ROUNDS = 20   # varv över alla snapshots per iteration — scoring är för snabb för att mäta en gång
+
+_CALIBRATION_REPEAT = 20
+_NOISE_FLOOR_MS = 5.0  # absolut jitter som alltid tolereras utöver --threshold
+
+# name -> (async setup(ctx) -> (iteration coroutine function, units per iteration), default repeat)
+CASES: dict[str, tuple] = {}
+
+
+def case(name: str, repeat: int):
+    def register(func):
+        CASES[name] = (func, repeat)
+        return func
+    return register
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _clear_caches():
+    """Forget everything the agent caches between runs, so each iteration does the full work."""
+    from data import yahoo_client, news_fetcher
+    from analysis import sentiment, signal_boundary
+    import scheduler
+    yahoo_client._cache.clear()
+    news_fetcher._feeds.clear()
+    news_fetcher._first_seen.clear()
+    sentiment._sentiment_cache.clear()
+    signal_boundary._index.clear()
+    scheduler._description_cache.clear()
+    scheduler.cooldowns.clear()
+
+
+# ── Fall ───────────────────────────────────────────────────────────────
+
+async def _frames(ctx, n: int | None = None):
+    from data.yahoo_client import get_price_history
+    from stock_scanner import STOCK_UNIVERSE
+    tickers = list(STOCK_UNIVERSE)[:n]
+    return [await get_price_history(t, days=220) for t in tickers]
+
+
+@case("indicators", repeat=20)
+async def _indicators(ctx):
+    from analysis.indicators import calculate_indicators
+    frames = await _frames(ctx, 40)
+
+    async def run():
+        for df in frames:
+            calculate_indicators(df)
+    return run, len(frames)
+
+
+async def _snapshots(ctx):
+    from analysis.indicators import calculate_indicators
+    snaps = [s for s in (calculate_indicators(df) for df in await _frames(ctx)) if s]
+    for i, s in enumerate(snaps):
+        s["relative_strength"] = (i % 21 - 10) / 2
+    return snaps
+
+
+@case("score_buy", repeat=100)
+async def _score_buy(ctx):
+    from analysis.decision_engine import score_buy_signal
+    snaps = await _snapshots(ctx)
+    sentiment = {"sentiment": "POSITIVE", "score": 0.6}
+
+    async def run():
+        for _ in range(SCORING_ROUNDS):
+            for s in snaps:
+                score_buy_signal("BENCH", s, sentiment, None, False, s.get("relative_strength"), "NEUTRAL")
+    return run, len(snaps) * SCORING_ROUNDS
+
+
+@case("score_sell", repeat=100)
+async def _score_sell(ctx):
+    from analysis.decision_engine import score_sell_signal
+    snaps = await _snapshots(ctx)
+    positions = [{"price": s["current_price"] * 0.95, "quantity": 10} for s in snaps]
+
+    async def run():
+        for _ in range(SCORING_ROUNDS):
+            for s, position in zip(snaps, positions):
+                score_sell_signal("BENCH", s, position, None, s.get("relative_strength"))
+    return run, len(snaps) * SCORING_ROUNDS
+
+
+@case("score_buy_batch", repeat=100)
+async def _score_buy_batch(ctx):
+    from analysis.indicators import stack
+    from analysis.decision_engine import score_buy_batch
+    snaps = await _snapshots(ctx)
+    X = stack(snaps)
+    rs = [s.get("relative_strength") for s in snaps]
+
+    async def run():
+        for _ in range(SCORING_ROUNDS):
+            score_buy_batch(X, relative_strength=rs)
+    return run, len(snaps) * SCORING_ROUNDS
+
+
+@case("price_history", repeat=20)
+async def _price_history(ctx):
+    from data import yahoo_client
+    from stock_scanner import STOCK_UNIVERSE
+    tickers = list(STOCK_UNIVERSE)[:40]
+
+    async def run():
+        yahoo_client._cache.clear()
+        for t in tickers:
+            await yahoo_client.get_price_history(t, days=220)
+    return run, len(tickers)
+
+
+@case("process_ticker", repeat=30)
+async def _process_ticker(ctx):
+    import scheduler
+    from data.yahoo_client import get_index_history
+    from analysis.indicators import calculate_market_regime
+    index_df = await get_index_history()
+    regime = calculate_market_regime(index_df)
+    watchlist = ctx["watchlist"]
+    config_map = {s["ticker"]: s for s in watchlist}
+    stock = watchlist[0]
+
+    async def run():
+        _clear_caches()
+        # manual=True: hela pipelinen — nyheter, Gemini, FI och DB-skrivningar
+        await scheduler.process_ticker(stock["ticker"], stock_config=stock, index_df=index_df,
+                                       market_regime=regime, stock_config_map=config_map, manual=True)
+    return run, 1
+
+
+@case("scan_discovery", repeat=3)
+async def _scan_discovery(ctx):
+    import stock_scanner
+    stock_scanner.SCAN_THROTTLE_S = 0
+
+    async def run():
+        _clear_caches()
+        await stock_scanner.discovery_scan()
+    return run, len(stock_scanner.STOCK_UNIVERSE)
+
+
+@case("scan_rotation", repeat=3)
+async def _scan_rotation(ctx):
+    import stock_scanner
+    stock_scanner.SCAN_THROTTLE_S = 0
+
+    async def run():
+        _clear_caches()
+        await stock_scanner.run_scan()
+    return run, len(stock_scanner.STOCK_UNIVERSE)
+
+
+# ── Körning ────────────────────────────────────────────────────────────
+
+def _seed_store(upstream: FakeUpstream) -> dict:
+    """Watchlist and open positions as the trading loop would see them."""
+    from datetime import datetime, timezone
+    from stock_scanner import STOCK_UNIVERSE
+    now = datetime.now(timezone.utc).isoformat()
+    watchlist = [
+        {"ticker": t, "name": n, "strategy": "trend", "active": True, "created_at": now}
+        for t, n in list(STOCK_UNIVERSE.items())[:WATCHLIST_SIZE]
+    ]
+    upstream.store.seed("stock_watchlist", watchlist)
+    upstream.store.seed("stock_trades", [
+        {"ticker": w["ticker"], "status": "open", "entry_price": upstream.market.history(w["ticker"])[-20]["close"],
+         "quantity": 10, "opened_at": now}
+        for w in watchlist[-OPEN_POSITIONS:]
+    ])
+    return {"watchlist": upstream.store.tables["stock_watchlist"]}
+
+
+def _calibrate() -> float:
+    """One run of a fixed Python + numpy workload, in seconds — the machine's current speed."""
+    import numpy as np
+    data = np.arange(50_000, dtype=float)
+    t0 = time.perf_counter()
+    total = 0.0
+    for i in range(200_000):
+        total += i % 7
+    for _ in range(100):
+        total += float(np.sqrt(data).sum())
+    return time.perf_counter() - t0
+
+
+async def _measure(name: str, ctx: dict, repeat: int) -> dict:
+    setup, _ = CASES[name]
+    run, units = await setup(ctx)
+    await run()  # uppvärmning (importer, cachar i pandas/numpy)
+
+    # Kalibreringen varvas med iterationerna; den snabbaste iterationen jämförs mot
+    # kalibreringen närmast före den, så båda mäts under samma belastning
+    every = max(1, repeat // _CALIBRATION_REPEAT)
+    samples, paired = [], []
+    for i in range(repeat):
+        if i % every == 0:
+            calibration = _calibrate()
+        t0 = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - t0)
+        paired.append(calibration)
+    fastest = min(range(repeat), key=samples.__getitem__)
+    calibration_ms = round(paired[fastest] * 1000, 3)
+
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        "iterations": repeat,
+        "units": units,
+        "throughput": round(units * repeat / total, 1) if total else 0.0,
+        "min_ms": round(min(samples) * 1000, 3),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "calibration_ms": calibration_ms,
+    }
+
+
+def _expected_ms(r: dict, base: dict) -> float | None:
+    """Baseline min_ms scaled by how fast the machine is now compared to when it was saved."""
+    if not base.get("min_ms"):
+        return None
+    if base.get("calibration_ms") and r.get("calibration_ms"):
+        return base["min_ms"] * r["calibration_ms"] / base["calibration_ms"]
+    return base["min_ms"]
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        expected = _expected_ms(r, base)
+        if expected and r["min_ms"] > expected * (1 + threshold) + _NOISE_FLOOR_MS:
+            regressions.append(
+                f"{name}: min_ms {r['min_ms']} mot förväntat {expected:.2f} "
+                f"(baseline {base['min_ms']}, kalibrerat; +{r['min_ms'] / expected - 1:.0%})"
+            )
+        if base.get("peak_kib") and r["peak_kib"] > base["peak_kib"] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak_kib {r['peak_kib']} mot baseline {base['peak_kib']} "
+                f"(+{r['peak_kib'] / base['peak_kib'] - 1:.0%})"
+            )
+    return regressions
+
+
+def _print(results: dict, baseline: dict):
+    print(f"{'fall':<18}{'iter':>6}{'enh/s':>11}{'min ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'peak KiB':>11}{'Δmin':>8}")
+    for name, r in results.items():
+        expected = _expected_ms(r, baseline.get(name, {}))
+        delta = f"{r['min_ms'] / expected - 1:+.0%}" if expected else "–"
+        print(
+            f"{name:<18}{r['iterations']:>6}{r['throughput']:>11.1f}{r['min_ms']:>11.2f}{r['p50_ms']:>11.2f}"
+            f"{r['p95_ms']:>11.2f}{r['p99_ms']:>11.2f}{r['peak_kib']:>11.0f}{delta:>8}"
+        )
+
+
+async def main(names: list[str], repeat: int | None) -> dict:
+    upstream = FakeUpstream()
+    with install(upstream):
+        import scheduler
+        import leader
+        from data import earnings_calendar, insider_fetcher
+        leader.set_store(leader.MemoryLockStore())
+        ctx = _seed_store(upstream)
+        await scheduler.load_open_positions()
+        await earnings_calendar.refresh_earnings_calendar()
+        await insider_fetcher.refresh_insider_register(force=True)
+
+        results = {}
+        for name in names:
+            results[name] = await _measure(name, ctx, repeat or CASES[name][1])
+        results["_upstream_calls"] = dict(upstream.calls)
+    return results
+
+
+def record(tickers: list[str]):
+    """Save live history from the market proxy (FRONTEND_URL) as fixtures."""
+    import httpx
+    from config import FRONTEND_URL
+    if not FRONTEND_URL:
+        sys.exit("FRONTEND_URL saknas — behövs för att spela in")
+    out = FIXTURES / "market"
+    out.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(timeout=30) as client:
+        for ticker in tickers:
+            resp = client.get(f"{FRONTEND_URL}/api/market/{ticker}", params={"type": "history", "days": 730})
+            resp.raise_for_status()
+            path = out / f"{_fixture_name(ticker)}.json"
+            path.write_text(json.dumps(resp.json()))
+            print(f"{ticker}: {len(resp.json().get('data', []))} dagar -> {path}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("cases", nargs="*", help=f"fall att köra (standard: alla) — {', '.join(CASES)}")
+    ap.add_argument("--repeat", type=int, help="iterationer per fall (standard: per fall)")
+    ap.add_argument("--threshold", type=float, default=0.25, help="tillåten försämring mot baseline (0.25 = 25%%)")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true", help="skriv resultatet som JSON")
+    ap.add_argument("--verbose", action="store_true", help="visa agentens loggning")
+    ap.add_argument("--record", nargs="+", metavar="TICKER")
+    args = ap.parse_args()
+
+    if args.record:
+        record(args.record)
+        sys.exit(0)
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        sys.exit(f"Okända fall: {', '.join(unknown)} (finns: {', '.join(CASES)})")
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+
+    results = asyncio.run(main(args.cases or list(CASES), args.repeat))
+    calls = results.pop("_upstream_calls")
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+
+    if args.json:
+        print(json.dumps({"results": results, "upstream_calls": calls}, indent=2))
+    else:
+        _print(results, baseline)
+        print(f"\nanrop mot lokala upstreams: {calls}")
+
+    if args.save_baseline:
+        import platform
+        meta = {"python": platform.python_version(), "platform": platform.platform(), "saved_at": time.strftime("%Y-%m-%d")}
+        BASELINE.write_text(json.dumps({**baseline, **results, "_meta": meta}, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline sparad: {BASELINE}")
+        sys.exit(0)
+
+    regressions = _compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nREGRESSIONER:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
@@ -0,0 +1,227 @@
+"""
+Local fake-upstream simulator: every upstream the agent talks to, served
+over real HTTP with configurable latency, errors and rate limiting.
+
+It serves bench.upstream.FakeUpstream (market proxy, Google News RSS, FI,
+Gemini, ntfy and an in-memory PostgREST store) behind one uvicorn server.
+Faults are injected per service before the request is answered:
+
+    latency_ms / jitter_ms   fixed delay + uniform random extra delay
+    error_rate               share of requests answered with 500/502/503
+    rate_limit / burst       token bucket (req/s); over the limit -> 429 + Retry-After
+
+Point the agent at it through the env overrides in config.py:
+
+    FRONTEND_URL=http://127.0.0.1:8100 SUPABASE_URL=http://127.0.0.1:8100
+    GOOGLE_NEWS_URL=... FI_URL=... NTFY_SERVER=... GEMINI_BASE_URL=...
+
+    cd agent
+    python -m bench.simulator --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+    python -m bench.simulator --set market.rate_limit=5 --set gemini.rate_limit=0.17
+
+Runtime control (JSON):
+
+    GET  /_sim/stats            anrop, statuskoder, 429:or och injicerad latens per tjänst
+    GET  /_sim/config           nuvarande felprofiler
+    POST /_sim/config           {"market": {"latency_ms": 300}, "default": {"error_rate": 0.05}}
+    POST /_sim/reset            nollställ statistik (och med ?store=1 även databasen)
+
+bench.loadtest runs the trading loop against it.
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+
+from fastapi import FastAPI, Request, Response
+
+from bench.upstream import FakeUpstream, PostgrestStore
+
+SERVICES = ("market", "news", "fi", "gemini", "supabase", "ntfy")
+
+
+@dataclass
+class Profile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0   # anrop/s, 0 = obegränsat
+    burst: int = 10
+
+
+class _Bucket:
+    """Token bucket — `rate` tokens per second, at most `burst` saved up."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, rate: float, burst: int) -> float:
+        """Take one token. Returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class Simulator:
+    """FakeUpstream plus per-service fault profiles and statistics."""
+
+    def __init__(self, upstream: FakeUpstream | None = None, default: Profile | None = None, seed: int = 0):
+        self.upstream = upstream or FakeUpstream()
+        self.profiles: dict[str, Profile] = {"default": default or Profile()}
+        self._buckets: dict[str, _Bucket] = {}
+        self._rng = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.started = time.monotonic()
+        self.stats: dict[str, dict] = {}
+
+    def profile(self, service: str) -> Profile:
+        return self.profiles.get(service) or self.profiles["default"]
+
+    def configure(self, changes: dict[str, dict]):
+        """Merge {service: {field: value}} into the profiles (new services start from default)."""
+        known = {f.name: f.type for f in fields(Profile)}
+        for service, values in changes.items():
+            if service != "default" and service not in SERVICES:
+                raise ValueError(f"okänd tjänst: {service}")
+            base = asdict(self.profile(service))
+            for key, value in values.items():
+                if key not in known:
+                    raise ValueError(f"okänt fält: {key}")
+                base[key] = int(value) if key == "burst" else float(value)
+            self.profiles[service] = Profile(**base)
+            self._buckets.pop(service, None)
+
+    def _count(self, service: str, status: int, delay_s: float):
+        s = self.stats.setdefault(service, {"requests": 0, "status": {}, "injected_latency_s": 0.0})
+        s["requests"] += 1
+        s["status"][str(status)] = s["status"].get(str(status), 0) + 1
+        s["injected_latency_s"] = round(s["injected_latency_s"] + delay_s, 3)
+
+    async def handle(self, method: str, path: str, params, headers: dict, body: bytes) -> tuple[int, dict, bytes]:
+        service = self.upstream.service(method, path)
+        p = self.profile(service)
+
+        delay = (p.latency_ms + self._rng.uniform(0, p.jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+        if p.rate_limit > 0:
+            bucket = self._buckets.setdefault(service, _Bucket(p.burst))
+            wait = bucket.take(p.rate_limit, p.burst)
+            if wait:
+                self._count(service, 429, delay)
+                retry_after = str(max(1, round(wait)))
+                return 429, {"retry-after": retry_after, "content-type": "application/json"}, \
+                    b'{"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "rate limited"}}'
+
+        if p.error_rate and self._rng.random() < p.error_rate:
+            status = self._rng.choice((500, 502, 503))
+            self._count(service, status, delay)
+            return status, {"content-type": "application/json"}, b'{"error": "simulerat fel"}'
+
+        status, out_headers, content = self.upstream.handle(method, path, params, headers, body)
+        self._count(service, status, delay)
+        return status, out_headers, content
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "services": {
+                name: {**s, "rps": round(s["requests"] / elapsed, 2) if elapsed else 0.0}
+                for name, s in sorted(self.stats.items())
+            },
+            "rows": {table: len(rows) for table, rows in sorted(self.upstream.store.tables.items())},
+        }
+
+
+def create_app(sim: Simulator) -> FastAPI:
+    app = FastAPI(title="Aktiemotor upstream-simulator")
+
+    @app.get("/_sim/stats")
+    async def stats():
+        return sim.snapshot()
+
+    @app.get("/_sim/config")
+    async def get_config():
+        return {name: asdict(p) for name, p in sim.profiles.items()}
+
+    @app.post("/_sim/config")
+    async def set_config(request: Request):
+        try:
+            sim.configure(await request.json())
+        except (ValueError, TypeError) as e:
+            return Response(status_code=400, content=str(e))
+        return {name: asdict(p) for name, p in sim.profiles.items()}
+
+    @app.post("/_sim/reset")
+    async def reset(store: bool = False):
+        sim.reset_stats()
+        if store:
+            sim.upstream.store = PostgrestStore()
+        return {"ok": True}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PATCH", "DELETE", "PUT", "HEAD"])
+    async def upstream(path: str, request: Request):
+        status, headers, content = await sim.handle(
+            request.method,
+            request.url.path,
+            list(request.query_params.multi_items()),
+            {k.lower(): v for k, v in request.headers.items()},
+            await request.body(),
+        )
+        return Response(content=content, status_code=status, headers=headers)
+
+    return app
+
+
+def parse_set(items: list[str]) -> dict[str, dict]:
+    """['market.rate_limit=5', 'gemini.latency_ms=900'] -> {'market': {'rate_limit': '5'}, ...}"""
+    out: dict[str, dict] = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        service, _, field = key.partition(".")
+        if not field or not value:
+            raise SystemExit(f"--set väntar tjänst.fält=värde, fick: {item}")
+        out.setdefault(service, {})[field] = value
+    return out
+
+
+def build(args) -> Simulator:
+    sim = Simulator(
+        default=Profile(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.burst),
+        seed=args.seed,
+    )
+    sim.configure(parse_set(args.set or []))
+    return sim
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="fast latens per anrop")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="slumpmässig extra latens (0..jitter)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="andel anrop som svarar 5xx")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="anrop/s per tjänst innan 429 (0 = av)")
+    ap.add_argument("--burst", type=int, default=10)
+    ap.add_argument("--set", action="append", metavar="TJÄNST.FÄLT=VÄRDE",
+                    help=f"per tjänst, t.ex. market.rate_limit=5 ({', '.join(SERVICES)})")
+    ap.add_argument("--seed", type=int, default=0)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8100)
+    add_arguments(ap)
+    args = ap.parse_args()
+    uvicorn.run(create_app(build(args)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,479 @@
+"""
+Local stand-ins for every upstream the agent talks to.
+
+FakeUpstream answers the same HTTP shapes as the real services, routed on
+path so one instance can sit behind any host name:
+
+    GET  /api/market/{ticker}?type=history|price|earnings   Vercel Yahoo-proxy
+    GET  /rss/search?q=...                                  Google News RSS (ETag/304)
+    GET  /sv/vara-register/insynshandel/GetInsynshandel/    FI insider register
+    POST /v1beta/models/{model}:generateContent             Gemini
+    *    /rest/v1/{table}                                   Supabase PostgREST (in memory)
+    POST /{topic}                                           ntfy
+
+Market data comes from bench/fixtures/market/{ticker}.json when recorded
+(python -m bench.run --record), otherwise from a random walk seeded by the
+ticker, so every run sees the same prices. News feeds are the XML files in
+bench/fixtures/news/, picked per query.
+
+install() routes every httpx client created while it is active (including
+the ones inside supabase-py and google-genai) to a FakeUpstream, so the
+agent's own code paths run unchanged without network.
+"""
+import contextlib
+import json
+import os
+import random
+import re
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote
+
+import httpx
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Tabeller vars primärnyckel inte är "id" (upsert utan on_conflict)
+_PRIMARY_KEYS = {
+    "stock_settings": "key",
+    "stock_job_locks": "job",
+    "stock_earnings_calendar": "ticker",
+    "stock_indicators_latest": "ticker",
+    "stock_portfolio_totals": "key",
+}
+
+_ANCHOR = date(2026, 10, 16)   # sista handelsdag i syntetisk historik — fast för reproducerbarhet
+
+
+def _seed(*parts) -> int:
+    return zlib.crc32(":".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _fixture_name(ticker: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", ticker.lower()).strip("_")
+
+
+# ── Market proxy ───────────────────────────────────────────────────────
+
+def _bars_for(days: int) -> int:
+    # Samma range-val som frontend/app/api/market/[ticker]/route.ts
+    return 63 if days <= 90 else 126 if days <= 180 else 252 if days <= 365 else 504
+
+
+def synthetic_history(ticker: str, bars: int = 252) -> list[dict]:
+    """Deterministic daily OHLCV for `ticker`: a random walk with a per-ticker drift,
+    volatility and turnover, so the universe mixes trends, ranges and illiquid names."""
+    rng = random.Random(_seed("history", ticker))
+    price = rng.uniform(20, 600)
+    drift = rng.uniform(-0.0015, 0.002)
+    vol = rng.uniform(0.008, 0.035)
+    base_volume = 10 ** rng.uniform(4.5, 6.8)
+
+    day = _ANCHOR
+    dates = []
+    while len(dates) < bars:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+
+    rows = []
+    for d in reversed(dates):
+        open_ = price
+        price = max(1.0, price * (1 + rng.gauss(drift, vol)))
+        span = abs(rng.gauss(0, vol)) * price
+        rows.append({
+            "date": d.isoformat(),
+            "open": round(open_, 2),
+            "high": round(max(open_, price) + span, 2),
+            "low": round(max(0.5, min(open_, price) - span), 2),
+            "close": round(price, 2),
+            "volume": int(base_volume * rng.lognormvariate(0, 0.4)),
+        })
+    return rows
+
+
+class MarketData:
+    """History, quote and earnings date per ticker — recorded fixture or synthetic."""
+
+    def __init__(self, fixtures: Path = FIXTURES / "market"):
+        self.fixtures = fixtures
+        self._history: dict[str, list[dict]] = {}
+
+    def history(self, ticker: str, days: int = 365) -> list[dict]:
+        rows = self._history.get(ticker)
+        if rows is None:
+            path = self.fixtures / f"{_fixture_name(ticker)}.json"
+            if path.exists():
+                rows = json.loads(path.read_text())["data"]
+            else:
+                rows = synthetic_history(ticker, 504)
+            self._history[ticker] = rows
+        return rows[-_bars_for(days):]
+
+    def quote(self, ticker: str) -> dict:
+        last = self.history(ticker)[-1]
+        prev = self.history(ticker)[-2]
+        rng = random.Random(_seed("quote", ticker))
+        price = round(last["close"] * (1 + rng.gauss(0, 0.004)), 2)
+        return {
+            "price": price,
+            "change_pct": round((price / prev["close"] - 1) * 100, 2),
+            "volume": int(last["volume"] * rng.uniform(0.3, 1.2)),
+        }
+
+    def earnings(self, ticker: str) -> str | None:
+        offset = _seed("earnings", ticker) % 90
+        return (date.today() + timedelta(days=offset)).isoformat() if offset < 80 else None
+
+
+# ── In-memory PostgREST ────────────────────────────────────────────────
+
+def _coerce(value, text: str):
+    """Compare a stored value with a PostgREST filter literal."""
+    if isinstance(value, bool):
+        return value, text.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return float(value), float(text)
+        except ValueError:
+            return str(value), text
+    return ("" if value is None else str(value)), text
+
+
+def _match(row: dict, column: str, expr: str) -> bool:
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, arg = expr.partition(".")
+    if len(arg) >= 2 and arg[0] == arg[-1] == '"':
+        arg = arg[1:-1]  # citerat värde (innehåller reserverade tecken)
+    value = row.get(column)
+    if op == "is":
+        ok = value is None if arg == "null" else value is (arg == "true")
+    elif op == "in":
+        items = [a.strip().strip('"') for a in arg.strip("()").split(",")]
+        ok = value is not None and any(a == b for a, b in (_coerce(value, i) for i in items))
+    elif value is None:
+        ok = False
+    elif op in ("like", "ilike"):
+        pattern = re.escape(arg).replace(r"\*", ".*").replace("%", ".*")
+        ok = re.fullmatch(pattern, str(value), re.IGNORECASE if op == "ilike" else 0) is not None
+    else:
+        a, b = _coerce(value, arg)
+        ok = {
+            "eq": a == b, "neq": a != b, "gt": a > b, "gte": a >= b, "lt": a < b, "lte": a <= b,
+        }.get(op, False)
+    return ok != negate
+
+
+def _split_top(text: str) -> list[str]:
+    parts, depth, cur = [], 0, ""
+    for ch in text:
+        if ch == "," and depth == 0:
+            parts.append(cur)
+            cur = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        cur += ch
+    return parts + [cur] if cur else parts
+
+
+def _match_or(row: dict, expr: str) -> bool:
+    for cond in _split_top(expr.strip("()")):
+        if cond.startswith(("and(", "or(")):
+            kind, _, inner = cond.partition("(")
+            results = [_match_or(row, f"({c})") for c in _split_top(inner[:-1])]
+            if (all(results) if kind == "and" else any(results)):
+                return True
+            continue
+        column, _, rest = cond.partition(".")
+        if _match(row, column, rest):
+            return True
+    return False
+
+
+class PostgrestStore:
+    """Just enough of PostgREST for supabase-py: select/filters/order/limit/count,
+    insert, upsert (on_conflict, ignore/merge duplicates), update and delete."""
+
+    _RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = {}
+
+    def seed(self, table: str, rows: list[dict]):
+        for row in rows:
+            self.tables.setdefault(table, []).append(self._fill(row))
+
+    @staticmethod
+    def _fill(row: dict) -> dict:
+        row = dict(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def _filtered(self, table: str, params: list[tuple[str, str]]) -> list[dict]:
+        rows = self.tables.get(table, [])
+        for key, expr in params:
+            if key in self._RESERVED:
+                continue
+            if key in ("or", "and"):
+                if key == "or":
+                    rows = [r for r in rows if _match_or(r, expr)]
+                else:
+                    rows = [r for r in rows if all(_match_or(r, f"({c})") for c in _split_top(expr.strip("()")))]
+            else:
+                rows = [r for r in rows if _match(r, key, expr)]
+        return rows
+
+    @staticmethod
+    def _project(rows: list[dict], select: str) -> list[dict]:
+        cols = [c.strip() for c in select.split(",") if c.strip()]
+        if not cols or "*" in cols:
+            return [dict(r) for r in rows]
+        out = []
+        for r in rows:
+            item = {}
+            for c in cols:
+                # alias:kolumn->>nyckel — ett fält ur en JSON-kolumn
+                alias, _, path = c.rpartition(":") if ":" in c else ("", "", c)
+                column, _, json_key = path.partition("->>")
+                if json_key:
+                    item[alias or json_key] = (r.get(column) or {}).get(json_key)
+                else:
+                    item[alias or column] = r.get(column)
+            out.append(item)
+        return out
+
+    def handle(self, method: str, table: str, params: list[tuple[str, str]], prefer: str, body) -> tuple[int, dict, object]:
+        q = dict(params)
+        headers = {}
+        if method == "GET":
+            rows = self._filtered(table, params)
+            for spec in reversed((q.get("order") or "").split(",")):
+                if not spec:
+                    continue
+                col, *mods = spec.split(".")
+                desc = "desc" in mods
+                present = [r for r in rows if r.get(col) is not None]
+                missing = [r for r in rows if r.get(col) is None]
+                present.sort(key=lambda r: r[col], reverse=desc)
+                rows = missing + present if desc else present + missing
+            total = len(rows)
+            offset = int(q.get("offset", 0))
+            rows = rows[offset:]
+            if "limit" in q:
+                rows = rows[:int(q["limit"])]
+            if "count=" in prefer:
+                end = offset + len(rows) - 1
+                headers["content-range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+            return 200, headers, self._project(rows, q.get("select", "*"))
+
+        if method == "POST":
+            items = body if isinstance(body, list) else [body]
+            conflict = q.get("on_conflict") or _PRIMARY_KEYS.get(table, "id")
+            keys = [k.strip() for k in conflict.split(",")]
+            upsert = "resolution=" in prefer
+            ignore = "ignore-duplicates" in prefer
+            table_rows = self.tables.setdefault(table, [])
+            out = []
+            for item in items:
+                existing = None
+                if upsert and all(k in item for k in keys):
+                    existing = next((r for r in table_rows if all(r.get(k) == item[k] for k in keys)), None)
+                if existing is not None:
+                    if not ignore:
+                        existing.update(item)
+                        out.append(existing)
+                    continue
+                row = self._fill(item)
+                table_rows.append(row)
+                out.append(row)
+            return 201, headers, [dict(r) for r in out]
+
+        if method == "PATCH":
+            rows = self._filtered(table, params)
+            for r in rows:
+                r.update(body or {})
+            return 200, headers, [dict(r) for r in rows]
+
+        if method == "DELETE":
+            doomed = self._filtered(table, params)
+            ids = {id(r) for r in doomed}
+            self.tables[table] = [r for r in self.tables.get(table, []) if id(r) not in ids]
+            return 200, headers, [dict(r) for r in doomed]
+
+        return 405, headers, {"message": f"{method} stöds inte"}
+
+
+# ── Router ─────────────────────────────────────────────────────────────
+
+class FakeUpstream:
+    """All upstreams behind one path router. `calls` counts requests per service."""
+
+    def __init__(self, market: MarketData | None = None, store: PostgrestStore | None = None):
+        self.market = market or MarketData()
+        self.store = store or PostgrestStore()
+        self.news = sorted((FIXTURES / "news").glob("*.xml"))
+        self.calls: dict[str, int] = {}
+
+    def service(self, method: str, path: str) -> str:
+        if path.startswith("/api/market/"):
+            return "market"
+        if path.startswith("/rss/"):
+            return "news"
+        if "/insynshandel/" in path:
+            return "fi"
+        if ":generateContent" in path:
+            return "gemini"
+        if path.startswith("/rest/v1/"):
+            return "supabase"
+        if method == "POST" and path.count("/") == 1:
+            return "ntfy"
+        return "unknown"
+
+    def handle(self, method: str, path: str, params: list[tuple[str, str]], headers: dict, body: bytes) -> tuple[int, dict, bytes]:
+        """Answer one request. `headers` must have lowercase keys."""
+        service = self.service(method, path)
+        self.calls[service] = self.calls.get(service, 0) + 1
+        handler = getattr(self, f"_{service}", None)
+        if handler is None:
+            return 404, {}, b"not found"
+        return handler(method, path, params, headers, body)
+
+    @staticmethod
+    def _json(status: int, payload, headers: dict | None = None) -> tuple[int, dict, bytes]:
+        return status, {"content-type": "application/json", **(headers or {})}, json.dumps(payload).encode("utf-8")
+
+    def _market(self, method, path, params, headers, body):
+        ticker = unquote(path[len("/api/market/"):])
+        q = dict(params)
+        kind = q.get("type", "price")
+        if kind == "earnings":
+            return self._json(200, {"earnings_date": self.market.earnings(ticker)})
+        if kind == "history":
+            return self._json(200, {"data": self.market.history(ticker, int(q.get("days", 365)))})
+        return self._json(200, self.market.quote(ticker))
+
+    def _news(self, method, path, params, headers, body):
+        if not self.news:
+            return 200, {"content-type": "application/rss+xml"}, b"<rss><channel></channel></rss>"
+        query = dict(params).get("q", "")
+        feed = self.news[_seed("news", query) % len(self.news)]
+        etag = f'"{_seed(feed.name):x}"'
+        if headers.get("if-none-match") == etag:
+            return 304, {"etag": etag}, b""
+        return 200, {"content-type": "application/rss+xml", "etag": etag}, feed.read_bytes()
+
+    def _fi(self, method, path, params, headers, body):
+        import instruments
+        q = dict(params)
+        since = q.get("fromTransactionDate", "")
+        issuer = q.get("issuerName")
+        out = []
+        for inst in instruments.universe():
+            if issuer and issuer.lower() not in inst.name.lower():
+                continue
+            rng = random.Random(_seed("fi", inst.ticker))
+            for _ in range(rng.choice((0, 0, 0, 1, 2, 3))):
+                day = (date.today() - timedelta(days=rng.randint(0, 40))).isoformat()
+                if day < since:
+                    continue
+                out.append({
+                    "issuer": f"{inst.name} AB",
+                    "person": f"Insider {rng.randint(1, 99)}",
+                    "position": rng.choice(("VD", "Styrelseledamot", "CFO")),
+                    "typeOfTransaction": rng.choice(("Förvärv", "Avyttring", "Teckning")),
+                    "volume": rng.randint(500, 50_000),
+                    "price": round(rng.uniform(20, 400), 2),
+                    "transactionDate": day,
+                })
+        return self._json(200, out)
+
+    def _gemini(self, method, path, params, headers, body):
+        prompt = ""
+        try:
+            prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError):
+            pass
+        rng = random.Random(_seed("gemini", prompt))
+        if "Svara ENDAST med JSON" in prompt:
+            score = round(rng.uniform(-1, 1), 2)
+            label = "POSITIVE" if score > 0.3 else "NEGATIVE" if score < -0.3 else "NEUTRAL"
+            text = json.dumps({"sentiment": label, "score": score, "reason": "Simulerat svar"}, ensure_ascii=False)
+        else:
+            text = "Simulerad förklaring: tekniska indikatorer och volym pekar åt samma håll."
+        return self._json(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+        })
+
+    def _supabase(self, method, path, params, headers, body):
+        table = path[len("/rest/v1/"):].strip("/")
+        payload = json.loads(body) if body else None
+        status, extra, data = self.store.handle(method, table, params, headers.get("prefer", ""), payload)
+        return self._json(status, data, extra)
+
+    def _ntfy(self, method, path, params, headers, body):
+        return self._json(200, {"id": uuid.uuid4().hex[:12], "topic": path.strip("/"), "event": "message"})
+
+    def httpx_handler(self, request: httpx.Request) -> httpx.Response:
+        status, headers, content = self.handle(
+            request.method,
+            request.url.path,
+            parse_qsl(request.url.query.decode("ascii"), keep_blank_values=True),
+            {k.lower(): v for k, v in request.headers.items()},
+            request.content,
+        )
+        return httpx.Response(status, headers=headers, content=content)
+
+
+# Syntetisk JWT — supabase-py kontrollerar bara formatet
+FAKE_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+
+@contextlib.contextmanager
+def install(upstream: FakeUpstream, base_url: str = "http://upstream.local"):
+    """Route all httpx clients created inside the block to `upstream`.
+
+    Also points FRONTEND_URL/SUPABASE_URL at `base_url` and resets the cached
+    Supabase and Gemini clients, so import order does not matter.
+    """
+    transport = httpx.MockTransport(upstream.httpx_handler)  # fungerar för både Client och AsyncClient
+    sync_init, async_init = httpx.Client.__init__, httpx.AsyncClient.__init__
+
+    def patched_sync(self, *args, **kwargs):
+        kwargs["transport"] = transport
+        sync_init(self, *args, **kwargs)
+
+    def patched_async(self, *args, **kwargs):
+        kwargs["transport"] = transport
+        async_init(self, *args, **kwargs)
+
+    env = {"FRONTEND_URL": base_url, "SUPABASE_URL": base_url, "SUPABASE_KEY": FAKE_SUPABASE_KEY,
+           "GEMINI_API_KEY": "bench"}
+    saved_env = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    httpx.Client.__init__, httpx.AsyncClient.__init__ = patched_sync, patched_async
+    try:
+        import config
+        from data import yahoo_client, news_fetcher
+        from db import supabase_client
+        from analysis import sentiment
+        from google import genai
+        config.FRONTEND_URL = yahoo_client.FRONTEND_URL = base_url
+        supabase_client._client = None
+        supabase_client.SUPABASE_URL, supabase_client.SUPABASE_KEY = base_url, FAKE_SUPABASE_KEY
+        news_fetcher._client = None
+        sentiment._client = genai.Client(api_key="bench")
+        yield upstream
+    finally:
+        httpx.Client.__init__, httpx.AsyncClient.__init__ = sync_init, async_init
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
@@ -16,7 +16,20 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemma-3-27b-it")
 
 # Ntfy
 NTFY_TOPIC = os.getenv("NTFY_TOPIC", "mike_stock_73")
-NTFY_URL = f"https://ntfy.sh/{NTFY_TOPIC}"
+NTFY_SERVER = os.getenv("NTFY_SERVER", "https://ntfy.sh").rstrip("/")
+NTFY_URL = f"{NTFY_SERVER}/{NTFY_TOPIC}"
+
+# Övriga upstreams — kan pekas om mot den lokala simulatorn (bench/simulator.py)
+GOOGLE_NEWS_URL = os.getenv("GOOGLE_NEWS_URL", "https://news.google.com").rstrip("/")
+FI_URL = os.getenv("FI_URL", "https://www.fi.se").rstrip("/")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "").rstrip("/")  # tom = Googles standard-endpoint
+
+# Trace-export (tracing.py): "file:/sökväg.jsonl", "otlp:http://collector:4318" eller tomt (bara i minnet)
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+
+# Retention (retention.py): rå intradagsrader i stock_prices/stock_indicators sparas så här
+# många dagar, äldre rullas upp till en rad per ticker och dag
+RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", "14"))
 
 # Frontend URL (used in ntfy links)
 FRONTEND_URL = os.getenv("FRONTEND_URL", "").rstrip("/")
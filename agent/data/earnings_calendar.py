@@ -0,0 +1,154 @@
+"""
+Earnings calendar for the whole STOCK_UNIVERSE, plus watchlist and
+open-position tickers outside it, persisted in Supabase.
+
+refresh_earnings_calendar() fetches every report date through the proxy in
+one batch job and upserts them to stock_earnings_calendar. Every instance
+loads the table into a date-sorted index at startup and after the daily
+refresh, so the hot path (process_ticker, morning_check) never waits on
+an earnings HTTP request and "which tickers report in the next N days" is
+a bisect range lookup.
+
+Supabase table (run once):
+
+    CREATE TABLE stock_earnings_calendar (
+      ticker TEXT PRIMARY KEY,
+      report_date DATE,
+      fetched_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    CREATE INDEX ON stock_earnings_calendar (report_date);
+"""
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+_FETCH_CONCURRENCY = 4
+
+# ticker -> report date, plus (date, ticker) sorted for range lookups
+_by_ticker: dict[str, date] = {}
+_by_date: list[tuple[date, str]] = []
+_loaded = False
+
+
+def _rebuild(rows: dict[str, date]):
+    global _by_ticker, _by_date, _loaded
+    _by_ticker = dict(rows)
+    _by_date = sorted((d, t) for t, d in rows.items())
+    _loaded = True
+
+
+def is_loaded() -> bool:
+    return _loaded
+
+
+async def load_earnings_calendar() -> int:
+    """Load the persisted calendar from Supabase into memory."""
+    try:
+        from db.supabase_client import get_client
+        result = get_client().table("stock_earnings_calendar").select("ticker,report_date").execute()
+    except Exception as e:
+        logger.warning(f"Kunde inte ladda rapportkalender från DB: {e}")
+        return 0
+    rows = {
+        r["ticker"]: date.fromisoformat(r["report_date"][:10])
+        for r in (result.data or []) if r.get("report_date")
+    }
+    _rebuild(rows)
+    logger.info(f"Rapportkalender laddad: {len(rows)} bolag med kommande rapportdatum")
+    return len(rows)
+
+
+async def _calendar_tickers() -> list[str]:
+    """STOCK_UNIVERSE plus the active watchlist and open positions, which may lie outside it."""
+    from db import supabase_client as db
+    from stock_scanner import STOCK_UNIVERSE
+    tickers = list(STOCK_UNIVERSE)
+    try:
+        tickers += [s["ticker"] for s in await db.get_watchlist()]
+        tickers += [t["ticker"] for t in await db.get_open_trades()]
+    except Exception as e:
+        logger.warning(f"Kunde inte läsa watchlist/positioner till rapportkalendern: {e}")
+    return list(dict.fromkeys(tickers))
+
+
+async def refresh_earnings_calendar(tickers: list[str] | None = None) -> int:
+    """Fetch report dates for `tickers` (default: universe + watchlist + open positions) in one batch and persist them."""
+    from data.yahoo_client import get_earnings_date
+    from db.supabase_client import get_client
+    if tickers is None:
+        tickers = await _calendar_tickers()
+
+    sem = asyncio.Semaphore(_FETCH_CONCURRENCY)
+
+    async def one(ticker):
+        async with sem:
+            try:
+                # Förbi 24h-cachen — annars sparar den dagliga körningen om gårdagens värden
+                return ticker, await get_earnings_date(ticker, refresh=True)
+            except Exception as e:
+                logger.debug(f"{ticker}: Kunde inte hämta rapportdatum: {e}")
+                return ticker, None
+
+    results = await asyncio.gather(*(one(t) for t in tickers))
+    now_iso = datetime.now(timezone.utc).isoformat()
+    # Bara hittade datum — en misslyckad hämtning (None) får inte radera ett känt datum i tabellen
+    rows = [{"ticker": t, "report_date": d[:10], "fetched_at": now_iso} for t, d in results if d]
+    if rows:
+        try:
+            get_client().table("stock_earnings_calendar").upsert(rows, on_conflict="ticker").execute()
+        except Exception as e:
+            logger.warning(f"Kunde inte spara rapportkalender: {e}")
+
+    found = {t: date.fromisoformat(d[:10]) for t, d in results if d}
+    # Behåll tidigare kända datum för tickers vars hämtning misslyckades
+    _rebuild({**_by_ticker, **found})
+    logger.info(f"Rapportkalender uppdaterad: {len(found)}/{len(tickers)} bolag med rapportdatum")
+    return len(found)
+
+
+async def load_or_refresh() -> int:
+    """Startup: load the persisted calendar, and fetch it if there is nothing to load.
+
+    Without this a first deploy (empty table) would have no report dates,
+    and no 48h report penalty, until the next 07:15 refresh.
+    """
+    from stock_scanner import STOCK_UNIVERSE
+    count = await load_earnings_calendar()
+    tickers = await _calendar_tickers()
+    if not _by_ticker:
+        logger.info("Rapportkalendern är tom — hämtar den nu")
+        return await refresh_earnings_calendar(tickers)
+    # Watchlist/positioner utanför universumet som tabellen inte har — få, hämtas direkt
+    extra = [t for t in tickers if t not in STOCK_UNIVERSE and t not in _by_ticker]
+    if extra:
+        await refresh_earnings_calendar(extra)
+    return count
+
+
+def get_report_date(ticker: str) -> date | None:
+    return _by_ticker.get(ticker)
+
+
+def reporting_between(start: date, end: date) -> list[tuple[date, str]]:
+    """(date, ticker) for all reports with start <= date <= end, in date order."""
+    lo = bisect_left(_by_date, (start, ""))
+    hi = bisect_right(_by_date, (end, "\uffff"))
+    return _by_date[lo:hi]
+
+
+def reporting_within(days: int, today: date | None = None) -> list[tuple[date, str]]:
+    """Reports in the next `days` days (today included)."""
+    today = today or date.today()
+    return reporting_between(today, today + timedelta(days=days))
+
+
+def has_report_soon(ticker: str, days: int = 2, today: date | None = None) -> bool:
+    """True if `ticker` reports within `days` days (0 = today)."""
+    report = _by_ticker.get(ticker)
+    if report is None:
+        return False
+    delta = (report - (today or date.today())).days
+    return 0 <= delta <= days
@@ -1,61 +1,183 @@
+"""
+Insider trades from Finansinspektionen's insider register.
+
+The register is pulled in bulk (one date window for all issuers) by
+refresh_insider_register(), scheduled every 30 minutes, and indexed in
+memory by normalized issuer name. fetch_insider_trades() then answers from
+the index without any network call. Only if the index has never loaded
+(FI down at startup) does it fall back to a rate-limited per-issuer call.
+"""
+import asyncio
 import logging
+import re
+import time
 import httpx
 from datetime import datetime, timedelta
 from typing import List, Dict
+from config import FI_URL
+import tracing
 
 logger = logging.getLogger(__name__)
 
-FI_INSIDER_URL = "https://www.fi.se/sv/vara-register/insynshandel/GetInsynshandel/"
+FI_INSIDER_URL = f"{FI_URL}/sv/vara-register/insynshandel/GetInsynshandel/"
 
+_REGISTER_DAYS = 30            # datumfönster som hämtas i bulk
+_MIN_REFRESH_INTERVAL = 5 * 60  # max en bulk-hämtning per 5 min (manuella + schemalagda)
+_FALLBACK_TTL = 6 * 3600       # cache för per-bolag-anrop när indexet saknas
+_FALLBACK_CONCURRENCY = 2
+
+# normaliserat bolagsnamn -> lista av transaktioner (nyast först)
+_by_issuer: dict[str, list[dict]] = {}
+# sökt bolagsnamn -> normaliserad nyckel i _by_issuer ("" = ingen träff)
+_resolved: dict[str, str] = {}
+_loaded_at: float = 0.0
+_fallback_cache: dict[str, tuple] = {}
+_fallback_sem = asyncio.Semaphore(_FALLBACK_CONCURRENCY)
+
+insider_stats = {"refreshes": 0, "refresh_errors": 0, "issuers": 0, "trades": 0, "fallback_calls": 0}
+
+_STOPWORDS = {"ab", "publ", "asa", "oyj", "plc", "sdb", "ser", "series", "a", "b", "c", "group", "holding"}
+
+
+def normalize_issuer(name: str) -> str:
+    """'Atlas Copco AB (publ)', 'Atlas Copco A' -> 'atlas copco'."""
+    n = re.sub(r"[^0-9a-zåäöéü ]", " ", (name or "").lower())
+    return " ".join(t for t in n.split() if t not in _STOPWORDS)
 
-async def fetch_insider_trades(ticker: str, company_name: str = None, days: int = 30) -> List[Dict]:
-    """Fetch insider trades from Finansinspektionen's open API.
-    FI's API searches by company name (e.g. 'Evolution AB'), not ticker symbol.
-    Pass company_name for accurate results; falls back to ticker if not provided.
-    """
-    from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-    search_name = company_name or ticker
 
-    params = {
-        "issuerName": search_name,
-        "fromTransactionDate": from_date,
+def _to_trade(item: dict, ticker: str | None = None) -> dict:
+    return {
+        "ticker": ticker,
+        "issuer": item.get("issuer") or item.get("issuerName"),
+        "person": item.get("person"),
+        "role": item.get("position"),
+        "action": item.get("typeOfTransaction", ""),
+        "amount": (item.get("volume") or 0) * (item.get("price") or 0),
+        "price": item.get("price"),
+        "quantity": item.get("volume"),
+        "date": item.get("transactionDate"),
     }
 
-    try:
+
+async def _get_register(params: dict, timeout: float = 15) -> list:
+    with tracing.span("http.fi", bulk="issuerName" not in params) as sp:
         async with httpx.AsyncClient() as client:
-            resp = await client.get(FI_INSIDER_URL, params=params, timeout=15)
-    except Exception as e:
-        logger.warning(f"{ticker}: FI insider-anrop misslyckades: {e}")
-        return []
+            resp = await client.get(FI_INSIDER_URL, params=params, timeout=timeout)
+        sp.attrs["status"] = resp.status_code
+    resp.raise_for_status()
+    data = resp.json()
+    return data if isinstance(data, list) else []
 
-    if resp.status_code != 200:
-        logger.warning(f"{ticker}: FI returnerade HTTP {resp.status_code} for '{search_name}'")
-        return []
 
+async def refresh_insider_register(days: int = _REGISTER_DAYS, force: bool = False) -> int:
+    """Pull the FI register for the last `days` days (all issuers) and rebuild the index.
+
+    Returns the number of indexed trades. Keeps the old index on failure.
+    """
+    global _by_issuer, _resolved, _loaded_at
+    if not force and _loaded_at and time.monotonic() - _loaded_at < _MIN_REFRESH_INTERVAL:
+        return insider_stats["trades"]
+
+    from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
     try:
-        data = resp.json()
+        data = await _get_register({"fromTransactionDate": from_date}, timeout=60)
     except Exception as e:
-        logger.warning(f"{ticker}: FI JSON-parsningsfel: {e}")
-        return []
+        insider_stats["refresh_errors"] += 1
+        logger.warning(f"FI bulk-hämtning misslyckades: {e} — behåller befintligt index")
+        return insider_stats["trades"]
 
-    trades = []
+    index: dict[str, list[dict]] = {}
     for item in data:
-        trades.append({
-            "ticker": ticker,
-            "person": item.get("person"),
-            "role": item.get("position"),
-            "action": item.get("typeOfTransaction", ""),
-            "amount": (item.get("volume") or 0) * (item.get("price") or 0),
-            "price": item.get("price"),
-            "quantity": item.get("volume"),
-            "date": item.get("transactionDate"),
-        })
+        trade = _to_trade(item)
+        key = normalize_issuer(trade["issuer"] or "")
+        if key:
+            index.setdefault(key, []).append(trade)
+    if data and not index:
+        # Rader men inget bolagsnamn att indexera på (ändrat fältnamn hos FI?) — ett tomt
+        # index skulle tyst ge [] för alla bolag, så räkna det som en misslyckad hämtning
+        insider_stats["refresh_errors"] += 1
+        logger.warning(
+            f"FI bulk-hämtning: {len(data)} transaktioner men inget bolagsnamn "
+            f"(fält: {sorted(data[0])[:12]}) — behåller befintligt index"
+        )
+        return insider_stats["trades"]
+    for trades in index.values():
+        trades.sort(key=lambda t: t["date"] or "", reverse=True)
 
+    _by_issuer = index
+    _resolved = {}
+    _loaded_at = time.monotonic()
+    insider_stats["refreshes"] += 1
+    insider_stats["issuers"] = len(index)
+    insider_stats["trades"] = len(data)
+    logger.info(f"FI insiderregister laddat: {len(data)} transaktioner, {len(index)} bolag (senaste {days} dagar)")
+    return len(data)
+
+
+# Visningsnamn (normaliserat) -> FI:s emittentnamn (normaliserat) där de inte stämmer överens
+_ISSUER_ALIASES = {
+    "ericsson": "telefonaktiebolaget lm ericsson",
+    "h m": "h m hennes mauritz",
+    "seb": "skandinaviska enskilda banken",
+    "handelsbanken": "svenska handelsbanken",
+    "volvo cars": "volvo car",
+}
+
+
+def _resolve(search_name: str) -> str:
+    """Map a company name to its key in the index ("" = no trades). Exact match after
+    normalization, or via _ISSUER_ALIASES — never the nearest name: 'Volvo B' must not
+    pick up 'Volvo Car' trades. Cached."""
+    if search_name in _resolved:
+        return _resolved[search_name]
+    key = normalize_issuer(search_name)
+    key = _ISSUER_ALIASES.get(key, key)
+    if key not in _by_issuer:
+        key = ""
+    _resolved[search_name] = key
+    return key
+
+
+async def fetch_insider_trades(ticker: str, company_name: str = None, days: int = 30) -> List[Dict]:
+    """Insider trades for a company from the in-memory FI index.
+    FI's register is keyed by company name (e.g. 'Evolution AB'), not ticker symbol.
+    Pass company_name for accurate results; falls back to ticker if not provided.
+    """
+    search_name = company_name or ticker
+    tracing.annotate(cache_hit=bool(_loaded_at))  # bulk-indexet i minnet
+    if not _loaded_at:
+        return await _fetch_single_issuer(ticker, search_name, days)
+
+    key = _resolve(search_name)
+    if not key:
+        return []
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    trades = [{**t, "ticker": ticker} for t in _by_issuer[key] if (t["date"] or "") >= cutoff]
     if trades:
-        logger.info(f"{ticker}: {len(trades)} insidertransaktioner fran FI (senaste {days} dagar)")
-    else:
-        logger.debug(f"{ticker}: inga insidertransaktioner fran FI")
+        logger.debug(f"{ticker}: {len(trades)} insidertransaktioner i FI-index (senaste {days} dagar)")
+    return trades
+
 
+async def _fetch_single_issuer(ticker: str, search_name: str, days: int) -> List[Dict]:
+    """Per-issuer FI call — only used until the bulk index has loaded once."""
+    cache_key = f"{search_name}:{days}"
+    cached = _fallback_cache.get(cache_key)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+
+    from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    async with _fallback_sem:
+        insider_stats["fallback_calls"] += 1
+        try:
+            data = await _get_register({"issuerName": search_name, "fromTransactionDate": from_date})
+        except Exception as e:
+            logger.warning(f"{ticker}: FI insider-anrop misslyckades: {e}")
+            return []
+
+    trades = [_to_trade(item, ticker) for item in data]
+    _fallback_cache[cache_key] = (trades, time.monotonic() + _FALLBACK_TTL)
+    if trades:
+        logger.info(f"{ticker}: {len(trades)} insidertransaktioner fran FI (senaste {days} dagar)")
     return trades
 
 
@@ -1,34 +1,72 @@
+"""
+News ingestion via Google News RSS.
+
+Feeds are polled concurrently over one shared HTTP client with conditional
+GET (ETag / If-Modified-Since), so an unchanged feed costs a 304 and no
+parsing. Changed feeds are parsed incrementally while the body streams in,
+and parsing stops after the first max_items entries (RssItemParser) — the
+rest of a 100-item Google News feed is never turned into objects.
+Headlines are identified by a content hash (normalized title without the
+" - Källa" suffix) and deduplicated across tickers: the same bank or
+A/B-share headline is only "new" the first time it is seen, and the
+sentiment cache is keyed on the same hash.
+"""
+import asyncio
+import hashlib
+import logging
+import re
 import feedparser
 import httpx
 import time
+import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict
+from config import GOOGLE_NEWS_URL
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
 
 GOOGLE_NEWS_RSS = (
-    "https://news.google.com/rss/search?q={query}&hl=sv&gl=SE&ceid=SE:sv"
+    GOOGLE_NEWS_URL + "/rss/search?q={query}&hl=sv&gl=SE&ceid=SE:sv"
 )
 
-# Cache: (ticker, company_name) -> (result, expires_at) — 30 minuters TTL
-_news_cache: dict[tuple, tuple] = {}
-_NEWS_TTL = 30 * 60  # 30 minuter
+_NEWS_TTL = 10 * 60       # hur länge ett flöde räknas som färskt (villkorlig GET efter det)
+_POLL_CONCURRENCY = 5
+_MAX_SEEN = 5000
 
+# Per flöde: url -> {"etag", "last_modified", "items", "expires"}
+_feeds: dict[str, dict] = {}
+# Innehållshash -> första ticker rubriken sågs under (dedup över tickers)
+_first_seen: dict[str, str] = {}
+_client: httpx.AsyncClient | None = None
 
-async def fetch_news(ticker: str, company_name: str, max_items: int = 5) -> List[Dict]:
-    """Fetch latest news for a ticker via Google News RSS (cached 30 min)."""
-    cache_key = (ticker, company_name)
-    cached_entry = _news_cache.get(cache_key)
-    if cached_entry and time.monotonic() < cached_entry[1]:
-        return cached_entry[0]
+news_stats = {"requests": 0, "not_modified": 0, "parsed": 0, "new_items": 0, "duplicates": 0}
 
-    query = f"{company_name} aktie".replace(" ", "+")
-    url = GOOGLE_NEWS_RSS.format(query=query)
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        resp = await client.get(url, timeout=10)
-        resp.raise_for_status()
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(follow_redirects=True, timeout=10)
+    return _client
+
 
-    feed = feedparser.parse(resp.text)
+def content_hash(headline: str) -> str:
+    """Stable ID for a headline across feeds: lowercased, source suffix and punctuation removed."""
+    title = re.sub(r"\s+-\s+[^-]+$", "", headline or "")
+    title = re.sub(r"[^0-9a-zåäöéü]+", " ", title.lower()).strip()
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
 
+
+def _feed_url(company_name: str) -> str:
+    query = f"{company_name} aktie".replace(" ", "+")
+    return GOOGLE_NEWS_RSS.format(query=query)
+
+
+def _parse_entries(text: str | bytes, ticker: str, max_items: int) -> List[Dict]:
+    """Full parse with feedparser — fallback for feeds the streaming parser rejects."""
+    feed = feedparser.parse(text)
     news = []
     for entry in feed.entries[:max_items]:
         published = None
@@ -42,6 +80,177 @@ async def fetch_news(ticker: str, company_name: str, max_items: int = 5) -> List
             "source": entry.get("source", {}).get("title", "Google News"),
             "published_at": published,
         })
-
-    _news_cache[cache_key] = (news, time.monotonic() + _NEWS_TTL)
     return news
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+class RssItemParser:
+    """Incremental RSS parser: feed() it chunks, it stops after `max_items` <item>s.
+
+    Only title, link, source and pubDate are extracted and each <item> is
+    cleared once read, so cost depends on `max_items`, not on feed size.
+    If the XML is not well-formed (stray HTML entities etc.) it switches to
+    buffering the whole body and close() falls back to feedparser.
+    """
+
+    __slots__ = ("ticker", "max_items", "items", "done", "_parser", "_raw", "_fallback")
+
+    def __init__(self, ticker: str, max_items: int):
+        self.ticker = ticker
+        self.max_items = max_items
+        self.items: List[Dict] = []
+        self.done = False
+        self._parser = ET.XMLPullParser(events=("end",))
+        self._raw: list[bytes] = []   # bara tills vi är klara — behövs för fallback
+        self._fallback = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a chunk. Returns True once enough items have been read."""
+        if self.done:
+            return True
+        self._raw.append(chunk)
+        if self._fallback:
+            return False
+        try:
+            self._parser.feed(chunk)
+            for _, elem in self._parser.read_events():
+                if elem.tag.rsplit("}", 1)[-1] != "item":
+                    continue
+                self.items.append(self._to_item(elem))
+                elem.clear()
+                if len(self.items) >= self.max_items:
+                    self.done = True
+                    self._raw = []
+                    return True
+        except ET.ParseError as e:
+            logger.debug(f"{self.ticker}: RSS ej välformad ({e}) — faller tillbaka på feedparser")
+            self._fallback = True
+        return False
+
+    def close(self) -> List[Dict]:
+        if self._fallback:
+            return _parse_entries(b"".join(self._raw), self.ticker, self.max_items)
+        return self.items
+
+    def _to_item(self, elem) -> Dict:
+        fields = {child.tag.rsplit("}", 1)[-1]: child for child in elem}
+        source = fields.get("source")
+        return {
+            "ticker": self.ticker,
+            "headline": (fields["title"].text or "").strip() if "title" in fields else "",
+            "url": (fields["link"].text or "").strip() if "link" in fields else "",
+            "source": (source.text or "").strip() if source is not None and source.text else "Google News",
+            "published_at": _parse_date(fields["pubDate"].text if "pubDate" in fields else None),
+        }
+
+
+def parse_feed(data: bytes, ticker: str, max_items: int, chunk_size: int = 4096) -> List[Dict]:
+    """Stream-parse an in-memory feed body (used by the benchmark and the simulator)."""
+    parser = RssItemParser(ticker, max_items)
+    for i in range(0, len(data), chunk_size):
+        if parser.feed(data[i:i + chunk_size]):
+            break
+    return parser.close()
+
+
+def _tag(items: List[Dict], ticker: str, known: set[str]) -> List[Dict]:
+    """Attach content_hash/is_new/duplicate_of. A headline is new only the first
+    time it is seen under any ticker; `known` are the hashes already in this feed."""
+    out = []
+    for item in items:
+        h = content_hash(item["headline"])
+        first = _first_seen.get(h)
+        if first is None:
+            _first_seen[h] = first = ticker
+            news_stats["new_items"] += 1
+            is_new = True
+        else:
+            is_new = False
+            if first != ticker and h not in known:
+                news_stats["duplicates"] += 1
+        out.append({**item, "content_hash": h, "is_new": is_new, "duplicate_of": first if first != ticker else None})
+
+    # Begränsa minnet — äldsta hashar först ut (dict behåller insättningsordning)
+    while len(_first_seen) > _MAX_SEEN:
+        del _first_seen[next(iter(_first_seen))]
+    return out
+
+
+async def _poll_feed(ticker: str, company_name: str, max_items: int) -> List[Dict]:
+    url = _feed_url(company_name)
+    state = _feeds.get(url, {})
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    news_stats["requests"] += 1
+    with tracing.span("http.news", ticker=ticker, conditional=bool(headers)) as sp:
+        async with _get_client().stream("GET", url, headers=headers) as resp:
+            sp.attrs["status"] = resp.status_code
+            if resp.status_code == 304 and "items" in state:
+                news_stats["not_modified"] += 1
+                state["expires"] = time.monotonic() + _NEWS_TTL
+                return state["items"]
+            resp.raise_for_status()
+
+            parser = RssItemParser(ticker, max_items)
+            async for chunk in resp.aiter_bytes():
+                # När parsern är klar läses resten förbi utan tolkning, så att
+                # keep-alive-anslutningen kan återanvändas av nästa flöde
+                parser.feed(chunk)
+            entries = parser.close()
+
+    news_stats["parsed"] += 1
+    known = {i["content_hash"] for i in state.get("items", [])}
+    items = _tag(entries, ticker, known)
+
+    _feeds[url] = {
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+        # Sparade exemplar är inte längre "nya" — ett 304 ska inte ge nya rubriker igen
+        "items": [{**i, "is_new": False} for i in items],
+        "expires": time.monotonic() + _NEWS_TTL,
+    }
+    return items
+
+
+async def fetch_news(ticker: str, company_name: str, max_items: int = 5) -> List[Dict]:
+    """Fetch latest news for a ticker via Google News RSS (fresh for 10 min, then conditional GET)."""
+    state = _feeds.get(_feed_url(company_name))
+    fresh = bool(state and time.monotonic() < state["expires"])
+    tracing.annotate(cache_hit=fresh)
+    metrics.cache_lookup("news", fresh)
+    if fresh:
+        return state["items"][:max_items]
+    items = await _poll_feed(ticker, company_name, max_items)
+    return items[:max_items]
+
+
+async def ingest(companies: dict[str, str], max_items: int = 5) -> dict[str, List[Dict]]:
+    """Poll all feeds concurrently. Returns only headlines never seen before (across all tickers)."""
+    sem = asyncio.Semaphore(_POLL_CONCURRENCY)
+
+    async def one(ticker, company):
+        async with sem:
+            try:
+                return ticker, await _poll_feed(ticker, company, max_items)
+            except Exception as e:
+                logger.debug(f"{ticker}: nyhetsflöde misslyckades: {e}")
+                return ticker, []
+
+    results = await asyncio.gather(*(one(t, c) for t, c in companies.items()))
+    fresh = {t: [i for i in items if i["is_new"]] for t, items in results}
+    fresh = {t: items for t, items in fresh.items() if items}
+    if fresh:
+        logger.info(f"Nyhetsinläsning: {sum(len(v) for v in fresh.values())} nya rubriker för {len(fresh)} aktier")
+    return fresh
@@ -6,6 +6,10 @@ from typing import Optional
 import httpx
 import pandas as pd
 
+import instruments
+import metrics
+import tracing
+
 logger = logging.getLogger(__name__)
 
 # Vercel frontend acts as Yahoo Finance proxy (Railway IPs are blocked by Yahoo)
@@ -19,9 +23,9 @@ _PRICE_TTL   = 60    # 1 minute
 
 def _get_cache(key: str):
     entry = _cache.get(key)
-    if entry and time.monotonic() < entry[1]:
-        return entry[0]
-    return None
+    hit = bool(entry and time.monotonic() < entry[1])
+    metrics.cache_lookup("market", hit)
+    return entry[0] if hit else None
 
 
 def _set_cache(key: str, value, ttl: int):
@@ -30,29 +34,33 @@ def _set_cache(key: str, value, ttl: int):
 
 async def get_price_history(ticker: str, days: int = 220) -> pd.DataFrame:
     """Fetch historical OHLCV data via Vercel proxy (cached)."""
+    ticker = instruments.canonical(ticker)  # en cachepost per instrument oavsett stavning
     cache_key = f"history:{ticker}:{days}"
     cached = _get_cache(cache_key)
     if cached is not None:
+        tracing.record("market.history", time.time_ns(), ticker=ticker, cache_hit=True)
         return cached
 
     url = f"{FRONTEND_URL}/api/market/{ticker}?type=history&days={days}"
 
     # Retry with backoff for transient errors (rate-limit, timeout)
     last_err = None
-    for attempt in range(3):
-        try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-            break
-        except (httpx.HTTPStatusError, httpx.TimeoutException, httpx.ConnectError) as e:
-            last_err = e
-            if attempt < 2:
-                wait = (attempt + 1) * 2  # 2s, 4s
-                logger.debug(f"Yahoo retry {attempt+1}/2 for {ticker}: {e} — waiting {wait}s")
-                await asyncio.sleep(wait)
-    else:
-        raise last_err  # type: ignore[misc]
+    with tracing.span("market.history", ticker=ticker, cache_hit=False) as sp:
+        for attempt in range(3):
+            sp.attrs["attempts"] = attempt + 1
+            try:
+                async with httpx.AsyncClient(timeout=30) as client:
+                    resp = await client.get(url)
+                    resp.raise_for_status()
+                break
+            except (httpx.HTTPStatusError, httpx.TimeoutException, httpx.ConnectError) as e:
+                last_err = e
+                if attempt < 2:
+                    wait = (attempt + 1) * 2  # 2s, 4s
+                    logger.debug(f"Yahoo retry {attempt+1}/2 for {ticker}: {e} — waiting {wait}s")
+                    await asyncio.sleep(wait)
+        else:
+            raise last_err  # type: ignore[misc]
 
     data = resp.json()
     if "error" in data or "data" not in data:
@@ -79,51 +87,65 @@ async def get_index_history(days: int = 220) -> pd.DataFrame:
     return await get_price_history("OMXS30", days)
 
 
-async def get_earnings_date(ticker: str) -> Optional[str]:
-    """Get next earnings date via Vercel proxy. Returns ISO date string or None. 24h cache."""
+async def get_earnings_date(ticker: str, refresh: bool = False) -> Optional[str]:
+    """Get next earnings date via Vercel proxy. Returns ISO date string or None. 24h cache.
+
+    refresh=True skips the cache lookup (the daily calendar refresh) but still stores the result.
+    """
+    ticker = instruments.canonical(ticker)  # en cachepost per instrument oavsett stavning
     cache_key = f"earnings:{ticker}"
-    cached = _get_cache(cache_key)
+    cached = None if refresh else _get_cache(cache_key)
     if cached is not None:
+        tracing.record("market.earnings", time.time_ns(), ticker=ticker, cache_hit=True)
         return cached
 
     url = f"{FRONTEND_URL}/api/market/{ticker}?type=earnings"
     date_str = None
-    try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(url)
-        data = resp.json()
-        date_str = data.get("earnings_date")
-    except Exception:
-        pass
+    with tracing.span("market.earnings", ticker=ticker, cache_hit=False) as sp:
+        try:
+            async with httpx.AsyncClient(timeout=15) as client:
+                resp = await client.get(url)
+            data = resp.json()
+            date_str = data.get("earnings_date")
+        except Exception as e:
+            sp.error = type(e).__name__
 
     _set_cache(cache_key, date_str, 86400)  # 24h
     return date_str
 
 
-async def get_current_price(ticker: str) -> dict:
-    """Get current price via Vercel proxy (cached)."""
+async def get_current_price(ticker: str, refresh: bool = False) -> dict:
+    """Get current price via Vercel proxy (cached).
+
+    refresh=True skips the cache lookup but still stores the fresh quote,
+    so a following process_ticker run reuses it.
+    """
+    ticker = instruments.canonical(ticker)
     cache_key = f"price:{ticker}"
-    cached = _get_cache(cache_key)
+    cached = None if refresh else _get_cache(cache_key)
     if cached is not None:
+        tracing.record("market.price", time.time_ns(), ticker=ticker, cache_hit=True)
         return cached
 
     url = f"{FRONTEND_URL}/api/market/{ticker}?type=price"
 
     last_err = None
-    for attempt in range(3):
-        try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-            break
-        except (httpx.HTTPStatusError, httpx.TimeoutException, httpx.ConnectError) as e:
-            last_err = e
-            if attempt < 2:
-                wait = (attempt + 1) * 2
-                logger.debug(f"Yahoo retry {attempt+1}/2 for {ticker} price: {e}")
-                await asyncio.sleep(wait)
-    else:
-        raise last_err  # type: ignore[misc]
+    with tracing.span("market.price", ticker=ticker, cache_hit=False) as sp:
+        for attempt in range(3):
+            sp.attrs["attempts"] = attempt + 1
+            try:
+                async with httpx.AsyncClient(timeout=15) as client:
+                    resp = await client.get(url)
+                    resp.raise_for_status()
+                break
+            except (httpx.HTTPStatusError, httpx.TimeoutException, httpx.ConnectError) as e:
+                last_err = e
+                if attempt < 2:
+                    wait = (attempt + 1) * 2
+                    logger.debug(f"Yahoo retry {attempt+1}/2 for {ticker} price: {e}")
+                    await asyncio.sleep(wait)
+        else:
+            raise last_err  # type: ignore[misc]
 
     data = resp.json()
     raw_price = data.get("price")
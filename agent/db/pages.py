@@ -0,0 +1,151 @@
+"""
+Keyset pagination, column projection and a page cache for the list endpoints
+(/api/signals, /api/trades, /api/news, /api/portfolio, /api/deposits).
+
+Pages are ordered by (<order column> DESC, id DESC). The id makes the order
+total, so rows that share a timestamp are neither repeated nor skipped
+between pages. The next page continues after the last row with
+
+    order < v  OR  (order = v AND id < last_id)
+
+which the index below answers with a range scan. The cost is the same for
+page 1 and page 1000, unlike OFFSET, which reads and discards every row
+before the page. The cursor is opaque to the client (base64 JSON of
+[order value, id]).
+
+?fields=a,b,c selects only those columns. Derived fields pick one key out
+of a JSON column instead of the whole blob: signal_description is
+indicators->>signal_description, a few bytes instead of ~20 indicator
+values per signal. The order column and id are always included.
+
+Each page is cached for _PAGE_TTL seconds, keyed by (table, fields,
+filters, cursor, limit). The write functions in supabase_client call
+invalidate(table), so a new signal or a closed trade shows up at once.
+
+Indexes (run once in the Supabase SQL editor):
+
+    CREATE INDEX IF NOT EXISTS stock_signals_page ON stock_signals (created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_signals_status_page ON stock_signals (status, created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_trades_status_page ON stock_trades (status, created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_trades_closed_page ON stock_trades (closed_at DESC, id DESC) WHERE status = 'closed';
+    CREATE INDEX IF NOT EXISTS stock_news_page ON stock_news (created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_news_ticker_page ON stock_news (ticker, created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_portfolio_page ON stock_portfolio (created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS stock_deposits_page ON stock_deposits (created_at DESC, id DESC);
+"""
+import base64
+import json
+import re
+import time
+
+import metrics
+
+MAX_LIMIT = 500
+_PAGE_TTL = 30          # sekunder — skrivningar invaliderar ändå direkt
+_MAX_PAGES = 256        # cachade sidor totalt, äldsta slängs först
+
+_FIELD = re.compile(r"^[a-z_][a-z0-9_]*$")
+_ROW_ID = re.compile(r"^[0-9a-fA-F-]{1,64}$")
+
+# Härledda fält: namn i ?fields= -> PostgREST-select
+_DERIVED = {
+    "stock_signals": {
+        "signal_description": "signal_description:indicators->>signal_description",
+    },
+}
+
+# (table, fields, order, filters, cursor, limit) -> (expires, rows, next_cursor)
+_pages: dict[tuple, tuple[float, list, str | None]] = {}
+
+page_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def encode_cursor(value, row_id) -> str:
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Ogiltig cursor")
+    if not isinstance(value, str) or not isinstance(row_id, str) or not _ROW_ID.match(row_id):
+        raise ValueError("Ogiltig cursor")
+    return value, row_id
+
+
+def _select(table: str, fields: str | None, order: str) -> str:
+    if not fields:
+        return "*"
+    columns = []
+    for name in fields.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        derived = _DERIVED.get(table, {}).get(name)
+        if derived:
+            columns.append(derived)
+        elif _FIELD.match(name):
+            columns.append(name)
+        else:
+            raise ValueError(f"Ogiltigt fält: {name}")
+    # Cursorn byggs av sorteringskolumnen och id
+    return ",".join(dict.fromkeys(columns + [order, "id"]))
+
+
+def invalidate(table: str):
+    """Drop every cached page of `table` — called after each write to it."""
+    for key in [k for k in _pages if k[0] == table]:
+        del _pages[key]
+    page_stats["invalidations"] += 1
+
+
+async def fetch(
+    table: str,
+    *,
+    fields: str | None = None,
+    filters: dict | None = None,
+    order: str = "created_at",
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list, str | None]:
+    """One page of `table`, newest first. Returns (rows, next_cursor or None on the last page).
+
+    filters are column -> value equality filters; None values are ignored.
+    Raises ValueError for a malformed cursor or field name.
+    """
+    from db.supabase_client import get_client
+
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    key = (table, fields or "*", order, tuple(sorted(filters.items())), cursor, limit)
+    cached = _pages.get(key)
+    if cached and time.monotonic() < cached[0]:
+        page_stats["hits"] += 1
+        metrics.cache_lookup("pages", True)
+        return cached[1], cached[2]
+    page_stats["misses"] += 1
+    metrics.cache_lookup("pages", False)
+
+    query = get_client().table(table).select(_select(table, fields, order))
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        quoted = json.dumps(value)  # citerad — tidsstämplar innehåller ':', '.' och '+'
+        query = query.or_(f"{order}.lt.{quoted},and({order}.eq.{quoted},id.lt.{row_id})")
+    # En rad extra avgör om det finns en nästa sida
+    rows = query.order(order, desc=True).order("id", desc=True).limit(limit + 1).execute().data or []
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last.get(order) is not None:
+            next_cursor = encode_cursor(last[order], last["id"])
+
+    _pages[key] = (time.monotonic() + _PAGE_TTL, rows, next_cursor)
+    while len(_pages) > _MAX_PAGES:
+        del _pages[next(iter(_pages))]
+    return rows, next_cursor
@@ -1,7 +1,13 @@
+import asyncio
 import logging
 from datetime import datetime, timezone
+from postgrest.types import ReturnMethod
 from supabase import create_client, Client
 from config import SUPABASE_URL, SUPABASE_KEY, PAPER_BALANCE
+import events
+import metrics
+from db import pages
+from tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -19,29 +25,72 @@ def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+async def _execute(query):
+    """Run a PostgREST request in a worker thread.
+
+    supabase-py is synchronous: .execute() directly in a coroutine blocks the
+    event loop, and asyncio.wait_for cannot time it out. Used by the writes
+    that run alongside other stages in process_ticker.
+    """
+    return await asyncio.to_thread(query.execute)
+
+
+@traced("db.save_price")
 async def save_price(ticker: str, price: float, volume: int):
-    get_client().table("stock_prices").insert({
+    await _execute(get_client().table("stock_prices").insert({
         "ticker": ticker,
         "price": price,
         "volume": volume,
         "timestamp": _now(),
-    }).execute()
+    }))
+
 
+# Kolumnerna i stock_indicators (utöver ticker och timestamp)
+INDICATOR_FIELDS = (
+    "rsi", "macd", "macd_signal", "macd_histogram",
+    "ma20", "ma50", "ma200", "ema20",
+    "bollinger_upper", "bollinger_lower", "atr", "volume_ratio",
+    "buy_score",
+)
 
+
+@traced("db.save_indicators")
 async def save_indicators(ticker: str, indicators: dict):
-    INDICATOR_FIELDS = {
-        "rsi", "macd", "macd_signal", "macd_histogram",
-        "ma20", "ma50", "ma200", "ema20",
-        "bollinger_upper", "bollinger_lower", "atr", "volume_ratio",
-        "buy_score",
-    }
-    get_client().table("stock_indicators").insert({
+    """Append to stock_indicators and overwrite the ticker's row in stock_indicators_latest.
+
+    The latest table holds one row per ticker, so "current indicators" is a
+    primary-key lookup instead of a sort over the history. Run once:
+
+        CREATE TABLE stock_indicators_latest (
+          ticker TEXT PRIMARY KEY,
+          rsi NUMERIC, macd NUMERIC, macd_signal NUMERIC, macd_histogram NUMERIC,
+          ma20 NUMERIC, ma50 NUMERIC, ma200 NUMERIC, ema20 NUMERIC,
+          bollinger_upper NUMERIC, bollinger_lower NUMERIC, atr NUMERIC, volume_ratio NUMERIC,
+          buy_score INT,
+          timestamp TIMESTAMPTZ NOT NULL
+        );
+        INSERT INTO stock_indicators_latest
+        SELECT DISTINCT ON (ticker) ticker, rsi, macd, macd_signal, macd_histogram,
+               ma20, ma50, ma200, ema20, bollinger_upper, bollinger_lower, atr,
+               volume_ratio, buy_score, timestamp
+        FROM stock_indicators ORDER BY ticker, timestamp DESC;
+    """
+    row = {
         "ticker": ticker,
         **{k: v for k, v in indicators.items() if k in INDICATOR_FIELDS},
         "timestamp": _now(),
-    }).execute()
+    }
+    get_client().table("stock_indicators").insert(row).execute()
+    try:
+        get_client().table("stock_indicators_latest").upsert(
+            row, on_conflict="ticker", returning=ReturnMethod.minimal,
+        ).execute()
+    except Exception as e:
+        # Historiken är sparad — senaste-tabellen kommer ikapp nästa loop
+        logger.warning(f"{ticker}: Kunde inte uppdatera stock_indicators_latest: {e}")
 
 
+@traced("db.save_signal")
 async def save_signal(
     ticker: str,
     signal_type: str,
@@ -62,7 +111,7 @@ async def save_signal(
         "confidence": confidence,
         "score": score,
         "reasons": reasons,
-        "indicators": indicators,
+        "indicators": dict(indicators),
         "stop_loss_price": stop_loss,
         "take_profit_price": take_profit,
         "paper_mode": True,
@@ -70,6 +119,11 @@ async def save_signal(
         "status": "pending" if signal_type == "BUY" else "auto",
         "created_at": _now(),
     }).execute()
+    metrics.signals.inc(signal_type)
+    pages.invalidate("stock_signals")
+    if result.data:
+        # Raden utan indikator-blobben — dashboarden visar den redan i signallistan
+        events.publish("signal", {k: v for k, v in result.data[0].items() if k != "indicators"})
     return result.data[0]["id"] if result.data else None
 
 
@@ -79,12 +133,14 @@ async def confirm_signal(signal_id: str):
         "executed": True,
         "confirmed_at": _now(),
     }).eq("id", signal_id).execute()
+    pages.invalidate("stock_signals")
 
 
 async def reject_signal(signal_id: str):
     get_client().table("stock_signals").update({
         "status": "rejected",
     }).eq("id", signal_id).execute()
+    pages.invalidate("stock_signals")
 
 
 async def save_trade(
@@ -108,6 +164,7 @@ async def save_trade(
         "opened_at": _now(),
         "created_at": _now(),
     }).execute()
+    pages.invalidate("stock_trades")
     return result.data[0]["id"] if result.data else None
 
 
@@ -118,16 +175,22 @@ async def close_trade(
     pnl_kr: float,
     pnl_pct: float,
 ):
-    get_client().table("stock_trades").update({
+    # eq("status", "open"): bara den första stängningen räknas in i summorna
+    result = get_client().table("stock_trades").update({
         "status": "closed",
         "exit_price": exit_price,
         "close_reason": close_reason,
         "pnl_kr": round(pnl_kr, 2),
         "pnl_pct": round(pnl_pct, 2),
         "closed_at": _now(),
-    }).eq("id", trade_id).execute()
+    }).eq("id", trade_id).eq("status", "open").execute()
+    pages.invalidate("stock_trades")
+    if result.data:
+        pnl = round(pnl_kr, 2)
+        await _add_to_totals(realized_pnl=pnl, closed_trades=1, wins=int(pnl > 0), losses=int(pnl <= 0))
 
 
+@traced("db.get_open_trades")
 async def get_open_trades() -> list:
     result = (
         get_client()
@@ -139,16 +202,23 @@ async def get_open_trades() -> list:
     return result.data or []
 
 
-async def get_trade_history() -> list:
-    result = (
-        get_client()
-        .table("stock_trades")
-        .select("*")
-        .eq("status", "closed")
-        .order("closed_at", desc=True)
-        .execute()
+async def get_trade_history(limit: int = 100, cursor: str | None = None) -> tuple[list, str | None]:
+    """Closed trades, latest close first, one page at a time (see db.pages)."""
+    return await pages.fetch(
+        "stock_trades", filters={"status": "closed"}, order="closed_at", limit=limit, cursor=cursor,
     )
-    return result.data or []
+
+
+@traced("db.get_trade_stats")
+async def get_trade_stats() -> dict:
+    """Count, wins, losses and realized P&L over all closed trades (from the running totals)."""
+    totals = await get_totals()
+    return {
+        "closed": totals["closed_trades"],
+        "wins": totals["wins"],
+        "losses": totals["losses"],
+        "realized_pnl": totals["realized_pnl"],
+    }
 
 
 async def get_pending_buy_signals() -> list:
@@ -164,6 +234,7 @@ async def get_pending_buy_signals() -> list:
     return result.data or []
 
 
+@traced("db.save_news")
 async def save_news(
     ticker: str,
     headline: str,
@@ -177,13 +248,15 @@ async def save_news(
     """Spara en nyhet till databasen. Returnerar False om den redan finns (dedup)."""
     # Dedup-kontroll direkt i DB — förhindrar dubletter oavsett cache-status
     try:
-        existing = get_client().table("stock_news").select("id").eq("ticker", ticker).eq("headline", headline).limit(1).execute()
+        existing = await _execute(
+            get_client().table("stock_news").select("id").eq("ticker", ticker).eq("headline", headline).limit(1)
+        )
         if existing.data:
             return False
     except Exception:
         pass  # vid DB-läsfel, försök ändå (hellre dubblett än att missa nyheten)
 
-    get_client().table("stock_news").insert({
+    await _execute(get_client().table("stock_news").insert({
         "ticker": ticker,
         "headline": headline,
         "url": url,
@@ -193,10 +266,84 @@ async def save_news(
         "source": source,
         "published_at": published_at.isoformat() if published_at else None,
         "created_at": _now(),
-    }).execute()
+    }))
+    pages.invalidate("stock_news")
     return True
 
 
+@traced("db.get_recent_sentiments")
+async def get_recent_sentiments(since: str) -> list:
+    """Headlines analysed since `since` (ISO) with their Gemini verdict."""
+    result = (
+        get_client()
+        .table("stock_news")
+        .select("headline,sentiment,sentiment_score,gemini_reason,created_at")
+        .gte("created_at", since)
+        .limit(1000)
+        .execute()
+    )
+    return result.data or []
+
+
+@traced("db.get_recent_indicators")
+async def get_recent_indicators(since: str) -> list:
+    """Indicator rows saved since `since` (ISO), newest first."""
+    result = (
+        get_client()
+        .table("stock_indicators")
+        .select("ticker,buy_score,atr,ma20,volume_ratio,timestamp")
+        .gte("timestamp", since)
+        .order("timestamp", desc=True)
+        .limit(1000)
+        .execute()
+    )
+    return result.data or []
+
+
+_HISTORY_ROWS_PER_TICKER = 20  # fallback-läsningens radbudget per ticker
+
+
+def _latest_from_history(tickers: list[str]) -> list:
+    """Newest stock_indicators row per ticker in one bounded read — fallback for stock_indicators_latest."""
+    result = (
+        get_client()
+        .table("stock_indicators")
+        .select("*")
+        .in_("ticker", list(tickers))
+        .order("timestamp", desc=True)
+        .limit(len(tickers) * _HISTORY_ROWS_PER_TICKER)
+        .execute()
+    )
+    latest: dict[str, dict] = {}
+    for row in result.data or []:
+        latest.setdefault(row["ticker"], row)
+    return list(latest.values())
+
+
+@traced("db.get_latest_indicators")
+async def get_latest_indicators(tickers: list[str]) -> list:
+    """Current indicator row per ticker (tickers without data are left out).
+
+    One read of stock_indicators_latest. Until that table exists and has
+    been backfilled (the read fails or returns nothing), one bounded read of
+    stock_indicators instead.
+    """
+    if not tickers:
+        return []
+    try:
+        rows = (
+            get_client()
+            .table("stock_indicators_latest")
+            .select("*")
+            .in_("ticker", list(tickers))
+            .execute()
+        ).data or []
+    except Exception as e:
+        logger.warning(f"stock_indicators_latest kunde inte läsas, läser historiken: {e}")
+        rows = []
+    return rows or _latest_from_history(tickers)
+
+
 async def get_open_positions() -> list:
     """Legacy: return open BUY entries from stock_portfolio."""
     result = (
@@ -210,6 +357,7 @@ async def get_open_positions() -> list:
     return result.data or []
 
 
+@traced("db.get_watchlist")
 async def get_watchlist() -> list:
     result = (
         get_client()
@@ -221,6 +369,22 @@ async def get_watchlist() -> list:
     return result.data or []
 
 
+@traced("db.get_watchlist_entry")
+async def get_watchlist_entry(ticker: str) -> dict:
+    """Active watchlist row for one ticker ({} if not watched)."""
+    result = (
+        get_client()
+        .table("stock_watchlist")
+        .select("*")
+        .eq("ticker", ticker)
+        .eq("active", True)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else {}
+
+
+@traced("db.bulk_update_watchlist")
 async def bulk_update_watchlist(keep_tickers: set[str], new_entries: list[dict]):
     """
     Replace watchlist: keep positioned stocks, deactivate others, add new candidates.
@@ -240,19 +404,16 @@ async def bulk_update_watchlist(keep_tickers: set[str], new_entries: list[dict])
     # and should not be removed just because the discovery scan ranked them lower
     HIGH_SCORE_PROTECTION = 50  # protect stocks with buy_score >= 50
     protected_by_score: set[str] = set()
-    for ticker in current_tickers - keep_tickers - new_tickers:
-        try:
-            latest = client.table("stock_indicators").select("buy_score") \
-                .eq("ticker", ticker) \
-                .order("timestamp", desc=True) \
-                .limit(1) \
-                .execute()
-            if latest.data and latest.data[0].get("buy_score") is not None:
-                if latest.data[0]["buy_score"] >= HIGH_SCORE_PROTECTION:
-                    protected_by_score.add(ticker)
-                    logger.info(f"[Discovery] Skyddar {ticker} — buy_score {latest.data[0]['buy_score']}p i DB")
-        except Exception as e:
-            logger.debug(f"Kunde inte kolla buy_score för {ticker}: {e}")
+    candidates = current_tickers - keep_tickers - new_tickers
+    try:
+        latest = await get_latest_indicators(sorted(candidates))
+    except Exception as e:
+        logger.debug(f"Kunde inte kolla buy_score för {len(candidates)} aktier: {e}")
+        latest = []
+    for row in latest:
+        if row.get("buy_score") is not None and row["buy_score"] >= HIGH_SCORE_PROTECTION:
+            protected_by_score.add(row["ticker"])
+            logger.info(f"[Discovery] Skyddar {row['ticker']} — buy_score {row['buy_score']}p i DB")
 
     # Deactivate stocks that are NOT in keep_tickers AND NOT in new_entries
     # AND NOT protected by high buy_score
@@ -303,11 +464,112 @@ async def set_cooldown(ticker: str, until: datetime):
     }).eq("ticker", ticker).execute()
 
 
+_TOTALS_KEY = "paper"
+_TOTALS_FIELDS = ("deposited", "realized_pnl", "closed_trades", "wins", "losses")
+_TOTALS_RETRIES = 5
+_SCAN_PAGE = 1000  # PostgREST:s max-rows i Supabase
+
+
+def _scan_all(table: str, column: str, **eq) -> list:
+    """Every value of `column` in `table` (paged past PostgREST's row limit)."""
+    values, offset = [], 0
+    while True:
+        query = get_client().table(table).select(f"id,{column}")
+        for key, value in eq.items():
+            query = query.eq(key, value)
+        page = query.order("id").range(offset, offset + _SCAN_PAGE - 1).execute().data or []
+        values += [r[column] or 0 for r in page]
+        if len(page) < _SCAN_PAGE:
+            return values
+        offset += _SCAN_PAGE
+
+
+def _scan_totals() -> dict:
+    """The running totals recomputed from the full deposit and trade history."""
+    pnl = _scan_all("stock_trades", "pnl_kr", status="closed")
+    return {
+        "deposited": round(float(sum(_scan_all("stock_deposits", "amount"))), 2),
+        "realized_pnl": round(float(sum(pnl)), 2),
+        "closed_trades": len(pnl),
+        "wins": sum(1 for p in pnl if p > 0),
+        "losses": sum(1 for p in pnl if p <= 0),
+    }
+
+
+async def get_totals() -> dict:
+    """Running totals: deposited, realized_pnl, closed_trades, wins, losses.
+
+    One primary-key read of stock_portfolio_totals, which close_trade and
+    add_deposit keep up to date. A portfolio summary thus costs the same
+    however long the history is. When the row is missing (new table, after
+    a reset, after a failed update) it is rebuilt from the history once.
+    Run once:
+
+        CREATE TABLE stock_portfolio_totals (
+          key TEXT PRIMARY KEY,
+          deposited NUMERIC NOT NULL DEFAULT 0,
+          realized_pnl NUMERIC NOT NULL DEFAULT 0,
+          closed_trades INT NOT NULL DEFAULT 0,
+          wins INT NOT NULL DEFAULT 0,
+          losses INT NOT NULL DEFAULT 0,
+          version INT NOT NULL DEFAULT 0,
+          updated_at TIMESTAMPTZ DEFAULT NOW()
+        );
+    """
+    try:
+        rows = get_client().table("stock_portfolio_totals").select("*").eq("key", _TOTALS_KEY).execute().data
+    except Exception as e:
+        logger.warning(f"stock_portfolio_totals kunde inte läsas, summerar historiken: {e}")
+        return _scan_totals()
+    if rows:
+        row = rows[0]
+        return {
+            **{k: float(row[k] or 0) for k in ("deposited", "realized_pnl")},
+            **{k: int(row[k] or 0) for k in ("closed_trades", "wins", "losses")},
+            "version": row.get("version") or 0,
+        }
+    totals = _scan_totals()
+    logger.info(f"Portföljsummor återskapade från historiken: {totals}")
+    # Skriv bara om ingen annan hann först — deras rad kan redan ha nya tillägg
+    get_client().table("stock_portfolio_totals").upsert(
+        {"key": _TOTALS_KEY, **totals, "version": 0, "updated_at": _now()},
+        on_conflict="key", ignore_duplicates=True,
+    ).execute()
+    return {**totals, "version": 0, "seeded": True}
+
+
+async def _add_to_totals(**delta):
+    """Add `delta` to the running totals (optimistic: retried if another writer got in between)."""
+    table = get_client().table("stock_portfolio_totals")
+    try:
+        for _ in range(_TOTALS_RETRIES):
+            current = await get_totals()
+            if "version" not in current or current.get("seeded"):
+                return  # tabellen saknas, eller raden byggdes nyss ur historiken som redan har ändringen
+            updated = {k: round(current[k] + delta.get(k, 0), 2) for k in _TOTALS_FIELDS}
+            result = table.update({**updated, "version": current["version"] + 1, "updated_at": _now()}) \
+                .eq("key", _TOTALS_KEY).eq("version", current["version"]).execute()
+            if result.data:
+                return
+        raise RuntimeError(f"versionskonflikt {_TOTALS_RETRIES} gånger i rad")
+    except Exception as e:
+        # Raden slängs och byggs om från historiken vid nästa läsning hellre än att bli fel
+        logger.warning(f"Kunde inte uppdatera portföljsummorna ({delta}): {e} — bygger om dem")
+        try:
+            table.delete().eq("key", _TOTALS_KEY).execute()
+        except Exception:
+            pass
+
+
+async def reset_totals():
+    """Forget the running totals — the next read rebuilds them (after /api/reset)."""
+    get_client().table("stock_portfolio_totals").delete().eq("key", _TOTALS_KEY).execute()
+
+
 async def get_total_deposited() -> float:
     """Sum of all deposits — this is the user's total capital basis."""
     try:
-        result = get_client().table("stock_deposits").select("amount").execute()
-        return sum(r["amount"] for r in (result.data or []))
+        return (await get_totals())["deposited"]
     except Exception:
         return 0.0
 
@@ -318,15 +580,20 @@ async def add_deposit(amount: float, note: str = "") -> str | None:
         "note": note,
         "created_at": _now(),
     }).execute()
+    pages.invalidate("stock_deposits")
+    if result.data:
+        await _add_to_totals(deposited=amount)
     return result.data[0]["id"] if result.data else None
 
 
+@traced("db.get_portfolio_summary")
 async def get_portfolio_summary(initial_balance: float = PAPER_BALANCE) -> tuple[float, float]:
     """Return (current_value, pct_change) based on open confirmed trades with live prices."""
     try:
-        deposited = await get_total_deposited()
+        totals = await get_totals()
+        deposited, realized_pnl = totals["deposited"], totals["realized_pnl"]
     except Exception:
-        deposited = initial_balance
+        deposited, realized_pnl = initial_balance, 0.0
     trades = await get_open_trades()
     invested_at_cost = sum(t["total_value"] for t in trades)
 
@@ -341,13 +608,6 @@ async def get_portfolio_summary(initial_balance: float = PAPER_BALANCE) -> tuple
             live_price = t["entry_price"]
         market_value += live_price * t["quantity"]
 
-    # Realized P&L from closed trades
-    try:
-        closed = get_client().table("stock_trades").select("pnl_kr").eq("status", "closed").execute()
-        realized_pnl = sum(r["pnl_kr"] or 0 for r in (closed.data or []))
-    except Exception:
-        realized_pnl = 0.0
-
     cash = max(0.0, deposited + realized_pnl - invested_at_cost)
     current_value = cash + market_value
     pct = ((current_value - deposited) / deposited) * 100 if deposited else 0.0
@@ -412,6 +672,7 @@ def get_ai_stats_history(days: int = 30) -> list:
 
 # ── Discovery Scan Persistence ──────────────────────────────────────────
 
+@traced("db.save_discovery_scan")
 async def save_discovery_scan(scan_result: dict) -> str | None:
     """Save a discovery scan result to DB. Returns the scan ID."""
     try:
@@ -0,0 +1,142 @@
+"""
+Live push to the dashboard — Server-Sent Events on GET /api/events.
+
+The agent publishes whenever it has something new, and each open dashboard
+tab holds one idle HTTP connection. Backend load no longer grows with the
+number of tabs or how often they poll:
+
+    quote        {ticker, price, change_pct}      process_ticker + trigger watcher (20 s)
+    indicators   {ticker, price, buy_score, ...}  process_ticker, after the full score
+    signal       the new stock_signals row        db.save_signal
+    signal_status {id, status}                    confirm / reject
+    summary      as GET /api/summary              end of trading loop, trades, deposits
+    positions    as GET /api/positions            same
+    discovery    {ok, error?}                     discovery scan finished
+
+Only deltas go out: a quote or indicator row identical to the last one sent
+for that ticker, or an unchanged summary, is dropped here. The latest value
+of each is also kept, so a new connection starts with one `snapshot` event
+instead of N endpoint calls. Events carry ids; a browser that reconnects
+sends Last-Event-ID and gets what it missed from the last _REPLAY events,
+or a fresh snapshot if that is too far back (or the agent restarted).
+
+SSE rather than WebSocket: the traffic is one-way, EventSource reconnects
+by itself, and it is plain HTTP through Railway's proxy and CORS as is.
+A client that falls _QUEUE_SIZE events behind is not waited for — its
+queue is emptied and it is sent a new snapshot.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+
+_QUEUE_SIZE = 256
+_REPLAY = 500
+_KEEPALIVE_S = 15
+_RETRY_MS = 5000
+
+_EPOCH = str(int(time.time()))  # id-prefix — id:n från en tidigare process gäller inte här
+
+_subscribers: set[asyncio.Queue] = set()
+_recent: deque = deque(maxlen=_REPLAY)  # (seq, frame)
+_seq = 0
+
+# Senaste värdet per händelsetyp — för delta-filtret och snapshot
+_latest: dict = {"summary": None, "positions": None, "quote": {}, "indicators": {}}
+_KEYED = ("quote", "indicators")
+
+event_stats = {
+    "published": 0,
+    "unchanged": 0,   # delta-filtret: samma värde som senast
+    "connections": 0,
+    "resyncs": 0,     # långsamma klienter som fick en ny snapshot
+}
+
+
+def _frame(event: str, data, seq: int) -> str:
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    return f"id: {_EPOCH}-{seq}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def publish(event: str, data) -> None:
+    """Send an event to every connected dashboard. Never blocks.
+
+    quote and indicators are keyed by data["ticker"].
+    """
+    global _seq
+    if event in _KEYED:
+        latest = _latest[event]
+        if latest.get(data["ticker"]) == data:
+            event_stats["unchanged"] += 1
+            return
+        latest[data["ticker"]] = data
+    elif event in _latest:
+        if _latest[event] == data:
+            event_stats["unchanged"] += 1
+            return
+        _latest[event] = data
+
+    _seq += 1
+    frame = _frame(event, data, _seq)
+    _recent.append((_seq, frame))
+    event_stats["published"] += 1
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Klienten hänger inte med — släng det köade och skicka en ny snapshot
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+            event_stats["resyncs"] += 1
+
+
+def _snapshot() -> str:
+    return _frame("snapshot", {
+        "summary": _latest["summary"],
+        "positions": _latest["positions"],
+        "quotes": _latest["quote"],
+        "indicators": _latest["indicators"],
+    }, _seq)
+
+
+def _missed(last_event_id: str | None) -> list[str] | None:
+    """Frames after last_event_id, or None if they can't be replayed (→ snapshot)."""
+    if not last_event_id:
+        return None
+    epoch, _, seq = last_event_id.partition("-")
+    if epoch != _EPOCH or not seq.isdigit():
+        return None
+    seq = int(seq)
+    if seq > _seq:
+        return None
+    if seq < _seq and (not _recent or _recent[0][0] > seq + 1):
+        return None  # för långt tillbaka — bufferten har roterat förbi
+    return [frame for s, frame in _recent if s > seq]
+
+
+def subscribers() -> int:
+    return len(_subscribers)
+
+
+async def stream(last_event_id: str | None = None):
+    """SSE body for one connection: snapshot or replay, then live events and keepalives."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+    # Registrera och läs backloggen utan await emellan — inget kan hamna mellan dem
+    _subscribers.add(queue)
+    missed = _missed(last_event_id)
+    first = [_snapshot()] if missed is None else missed
+    event_stats["connections"] += 1
+    try:
+        yield f"retry: {_RETRY_MS}\n\n"
+        for frame in first:
+            yield frame
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), _KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"  # håller proxyer från att stänga en tyst anslutning
+                continue
+            yield _snapshot() if frame is None else frame
+    finally:
+        _subscribers.discard(queue)
@@ -0,0 +1,276 @@
+"""
+Instrument registry — one indexed table of every ticker the system knows.
+
+The scanner universe, the Yahoo symbol mapping used by the frontend market
+proxy, the Avanza links and watchlist names all resolve through here.
+Each instrument gets a dense integer ID (0..count()-1) for array-indexed
+price panels and O(1) joins. IDs are assigned per process in table order
+and are never persisted.
+
+Tickers are normalized on lookup ("ERIC-B.ST", "eric b" -> "ERIC B") so a
+spelling difference does not create a second cache entry or a refetch.
+Watchlist tickers that are not in the table are registered on first sight
+with the proxy's default symbol rule.
+
+The frontend maps (frontend/lib/instruments.ts) are generated from this
+module — never edit them by hand:
+
+    cd agent && python instruments.py
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Broad universe of Swedish stocks to evaluate.
+# Covers all Nasdaq Stockholm Large Cap + Mid Cap (124 aktier).
+# The liquidity filter (MIN_DAILY_TURNOVER_SEK in stock_scanner) automatically
+# removes any stock that doesn't meet the turnover threshold.
+# Each entry: (ticker, display_name, avanza_url, yahoo_symbol)
+_STOCK_DATA: list[tuple[str, str, str, str]] = [
+    # ── Large Cap ──────────────────────────────────────────────
+    ("AAK", "AAK", "https://www.avanza.se/aktier/om-aktien.html/26268/aak", "AAK.ST"),
+    ("ABB", "ABB", "https://www.avanza.se/aktier/om-aktien.html/5447/abb", "ABB.ST"),
+    ("AFRY", "AFRY", "https://www.avanza.se/aktier/om-aktien.html/5765/afry", "AFRY.ST"),
+    ("ALFA", "Alfa Laval", "https://www.avanza.se/aktier/om-aktien.html/5580/alfa-laval", "ALFA.ST"),
+    ("ALIV SDB", "Autoliv SDB", "https://www.avanza.se/aktier/om-aktien.html/5236/autoliv-sdb", "ALIV-SDB.ST"),
+    ("ASSA B", "Assa Abloy B", "https://www.avanza.se/aktier/om-aktien.html/5271/assa-abloy-b", "ASSA-B.ST"),
+    ("ATCO A", "Atlas Copco A", "https://www.avanza.se/aktier/om-aktien.html/5234/atlas-copco-a", "ATCO-A.ST"),
+    ("ATCO B", "Atlas Copco B", "https://www.avanza.se/aktier/om-aktien.html/5235/atlas-copco-b", "ATCO-B.ST"),
+    ("AZN", "AstraZeneca", "https://www.avanza.se/aktier/om-aktien.html/5361/astrazeneca", "AZN.ST"),
+    ("AXFO", "Axfood", "https://www.avanza.se/aktier/om-aktien.html/5465/axfood", "AXFO.ST"),
+    ("BALD B", "Balder B", "https://www.avanza.se/aktier/om-aktien.html/5519/balder-b", "BALD-B.ST"),
+    ("BILL", "Billerud", "https://www.avanza.se/aktier/om-aktien.html/5253/billerud", "BILL.ST"),
+    ("BOL", "Boliden", "https://www.avanza.se/aktier/om-aktien.html/5564/boliden", "BOL.ST"),
+    ("CAST", "Castellum", "https://www.avanza.se/aktier/om-aktien.html/5353/castellum", "CAST.ST"),
+    ("DOME", "Dometic", "https://www.avanza.se/aktier/om-aktien.html/549782/dometic-group", "DOME.ST"),
+    ("EKTA B", "Elekta B", "https://www.avanza.se/aktier/om-aktien.html/5280/elekta-b", "EKTA-B.ST"),
+    ("ELUX B", "Electrolux B", "https://www.avanza.se/aktier/om-aktien.html/5238/electrolux-b", "ELUX-B.ST"),
+    ("EMBRAC B", "Embracer Group B", "https://www.avanza.se/aktier/om-aktien.html/707695/embracer-group-b", "EMBRAC-B.ST"),
+    ("EPRO A", "Epiroc A", "https://www.avanza.se/aktier/om-aktien.html/831540/epiroc-a", "EPRO-A.ST"),
+    ("EPRO B", "Epiroc B", "https://www.avanza.se/aktier/om-aktien.html/831541/epiroc-b", "EPRO-B.ST"),
+    ("EQT", "EQT", "https://www.avanza.se/aktier/om-aktien.html/956272/eqt", "EQT.ST"),
+    ("ERIC B", "Ericsson B", "https://www.avanza.se/aktier/om-aktien.html/5240/ericsson-b", "ERIC-B.ST"),
+    ("ESSITY B", "Essity B", "https://www.avanza.se/aktier/om-aktien.html/764241/essity-b", "ESSITY-B.ST"),
+    ("EVO", "Evolution", "https://www.avanza.se/aktier/om-aktien.html/549768/evolution", "EVO.ST"),
+    ("GETI B", "Getinge B", "https://www.avanza.se/aktier/om-aktien.html/5282/getinge-b", "GETI-B.ST"),
+    ("HEXA B", "Hexagon B", "https://www.avanza.se/aktier/om-aktien.html/5286/hexagon-b", "HEXA-B.ST"),
+    ("HM B", "H&M B", "https://www.avanza.se/aktier/om-aktien.html/5364/h-m-b", "HM-B.ST"),
+    ("HOLMEN B", "Holmen B", "https://www.avanza.se/aktier/om-aktien.html/5244/holmen-b", "HOLM-B.ST"),
+    ("HPOL B", "Hexpol B", "https://www.avanza.se/aktier/om-aktien.html/39498/hexpol-b", "HPOL-B.ST"),
+    ("HUSQ B", "Husqvarna B", "https://www.avanza.se/aktier/om-aktien.html/45189/husqvarna-b", "HUSQ-B.ST"),
+    ("INDU C", "Industrivärden C", "https://www.avanza.se/aktier/om-aktien.html/5245/industrivarden-c", "INDU-C.ST"),
+    ("INDT", "Indutrade", "https://www.avanza.se/aktier/om-aktien.html/26607/indutrade", "INDT.ST"),
+    ("INVE B", "Investor B", "https://www.avanza.se/aktier/om-aktien.html/5247/investor-b", "INVE-B.ST"),
+    ("INTRUM", "Intrum", "https://www.avanza.se/aktier/om-aktien.html/5223/intrum", "INTRUM.ST"),
+    ("KINV B", "Kinnevik B", "https://www.avanza.se/aktier/om-aktien.html/5369/kinnevik-b", "KINV-B.ST"),
+    ("LAGR B", "Lagercrantz Group B", "https://www.avanza.se/aktier/om-aktien.html/5514/lagercrantz-group-b", "LAGR-B.ST"),
+    ("LATO B", "Latour B", "https://www.avanza.se/aktier/om-aktien.html/5321/latour-b", "LATO-B.ST"),
+    ("LIFCO B", "Lifco B", "https://www.avanza.se/aktier/om-aktien.html/520898/lifco-b", "LIFCO-B.ST"),
+    ("LOOMIS", "Loomis", "https://www.avanza.se/aktier/om-aktien.html/154930/loomis", "LOOMIS.ST"),
+    ("LUND B", "Lundbergföretagen B", "https://www.avanza.se/aktier/om-aktien.html/5375/lundbergforetagen-b", "LUND-B.ST"),
+    ("MTRS", "Munters Group", "https://www.avanza.se/aktier/om-aktien.html/753399/munters-group", "MTRS.ST"),
+    ("NDA SE", "Nordea", "https://www.avanza.se/aktier/om-aktien.html/5249/nordea-bank", "NDA-SE.ST"),
+    ("NIBE B", "NIBE B", "https://www.avanza.se/aktier/om-aktien.html/5325/nibe-industrier-b", "NIBE-B.ST"),
+    ("SAAB B", "Saab B", "https://www.avanza.se/aktier/om-aktien.html/5260/saab-b", "SAAB-B.ST"),
+    ("SAND", "Sandvik", "https://www.avanza.se/aktier/om-aktien.html/5471/sandvik", "SAND.ST"),
+    ("SBB B", "Samhällsbyggnadsbolaget B", "https://www.avanza.se/aktier/om-aktien.html/808046/sbb-b", "SBB-B.ST"),
+    ("SCA B", "SCA B", "https://www.avanza.se/aktier/om-aktien.html/5263/sca-b", "SCA-B.ST"),
+    ("SEB A", "SEB A", "https://www.avanza.se/aktier/om-aktien.html/5255/seb-a", "SEB-A.ST"),
+    ("SECU B", "Securitas B", "https://www.avanza.se/aktier/om-aktien.html/5270/securitas-b", "SECU-B.ST"),
+    ("SECT B", "Sectra B", "https://www.avanza.se/aktier/om-aktien.html/16226/sectra-b", "SECT-B.ST"),
+    ("SHB A", "Handelsbanken A", "https://www.avanza.se/aktier/om-aktien.html/5264/handelsbanken-a", "SHB-A.ST"),
+    ("SINCH", "Sinch", "https://www.avanza.se/aktier/om-aktien.html/599956/sinch", "SINCH.ST"),
+    ("SKF B", "SKF B", "https://www.avanza.se/aktier/om-aktien.html/5259/skf-b", "SKF-B.ST"),
+    ("SOBI", "Swedish Orphan Biovitrum", "https://www.avanza.se/aktier/om-aktien.html/51308/swedish-orphan-biovitrum", "SOBI.ST"),
+    ("SSAB A", "SSAB A", "https://www.avanza.se/aktier/om-aktien.html/5261/ssab-a", "SSAB-A.ST"),
+    ("SSAB B", "SSAB B", "https://www.avanza.se/aktier/om-aktien.html/495284/ssab-b", "SSAB-B.ST"),
+    ("STE R", "Stora Enso R", "https://www.avanza.se/aktier/om-aktien.html/5256/stora-enso-r", "STE-R.ST"),
+    ("SWEC B", "Sweco B", "https://www.avanza.se/aktier/om-aktien.html/5409/sweco-b", "SWEC-B.ST"),
+    ("SWED A", "Swedbank A", "https://www.avanza.se/aktier/om-aktien.html/5241/swedbank-a", "SWED-A.ST"),
+    ("TELE2 B", "Tele2 B", "https://www.avanza.se/aktier/om-aktien.html/5386/tele2-b", "TELE2-B.ST"),
+    ("TELIA", "Telia", "https://www.avanza.se/aktier/om-aktien.html/5479/telia-company", "TELIA.ST"),
+    ("TIGO SDB", "Millicom SDB", "https://www.avanza.se/aktier/om-aktien.html/5384/millicom-sdb", "TIGO-SDB.ST"),
+    ("TREL B", "Trelleborg B", "https://www.avanza.se/aktier/om-aktien.html/5267/trelleborg-b", "TREL-B.ST"),
+    ("VOLCAR B", "Volvo Cars B", "https://www.avanza.se/aktier/om-aktien.html/1041480/volvo-cars-b", "VOLCAR-B.ST"),
+    ("VOLV A", "Volvo A", "https://www.avanza.se/aktier/om-aktien.html/5268/volvo-a", "VOLV-A.ST"),
+    ("VOLV B", "Volvo B", "https://www.avanza.se/aktier/om-aktien.html/5269/volvo-b", "VOLV-B.ST"),
+    # ── Mid Cap ────────────────────────────────────────────────
+    ("ACAD", "Academedia", "https://www.avanza.se/aktier/om-aktien.html/560907/academedia", "ACAD.ST"),
+    ("ADDT B", "AddTech B", "https://www.avanza.se/aktier/om-aktien.html/5537/addtech-b", "ADDT-B.ST"),
+    ("AMBEA", "Ambea", "https://www.avanza.se/aktier/om-aktien.html/753387/ambea", "AMBEA.ST"),
+    ("ARJO B", "Arjo B", "https://www.avanza.se/aktier/om-aktien.html/831548/arjo-b", "ARJO-B.ST"),
+    ("ATRLJ B", "Atrium Ljungberg B", "https://www.avanza.se/aktier/om-aktien.html/5272/atrium-ljungberg-b", "ATRLJ-B.ST"),
+    ("BETS B", "Betsson B", "https://www.avanza.se/aktier/om-aktien.html/5482/betsson-b", "BETS-B.ST"),
+    ("BIOG B", "BioGaia B", "https://www.avanza.se/aktier/om-aktien.html/5507/biogaia-b", "BIOG-B.ST"),
+    ("BONAV B", "Bonava B", "https://www.avanza.se/aktier/om-aktien.html/764238/bonava-b", "BONAV-B.ST"),
+    ("BOOZT", "Boozt", "https://www.avanza.se/aktier/om-aktien.html/780423/boozt", "BOOZT.ST"),
+    ("BRAV", "Bravida Holding", "https://www.avanza.se/aktier/om-aktien.html/753395/bravida-holding", "BRAV.ST"),
+    ("BUFAB", "Bufab", "https://www.avanza.se/aktier/om-aktien.html/518131/bufab", "BUFAB.ST"),
+    ("BURE", "Bure Equity", "https://www.avanza.se/aktier/om-aktien.html/5277/bure-equity", "BURE.ST"),
+    ("CAMX", "Camurus", "https://www.avanza.se/aktier/om-aktien.html/521499/camurus", "CAMX.ST"),
+    ("CATE", "Catena", "https://www.avanza.se/aktier/om-aktien.html/5484/catena", "CATE.ST"),
+    ("CIBUS", "Cibus Nordic Real Estate", "https://www.avanza.se/aktier/om-aktien.html/867390/cibus-nordic", "CIBUS.ST"),
+    ("CINT", "Cint Group", "https://www.avanza.se/aktier/om-aktien.html/1061965/cint-group", "CINT.ST"),
+    ("CLAS B", "Clas Ohlson B", "https://www.avanza.se/aktier/om-aktien.html/5276/clas-ohlson-b", "CLAS-B.ST"),
+    ("COOR", "Coor Service Management", "https://www.avanza.se/aktier/om-aktien.html/523418/coor-service-management", "COOR.ST"),
+    ("CTM", "CellaVision", "https://www.avanza.se/aktier/om-aktien.html/5490/cellavision", "CTM.ST"),
+    ("DIOS", "Dios Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/45191/dios-fastigheter", "DIOS.ST"),
+    ("ELAN B", "Elanders B", "https://www.avanza.se/aktier/om-aktien.html/5485/elanders-b", "ELAN-B.ST"),
+    ("FABG", "Fabege", "https://www.avanza.se/aktier/om-aktien.html/5300/fabege", "FABG.ST"),
+    ("GREP", "Gränges", "https://www.avanza.se/aktier/om-aktien.html/510194/granges", "GREP.ST"),
+    ("HEBA B", "HEBA Fastigheter B", "https://www.avanza.se/aktier/om-aktien.html/5506/heba-b", "HEBA-B.ST"),
+    ("HMS", "HMS Networks", "https://www.avanza.se/aktier/om-aktien.html/98412/hms-networks", "HMS.ST"),
+    ("HTRO", "Hexatronic", "https://www.avanza.se/aktier/om-aktien.html/299737/hexatronic-group", "HTRO.ST"),
+    ("HUFV A", "Hufvudstaden A", "https://www.avanza.se/aktier/om-aktien.html/5287/hufvudstaden-a", "HUFV-A.ST"),
+    ("JM", "JM", "https://www.avanza.se/aktier/om-aktien.html/5501/jm", "JM.ST"),
+    ("KABE B", "KABE B", "https://www.avanza.se/aktier/om-aktien.html/5308/kabe-b", "KABE-B.ST"),
+    ("KNOW", "Knowit", "https://www.avanza.se/aktier/om-aktien.html/5515/knowit", "KNOW.ST"),
+    ("LIME", "Lime Technologies", "https://www.avanza.se/aktier/om-aktien.html/867393/lime-technologies", "LIME.ST"),
+    ("MEKO", "Meko", "https://www.avanza.se/aktier/om-aktien.html/5324/meko", "MEKO.ST"),
+    ("MEDIO B", "Medicover B", "https://www.avanza.se/aktier/om-aktien.html/788849/medicover-b", "MEDIO-B.ST"),
+    ("MYCR", "Mycronic", "https://www.avanza.se/aktier/om-aktien.html/5383/mycronic", "MYCR.ST"),
+    ("NCAB", "NCAB Group", "https://www.avanza.se/aktier/om-aktien.html/856458/ncab-group", "NCAB.ST"),
+    ("NEWA B", "New Wave Group B", "https://www.avanza.se/aktier/om-aktien.html/5326/new-wave-group-b", "NEWA-B.ST"),
+    ("NOLA B", "Nolato B", "https://www.avanza.se/aktier/om-aktien.html/5327/nolato-b", "NOLA-B.ST"),
+    ("NOTE", "NOTE", "https://www.avanza.se/aktier/om-aktien.html/5328/note", "NOTE.ST"),
+    ("NP3", "NP3 Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/519504/np3-fastigheter", "NP3.ST"),
+    ("NYFOSA", "Nyfosa", "https://www.avanza.se/aktier/om-aktien.html/907825/nyfosa", "NYFOSA.ST"),
+    ("OEM B", "OEM International B", "https://www.avanza.se/aktier/om-aktien.html/5329/oem-international-b", "OEM-B.ST"),
+    ("PEAB B", "Peab B", "https://www.avanza.se/aktier/om-aktien.html/5330/peab-b", "PEAB-B.ST"),
+    ("PLAZ B", "Platzer Fastigheter B", "https://www.avanza.se/aktier/om-aktien.html/519508/platzer-fastigheter-b", "PLAZ-B.ST"),
+    ("PNDX B", "Pandox B", "https://www.avanza.se/aktier/om-aktien.html/720476/pandox-b", "PNDX-B.ST"),
+    ("RATO B", "Ratos B", "https://www.avanza.se/aktier/om-aktien.html/5397/ratos-b", "RATO-B.ST"),
+    ("RESURS", "Resurs Holding", "https://www.avanza.se/aktier/om-aktien.html/569437/resurs-holding", "RESURS.ST"),
+    ("RVRC", "Revolution Race", "https://www.avanza.se/aktier/om-aktien.html/1041388/rvrc-holding", "RVRC.ST"),
+    ("SAGAX B", "Sagax B", "https://www.avanza.se/aktier/om-aktien.html/405815/sagax-b", "SAGAX-B.ST"),
+    ("SAVE", "Nordnet", "https://www.avanza.se/aktier/om-aktien.html/325295/nordnet", "SAVE.ST"),
+    ("SDIP B", "Sdiptech B", "https://www.avanza.se/aktier/om-aktien.html/784434/sdiptech-b", "SDIP-B.ST"),
+    ("SYSR", "Synsam Group", "https://www.avanza.se/aktier/om-aktien.html/956279/synsam-group", "SYSR.ST"),
+    ("THULE", "Thule Group", "https://www.avanza.se/aktier/om-aktien.html/521491/thule-group", "THULE.ST"),
+    ("TOBS B", "Tobii B", "https://www.avanza.se/aktier/om-aktien.html/625680/tobii-b", "TOBS-B.ST"),
+    ("TROAX", "Troax Group", "https://www.avanza.se/aktier/om-aktien.html/549766/troax-group", "TROAX.ST"),
+    ("VBG B", "VBG Group B", "https://www.avanza.se/aktier/om-aktien.html/5342/vbg-group-b", "VBG-B.ST"),
+    ("WALL B", "Wallenstam B", "https://www.avanza.se/aktier/om-aktien.html/5344/wallenstam-b", "WALL-B.ST"),
+    ("WIHL", "Wihlborgs Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/5345/wihlborgs-fastigheter", "WIHL.ST"),
+    ("XVIVO", "XVIVO Perfusion", "https://www.avanza.se/aktier/om-aktien.html/376275/xvivo-perfusion", "XVIVO.ST"),
+]
+
+
+# Kända instrument utanför skanningsuniversumet (index, gamla watchlist-aktier)
+_EXTRA_DATA: list[tuple[str, str, Optional[str], str]] = [
+    ("OMXS30", "OMX Stockholm 30", None, "^OMX"),
+    ("SWMA", "Swedish Match", None, "SWMA.ST"),
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Instrument:
+    id: int
+    ticker: str
+    name: str
+    yahoo_symbol: str
+    avanza_url: Optional[str] = None
+    in_universe: bool = False
+
+
+_instruments: list[Instrument] = []
+_by_ticker: dict[str, int] = {}
+_by_symbol: dict[str, int] = {}
+
+
+def normalize_ticker(ticker: str) -> str:
+    """'eric-b.st', 'ERIC-B', ' Eric b ' -> 'ERIC B'."""
+    t = (ticker or "").strip().upper()
+    if t.endswith(".ST"):
+        t = t[:-3]
+    return re.sub(r"[\s-]+", " ", t)
+
+
+def default_symbol(ticker: str) -> str:
+    """Same fallback as the frontend proxy: 'ARJO B' -> 'ARJO-B.ST'."""
+    return f"{normalize_ticker(ticker).replace(' ', '-')}.ST"
+
+
+def _add(ticker: str, name: str, avanza_url: Optional[str], yahoo_symbol: str, in_universe: bool) -> Instrument:
+    inst = Instrument(len(_instruments), ticker, name, yahoo_symbol, avanza_url, in_universe)
+    _instruments.append(inst)
+    _by_ticker[ticker] = inst.id
+    _by_symbol[yahoo_symbol] = inst.id
+    return inst
+
+
+for _t in _STOCK_DATA:
+    _add(*_t, in_universe=True)
+for _t in _EXTRA_DATA:
+    _add(*_t, in_universe=False)
+
+
+def get(ticker: str) -> Optional[Instrument]:
+    iid = _by_ticker.get(ticker)
+    if iid is None:
+        iid = _by_ticker.get(normalize_ticker(ticker))
+    return _instruments[iid] if iid is not None else None
+
+
+def by_id(iid: int) -> Instrument:
+    return _instruments[iid]
+
+
+def by_symbol(yahoo_symbol: str) -> Optional[Instrument]:
+    iid = _by_symbol.get(yahoo_symbol)
+    return _instruments[iid] if iid is not None else None
+
+
+def id_of(ticker: str) -> Optional[int]:
+    inst = get(ticker)
+    return inst.id if inst else None
+
+
+def ensure(ticker: str, name: Optional[str] = None) -> Instrument:
+    """Look up `ticker`, registering it (default symbol, next free ID) if unknown."""
+    inst = get(ticker)
+    if inst is None:
+        t = normalize_ticker(ticker)
+        inst = _add(t, name or t, None, default_symbol(t), in_universe=False)
+    return inst
+
+
+def canonical(ticker: str) -> str:
+    """Registry spelling of `ticker` (normalized if it is unknown)."""
+    inst = get(ticker)
+    return inst.ticker if inst else normalize_ticker(ticker)
+
+
+def yahoo_symbol(ticker: str) -> str:
+    inst = get(ticker)
+    return inst.yahoo_symbol if inst else default_symbol(ticker)
+
+
+def count() -> int:
+    return len(_instruments)
+
+
+def universe() -> list[Instrument]:
+    """The scanner universe, in table order."""
+    return [i for i in _instruments if i.in_universe]
+
+
+def export_ts(path: Path) -> None:
+    """Write the frontend maps (Yahoo symbols, Avanza links) as a TypeScript module."""
+    static = _instruments[:len(_STOCK_DATA) + len(_EXTRA_DATA)]
+    symbols = "\n".join(f"  {i.ticker!r}: {i.yahoo_symbol!r}," for i in static)
+    urls = "\n".join(f"  {i.ticker!r}: {i.avanza_url!r}," for i in static if i.avanza_url)
+    path.write_text(
+        "// Genererad av agent/instruments.py — redigera inte för hand.\n"
+        "// Kör `cd agent && python instruments.py` efter ändringar i _STOCK_DATA.\n\n"
+        f"export const YAHOO_SYMBOLS: Record<string, string> = {{\n{symbols}\n}};\n\n"
+        f"export const AVANZA_URLS: Record<string, string> = {{\n{urls}\n}};\n",
+        encoding="utf-8",
+    )
+
+
+if __name__ == "__main__":
+    out = Path(__file__).resolve().parent.parent / "frontend" / "lib" / "instruments.ts"
+    export_ts(out)
+    print(f"{count()} instrument -> {out}")
@@ -0,0 +1,207 @@
+"""
+Per-job lease lock — ensures each cron firing runs exactly once cluster-wide.
+
+During a Railway deploy the old and new containers overlap and both run
+setup_scheduler(). Every scheduled job is wrapped with singleton(), which
+claims the job's lease for the current firing slot before running:
+
+  - A firing slot (job + minute) can be claimed by one instance only.
+  - The instance that ran the previous firing is preferred while its lease
+    is valid; a standby takes over as soon as the lease expires, i.e. within
+    one loop interval if the leader dies.
+  - While the job runs the lease is renewed every ttl/3 seconds, so a run
+    longer than the TTL still blocks the standby. After the job finishes
+    the lease runs for ttl seconds from the finish.
+  - If the store is unavailable the job runs anyway (fail-open) — a
+    duplicate run is better than a missed trading loop.
+
+Supabase table (run once):
+
+    CREATE TABLE stock_job_locks (
+      job TEXT PRIMARY KEY,
+      owner TEXT NOT NULL DEFAULT '',
+      slot TEXT NOT NULL DEFAULT '',
+      expires_at TIMESTAMPTZ NOT NULL DEFAULT 'epoch',
+      updated_at TIMESTAMPTZ DEFAULT NOW()
+    );
+
+Tests and local runs can swap in the in-memory store with set_store(MemoryLockStore()).
+"""
+import asyncio
+import functools
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# Unikt per process — två containrar under deploy-overlap får olika ID
+INSTANCE_ID = os.getenv("RAILWAY_REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+_EPOCH = "1970-01-01T00:00:00+00:00"
+
+
+class MemoryLockStore:
+    """Local stand-in for stock_job_locks. Share one instance between simulated nodes."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+
+    def claim(self, job: str, owner: str, slot: str, now: datetime, ttl_s: float) -> bool:
+        row = self.rows.setdefault(job, {"owner": "", "slot": "", "expires_at": _EPOCH})
+        if row["slot"] >= slot:
+            return False
+        if row["owner"] != owner and row["expires_at"] >= now.isoformat():
+            return False
+        row.update({
+            "owner": owner,
+            "slot": slot,
+            "expires_at": (now + timedelta(seconds=ttl_s)).isoformat(),
+        })
+        return True
+
+    def renew(self, job: str, owner: str, slot: str, now: datetime, ttl_s: float) -> bool:
+        row = self.rows.get(job)
+        if not row or row["owner"] != owner or row["slot"] != slot:
+            return False
+        row["expires_at"] = (now + timedelta(seconds=ttl_s)).isoformat()
+        return True
+
+
+class SupabaseLockStore:
+    """Lease rows in stock_job_locks. The conditional UPDATE is atomic in Postgres,
+    so only one instance can move `slot` forward for a given firing."""
+
+    def claim(self, job: str, owner: str, slot: str, now: datetime, ttl_s: float) -> bool:
+        from db.supabase_client import get_client
+        client = get_client()
+        client.table("stock_job_locks").upsert(
+            {"job": job, "owner": "", "slot": "", "expires_at": _EPOCH},
+            on_conflict="job",
+            ignore_duplicates=True,
+        ).execute()
+        now_iso = now.isoformat()
+        result = (
+            client.table("stock_job_locks")
+            .update({
+                "owner": owner,
+                "slot": slot,
+                "expires_at": (now + timedelta(seconds=ttl_s)).isoformat(),
+                "updated_at": now_iso,
+            })
+            .eq("job", job)
+            .lt("slot", slot)
+            .or_(f"owner.eq.{owner},expires_at.lt.{now_iso}")
+            .execute()
+        )
+        return bool(result.data)
+
+    def renew(self, job: str, owner: str, slot: str, now: datetime, ttl_s: float) -> bool:
+        from db.supabase_client import get_client
+        result = (
+            get_client().table("stock_job_locks")
+            .update({
+                "expires_at": (now + timedelta(seconds=ttl_s)).isoformat(),
+                "updated_at": now.isoformat(),
+            })
+            .eq("job", job)
+            .eq("owner", owner)
+            .eq("slot", slot)
+            .execute()
+        )
+        return bool(result.data)
+
+
+_store = SupabaseLockStore()
+
+# Statistik per jobb — exponeras via /health
+_stats: dict[str, dict] = {}
+
+
+def set_store(store):
+    """Replace the lock store (e.g. MemoryLockStore() in tests/local runs)."""
+    global _store
+    _store = store
+
+
+def get_stats() -> dict:
+    return {"instance_id": INSTANCE_ID, "jobs": {k: dict(v) for k, v in _stats.items()}}
+
+
+def _slot(now: datetime) -> str:
+    # Cron-jobben har minutupplösning — båda instanserna räknar fram samma slot
+    return now.replace(second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M")
+
+
+# job -> slot som den här instansen senast tog (för förnyelse av leasen)
+_held: dict[str, str] = {}
+
+
+async def try_acquire(job: str, ttl_s: float = 90) -> bool:
+    """Claim `job` for the current firing slot. Returns True if this instance should run it."""
+    now = datetime.now(timezone.utc)
+    stats = _stats.setdefault(job, {"ran": 0, "skipped": 0, "store_errors": 0, "renewals": 0, "lost": 0})
+    try:
+        acquired = _store.claim(job, INSTANCE_ID, _slot(now), now, ttl_s)
+        if acquired:
+            _held[job] = _slot(now)
+    except Exception as e:
+        stats["store_errors"] += 1
+        logger.warning(f"[Leader] Kunde inte ta lås för {job}: {e} — kör ändå")
+        acquired = True
+    if acquired:
+        stats["ran"] += 1
+    else:
+        stats["skipped"] += 1
+        logger.info(f"[Leader] {job} hoppas över — körs av annan instans")
+    return acquired
+
+
+def renew(job: str, ttl_s: float = 90) -> bool:
+    """Extend this instance's lease on `job` to now + ttl_s. False if it is no longer ours."""
+    slot = _held.get(job)
+    if slot is None:
+        return False
+    stats = _stats.setdefault(job, {"ran": 0, "skipped": 0, "store_errors": 0, "renewals": 0, "lost": 0})
+    try:
+        renewed = _store.renew(job, INSTANCE_ID, slot, datetime.now(timezone.utc), ttl_s)
+    except Exception as e:
+        stats["store_errors"] += 1
+        logger.warning(f"[Leader] Kunde inte förnya lås för {job}: {e}")
+        return False
+    if renewed:
+        stats["renewals"] += 1
+    else:
+        stats["lost"] += 1
+        logger.warning(f"[Leader] Leasen för {job} tillhör inte längre den här instansen")
+    return renewed
+
+
+async def _keep_lease(job: str, ttl_s: float):
+    """Heartbeat while the job runs — renews the lease every ttl_s/3 seconds."""
+    while True:
+        await asyncio.sleep(ttl_s / 3)
+        renew(job, ttl_s)
+
+
+def singleton(job: str, func, ttl_s: float = 90):
+    """Wrap a coroutine function so it only runs on the instance holding the job's lease.
+
+    The lease is held (renewed) for as long as the job runs. ttl_s should be
+    shorter than the job's interval so a standby can take over on the next
+    firing if the leader dies.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not await try_acquire(job, ttl_s):
+            return None
+        heartbeat = asyncio.create_task(_keep_lease(job, ttl_s))
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            heartbeat.cancel()
+            # Leasen räknas från när jobbet blev klart, inte från när det startade
+            renew(job, ttl_s)
+    return wrapper
@@ -1,9 +1,8 @@
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from scheduler import setup_scheduler, load_open_positions
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,16 +13,13 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Tunga moduler laddas i bakgrunden (startup.boot) — /health svarar direkt
     logger.info("Startar AKTIEMOTOR...")
-    import settings
-    await settings.load()
-    sched = setup_scheduler()
-    sched.start()
-    await load_open_positions()
-    logger.info("Scheduler igång.")
+    import asyncio
+    import startup
+    boot = asyncio.create_task(startup.boot())
     yield
-    sched.shutdown()
-    logger.info("Scheduler stoppad.")
+    await startup.shutdown(boot)
 
 
 app = FastAPI(title="Aktiemotor API", version="1.0.0", lifespan=lifespan)
@@ -34,93 +30,128 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "service": "aktiemotor"}
+    from startup import startup_stats
+    if not startup_stats["ready"]:
+        return {
+            "status": "error" if startup_stats["phase"] == "failed" else "starting",
+            "service": "aktiemotor",
+            "startup": startup_stats,
+        }
+    import leader
+    from scheduler import loop_stats
+    from triggers import trigger_stats
+    return {
+        "status": "ok",
+        "service": "aktiemotor",
+        "startup": startup_stats,
+        "leader": leader.get_stats(),
+        "trading_loop": loop_stats,
+        "triggers": trigger_stats,
+    }
+
 
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once startup is done and the caches are warm, else 503."""
+    from fastapi.responses import JSONResponse
+    from startup import startup_stats
+    if not (startup_stats["ready"] and startup_stats["warm"]):
+        return JSONResponse({"ready": False, "startup": startup_stats}, status_code=503)
+    return {"ready": True, "warm_up": startup_stats["warm_up"]}
 
-_summary_cache: dict = {}
-_SUMMARY_TTL = 60  # sekunder — minskar Supabase+Yahoo-anrop från 4–6/minut till 1/minut
+
+@app.get("/api/loop-stats")
+async def get_loop_stats():
+    """Trading loop counters and the latest per-stage latency (seconds) per ticker."""
+    from scheduler import loop_stats, stage_latency
+    from data.insider_fetcher import insider_stats
+    from data.news_fetcher import news_stats
+    return {"loop": loop_stats, "stage_latency": stage_latency, "insider": insider_stats, "news": news_stats}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: loop/stage/upstream/DB latency, errors, cache hits, Gemini queue, signals."""
+    from fastapi.responses import PlainTextResponse
+    import metrics
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/profile")
+async def get_profile(seconds: float = 10, mode: str = "wall", interval_ms: float = 10, format: str = "collapsed"):
+    """Sample the live process for `seconds` (mode wall, cpu or memory).
+
+    format=collapsed returns flamegraph-compatible stacks as text,
+    format=json the heaviest stacks and frames.
+    """
+    from fastapi.responses import PlainTextResponse
+    import profiler
+    try:
+        result = await profiler.profile(seconds, mode, interval_ms)
+    except (ValueError, RuntimeError) as e:
+        return {"error": str(e)}
+    if format == "json":
+        return profiler.summary(result)
+    return PlainTextResponse(profiler.collapsed(result))
+
+
+@app.get("/api/traces")
+async def get_traces(limit: int = 10, name: str = None):
+    """Latest finished traces (trading_loop, process_ticker, scans, ...) with their critical path."""
+    import tracing
+    return {"stats": tracing.trace_stats, "traces": tracing.summaries(limit, name)}
+
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """All spans of one trace in start order, and its critical path."""
+    import tracing
+    trace = tracing.get_trace(trace_id)
+    if trace is None:
+        return {"error": "Trace finns inte (längre) i minnet"}
+    return {"trace_id": trace_id, **trace}
+
+
+@app.get("/api/events")
+async def get_events(last_event_id: str | None = Header(None)):
+    """Server-Sent Events: snapshot, then quotes, indicators, signals and valuations as they change."""
+    from fastapi.responses import StreamingResponse
+    import events
+    return StreamingResponse(
+        events.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/summary")
 async def get_summary():
     """Portfolio summary: deposits → current value, with full P&L and available cash."""
-    import time as _time
-    from db.supabase_client import get_client, get_total_deposited
-    from data.yahoo_client import get_current_price
-    from scheduler import open_positions
+    import portfolio
+    return await portfolio.summary()
 
-    now_mono = _time.monotonic()
-    if _summary_cache.get("data") and now_mono < _summary_cache.get("expires", 0):
-        return _summary_cache["data"]
 
-    # Total deposited capital (sum of all deposits)
+async def _list_page(response: Response, table: str, **kwargs):
+    """One keyset page of `table` (db.pages); the next page's cursor goes in X-Next-Cursor."""
+    from db import pages
     try:
-        total_deposited = await get_total_deposited()
-    except Exception:
-        from config import PAPER_BALANCE
-        total_deposited = PAPER_BALANCE
-
-    # Realized P&L from closed trades
-    try:
-        result = get_client().table("stock_trades").select("pnl_kr,total_value").eq("status", "closed").execute()
-        realized_pnl = sum(r["pnl_kr"] or 0 for r in (result.data or []))
-    except Exception:
-        realized_pnl = 0.0
-
-    # Open positions: invested at cost + live market value
-    invested = 0.0
-    market_value = 0.0
-    for ticker, pos in open_positions.items():
-        qty = pos["quantity"]
-        entry = pos["price"]
-        invested += entry * qty
-        try:
-            current = await get_current_price(ticker)
-            live = current.get("price") or entry
-        except Exception:
-            live = entry
-        market_value += live * qty
-
-    unrealized_pnl = market_value - invested
-
-    # Cash = deposits + realized gains/losses - currently invested at cost
-    cash = max(0.0, total_deposited + realized_pnl - invested)
-
-    # Total portfolio value = cash + current market value of open positions
-    total_value = cash + market_value
-    total_pct = ((total_value - total_deposited) / total_deposited) * 100 if total_deposited else 0.0
-
-    result = {
-        "total_deposited": round(total_deposited, 2),   # What you put in total
-        "available_cash": round(cash, 2),               # Free to use right now
-        "invested": round(invested, 2),                 # Locked in open positions (at cost)
-        "market_value": round(market_value, 2),         # Current value of open positions
-        "realized_pnl": round(realized_pnl, 2),         # Locked-in gains/losses
-        "unrealized_pnl": round(unrealized_pnl, 2),     # Floating gains/losses
-        "total_value": round(total_value, 2),           # The number that matters
-        "total_pct": round(total_pct, 2),               # Return vs total deposited
-    }
-    _summary_cache["data"] = result
-    _summary_cache["expires"] = _time.monotonic() + _SUMMARY_TTL
-    return result
+        rows, next_cursor = await pages.fetch(table, **kwargs)
+    except ValueError as e:
+        return {"error": str(e)}
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 
 @app.get("/api/deposits")
-async def get_deposits():
-    from db.supabase_client import get_client
-    result = (
-        get_client()
-        .table("stock_deposits")
-        .select("*")
-        .order("created_at", desc=True)
-        .execute()
-    )
-    return result.data
+async def get_deposits(response: Response, limit: int = 100, cursor: str = None, fields: str = None):
+    return await _list_page(response, "stock_deposits", fields=fields, limit=limit, cursor=cursor)
 
 
 @app.post("/api/deposits")
@@ -131,6 +162,8 @@ async def add_deposit(body: dict):
     if amount <= 0:
         return {"error": "Beloppet maste vara positivt"}
     deposit_id = await db_add(amount, note)
+    import portfolio
+    portfolio.changed()
     return {"ok": True, "id": deposit_id, "amount": amount}
 
 
@@ -143,44 +176,16 @@ async def get_watchlist():
 @app.get("/api/positions")
 async def get_positions():
     """Return open positions with live price and P&L."""
-    from scheduler import open_positions
-    from data.yahoo_client import get_current_price
-
-    result = {}
-    for ticker, pos in open_positions.items():
-        try:
-            current = await get_current_price(ticker)
-            current_price = current.get("price") or pos["price"]
-        except Exception:
-            current_price = pos["price"]
-
-        entry = pos["price"]
-        qty = pos["quantity"]
-        pnl_kr = round((current_price - entry) * qty, 2)
-        pnl_pct = round(((current_price - entry) / entry) * 100, 2) if entry else 0.0
-
-        result[ticker] = {
-            **pos,
-            "current_price": current_price,
-            "pnl_kr": pnl_kr,
-            "pnl_pct": pnl_pct,
-        }
-    return result
+    import portfolio
+    return await portfolio.positions()
 
 
 @app.get("/api/signals")
-async def get_signals(limit: int = 50, status: str = None):
-    from db.supabase_client import get_client
-    query = (
-        get_client()
-        .table("stock_signals")
-        .select("*")
-        .order("created_at", desc=True)
-        .limit(limit)
+async def get_signals(response: Response, limit: int = 50, status: str = None, cursor: str = None, fields: str = None):
+    """Signals, newest first. Pass X-Next-Cursor back as ?cursor= for the next page."""
+    return await _list_page(
+        response, "stock_signals", fields=fields, filters={"status": status}, limit=limit, cursor=cursor,
     )
-    if status:
-        query = query.eq("status", status)
-    return query.execute().data
 
 
 class ConfirmBody(BaseModel):
@@ -238,6 +243,11 @@ async def confirm_signal(signal_id: str, body: ConfirmBody = None):
 
     _scheduler.daily_trades += 1
 
+    import events
+    import portfolio
+    events.publish("signal_status", {"id": signal_id, "ticker": signal["ticker"], "status": "confirmed"})
+    portfolio.changed()
+
     return {"ok": True, "trade_id": trade_id, "ticker": signal["ticker"], "entry_price": entry_price, "quantity": quantity}
 
 
@@ -245,23 +255,25 @@ async def confirm_signal(signal_id: str, body: ConfirmBody = None):
 async def reject_signal(signal_id: str):
     """User rejects a pending BUY signal."""
     from db.supabase_client import reject_signal as db_reject
+    import events
     await db_reject(signal_id)
+    events.publish("signal_status", {"id": signal_id, "status": "rejected"})
     return {"ok": True}
 
 
 @app.get("/api/trades")
-async def get_trades(status: str = None):
-    """All trades with optional status filter: open | closed."""
-    from db.supabase_client import get_client
-    query = (
-        get_client()
-        .table("stock_trades")
-        .select("*")
-        .order("created_at", desc=True)
+async def get_trades(response: Response, status: str = None, limit: int = 100, cursor: str = None, fields: str = None):
+    """Trades with optional status filter: open | closed. Paged like /api/signals."""
+    return await _list_page(
+        response, "stock_trades", fields=fields, filters={"status": status}, limit=limit, cursor=cursor,
     )
-    if status:
-        query = query.eq("status", status)
-    return query.execute().data
+
+
+@app.get("/api/trades/stats")
+async def get_trade_stats():
+    """Closed-trade count, wins, losses and realized P&L — for the statistics cards."""
+    from db.supabase_client import get_trade_stats as db_stats
+    return await db_stats()
 
 
 class CloseBody(BaseModel):
@@ -304,6 +316,8 @@ async def close_trade_manual(trade_id: str, body: CloseBody = None):
 
     if ticker in open_positions:
         del open_positions[ticker]
+    import portfolio
+    portfolio.changed()
 
     return {
         "ok": True,
@@ -314,18 +328,10 @@ async def close_trade_manual(trade_id: str, body: CloseBody = None):
 
 
 @app.get("/api/news")
-async def get_news(ticker: str = None, limit: int = 50):
-    from db.supabase_client import get_client
-    query = (
-        get_client()
-        .table("stock_news")
-        .select("*")
-        .order("created_at", desc=True)
-        .limit(limit)
+async def get_news(response: Response, ticker: str = None, limit: int = 50, cursor: str = None, fields: str = None):
+    return await _list_page(
+        response, "stock_news", fields=fields, filters={"ticker": ticker}, limit=limit, cursor=cursor,
     )
-    if ticker:
-        query = query.eq("ticker", ticker)
-    return query.execute().data
 
 
 @app.post("/api/news/cleanup")
@@ -348,36 +354,34 @@ async def cleanup_duplicate_news():
 
     for news_id in to_delete:
         client.table("stock_news").delete().eq("id", news_id).execute()
+    from db import pages
+    pages.invalidate("stock_news")
 
     return {"ok": True, "deleted": len(to_delete), "kept": len(seen)}
 
 
 @app.get("/api/portfolio")
-async def get_portfolio():
-    from db.supabase_client import get_client
-    result = (
-        get_client()
-        .table("stock_portfolio")
-        .select("*")
-        .order("created_at", desc=True)
-        .execute()
-    )
-    return result.data
+async def get_portfolio(response: Response, limit: int = 100, cursor: str = None, fields: str = None):
+    return await _list_page(response, "stock_portfolio", fields=fields, limit=limit, cursor=cursor)
+
+
+@app.get("/api/indicators")
+async def get_all_indicators(tickers: str | None = None):
+    """Current indicators for every active watchlist ticker (or ?tickers=A,B), highest buy_score first."""
+    from db import supabase_client as db
+    if tickers:
+        wanted = [t.strip() for t in tickers.split(",") if t.strip()]
+    else:
+        wanted = [s["ticker"] for s in await db.get_watchlist()]
+    rows = await db.get_latest_indicators(wanted)
+    return sorted(rows, key=lambda r: r.get("buy_score") if r.get("buy_score") is not None else -1, reverse=True)
 
 
 @app.get("/api/indicators/{ticker}")
 async def get_indicators(ticker: str):
-    from db.supabase_client import get_client
-    result = (
-        get_client()
-        .table("stock_indicators")
-        .select("*")
-        .eq("ticker", ticker)
-        .order("timestamp", desc=True)
-        .limit(1)
-        .execute()
-    )
-    return result.data[0] if result.data else {}
+    from db.supabase_client import get_latest_indicators
+    rows = await get_latest_indicators([ticker])
+    return rows[0] if rows else {}
 
 
 @app.get("/api/test/{ticker}")
@@ -385,9 +389,10 @@ async def test_ticker(ticker: str):
     """Manually run a full analysis for a ticker and return the result. No DB writes."""
     from data.yahoo_client import get_price_history, get_current_price
     from analysis.indicators import calculate_indicators
-    from analysis.decision_engine import score_buy_signal, score_sell_signal
+    from analysis.decision_engine import score_buy_signal, score_sell_signal, render_reasons
+    import instruments
 
-    ticker = ticker.upper()
+    ticker = instruments.canonical(ticker)
     df = await get_price_history(ticker, days=220)
     if df.empty:
         return {"error": f"Ingen data fran Yahoo Finance for {ticker}."}
@@ -405,9 +410,9 @@ async def test_ticker(ticker: str):
         "ticker": ticker,
         "price": price,
         "data_points": len(df),
-        "indicators": indicators,
+        "indicators": dict(indicators),
         "buy_score": buy_score,
-        "buy_reasons": buy_reasons,
+        "buy_reasons": render_reasons(buy_reasons),
         "signal_threshold": 60,
         "would_trigger_buy": buy_score >= 60,
     }
@@ -419,12 +424,11 @@ async def fetch_news_for_ticker(ticker: str):
     from data.news_fetcher import fetch_news
     from analysis.sentiment import analyze_sentiment
     from db import supabase_client as db
-    from db.supabase_client import get_watchlist
+    import instruments
 
-    ticker = ticker.upper()
-    watchlist = await get_watchlist()
-    stock = next((s for s in watchlist if s["ticker"] == ticker), {})
-    company = stock.get("name", ticker)
+    ticker = instruments.canonical(ticker)
+    stock = await db.get_watchlist_entry(ticker)
+    company = stock.get("name") or instruments.ensure(ticker).name
 
     news_list = await fetch_news(ticker, company, max_items=5)
     if not news_list:
@@ -594,6 +598,14 @@ async def reset_all():
     db.table("stock_signals").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
     db.table("stock_deposits").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
     db.table("stock_notifications").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+    from db import pages
+    for table in ("stock_trades", "stock_signals", "stock_deposits"):
+        pages.invalidate(table)
+    try:
+        from db.supabase_client import reset_totals
+        await reset_totals()
+    except Exception as e:
+        logger.warning(f"Kunde inte nollställa portföljsummorna: {e}")
 
     open_positions.clear()
 
@@ -608,6 +620,26 @@ async def trigger_scan():
     return {"ok": True, "message": "Skanning startad."}
 
 
+@app.get("/api/retention")
+async def get_retention_stats():
+    """Counters and the latest result of the intraday-row compaction."""
+    from retention import retention_stats
+    return retention_stats
+
+
+@app.post("/api/retention/run")
+async def run_retention(days: int = None, max_days: int = 30):
+    """Roll up and delete stock_prices/stock_indicators rows older than `days` (default RAW_RETENTION_DAYS)."""
+    import retention
+    from config import RAW_RETENTION_DAYS
+    try:
+        result = await retention.compact(days if days is not None else RAW_RETENTION_DAYS, max_days)
+    except Exception as e:
+        logger.error(f"Kompaktering misslyckades: {e}", exc_info=True)
+        return {"error": str(e)}
+    return {"ok": True, **result}
+
+
 def _is_trading_hours() -> bool:
     """Return True if current Stockholm time is Mon–Fri 09:00–17:30."""
     from zoneinfo import ZoneInfo
@@ -630,10 +662,10 @@ async def trigger_single_ticker(ticker: str):
     """Manually run process_ticker for a single ticker (full DB writes + signal generation).
     Runs synchronously so the caller knows if it succeeded."""
     from scheduler import process_ticker
-    from db.supabase_client import get_watchlist
-    ticker = ticker.upper()
-    watchlist = await get_watchlist()
-    stock_config = next((s for s in watchlist if s["ticker"] == ticker), {})
+    from db.supabase_client import get_watchlist_entry
+    import instruments
+    ticker = instruments.canonical(ticker)
+    stock_config = await get_watchlist_entry(ticker)
     try:
         await process_ticker(ticker, stock_config, None, "NEUTRAL", None, True)
         return {"ok": True, "message": f"Analys av {ticker} klar — data sparat."}
@@ -707,11 +739,17 @@ async def _run_discovery_scan_bg():
         _discovery_scan_result = {"ok": False, "error": str(e)}
     finally:
         _discovery_scan_running = False
+        import events
+        events.publish("discovery", {
+            "ok": _discovery_scan_result["ok"],
+            "error": _discovery_scan_result.get("error"),
+        })
 
 @app.post("/api/discovery-scan")
 async def trigger_discovery_scan():
     """Trigger a discovery scan in the background. Returns immediately.
-    Poll /api/discovery-scan/status or /api/discovery-scan/latest for results."""
+    Completion is pushed as a "discovery" event on /api/events; /api/discovery-scan/status
+    and /api/discovery-scan/latest still work for polling."""
     global _discovery_scan_running, _discovery_scan_result
     if _discovery_scan_running:
         return {"ok": True, "status": "already_running"}
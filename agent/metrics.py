@@ -0,0 +1,209 @@
+"""
+Prometheus metrics for the agent's internals — served as text on /metrics.
+
+Everything is in-process counters and fixed-bucket histograms: recording a
+value is a dict lookup and an integer add on the event loop — no I/O and no
+locks. Latencies are taken from finished tracing spans (tracing.on_finish),
+so every traced stage, upstream call and DB query is measured without extra
+timing code:
+
+    aktiemotor_loop_duration_seconds              trading_loop
+    aktiemotor_ticker_duration_seconds            process_ticker
+    aktiemotor_stage_duration_seconds{stage}      process_ticker-steg (stage.*)
+    aktiemotor_upstream_duration_seconds{service} market / news / fi / gemini / ntfy
+    aktiemotor_upstream_errors_total{service}     undantag eller HTTP-status >= 400
+    aktiemotor_db_duration_seconds{op}            @traced-funktioner i supabase_client
+
+Cache lookups, signals and Gemini calls are counted where they happen; sizes
+and the existing stats dicts (loop_stats, news_stats, ...) are read when
+/metrics is scraped. Hit ratio per cache in PromQL:
+
+    rate(aktiemotor_cache_lookups_total{result="hit"}[5m])
+      / ignoring(result) sum without(result) (rate(aktiemotor_cache_lookups_total[5m]))
+"""
+from bisect import bisect_left
+
+import tracing
+
+_PREFIX = "aktiemotor_"
+
+_FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_LOOP_BUCKETS = (1, 5, 10, 30, 60, 90, 120, 180, 300, 600)
+_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20)
+
+_registry: list = []
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = _PREFIX + name
+        self.help = help
+        self.label_names = labels
+        self.values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, *labels, by: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + by
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self.values.items()):
+            out.append(f"{self.name}{_labels(self.label_names, labels)} {v:g}")
+        return out
+
+
+class Gauge(Counter):
+    def dec(self, *labels, by: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - by
+
+    def set(self, value: float, *labels):
+        self.values[labels] = value
+
+    def render(self) -> list[str]:
+        out = super().render()
+        out[1] = f"# TYPE {self.name} gauge"
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = _FAST_BUCKETS):
+        self.name = _PREFIX + name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        # labels -> [antal per hink (ej kumulativt) ..., +Inf, summa]
+        self.values: dict[tuple, list] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, *labels):
+        row = self.values.get(labels)
+        if row is None:
+            row = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, row in sorted(self.values.items()):
+            names = self.label_names + ("le",)
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), row):
+                cumulative += n
+                out.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, labels)} {row[-1]:.6f}")
+            out.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return out
+
+
+loop_duration = Histogram("loop_duration_seconds", "Trading loop wall time", buckets=_LOOP_BUCKETS)
+loop_signals = Histogram("loop_signals", "Signals saved per trading loop run", buckets=_COUNT_BUCKETS)
+ticker_duration = Histogram("ticker_duration_seconds", "process_ticker wall time")
+stage_duration = Histogram("stage_duration_seconds", "process_ticker stage latency", ("stage",))
+stage_timeouts = Counter("stage_timeouts_total", "Stages cancelled by their time budget", ("stage",))
+upstream_duration = Histogram("upstream_duration_seconds", "Upstream call latency incl. retries", ("service",))
+upstream_errors = Counter("upstream_errors_total", "Upstream calls that failed or answered >= 400", ("service",))
+db_duration = Histogram("db_duration_seconds", "Supabase query latency", ("op",))
+cache_lookups = Counter("cache_lookups_total", "Cache lookups by result", ("cache", "result"))
+signals = Counter("signals_total", "Signals saved", ("signal_type",))
+gemini_inflight = Gauge("gemini_inflight", "Gemini calls in progress (incl. waiting on a 429 retry)")
+
+
+def cache_lookup(cache: str, hit: bool):
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+
+
+def _observe_span(s):
+    seconds = (s.end_ns - s.start_ns) / 1e9
+    head, _, tail = s.name.partition(".")
+    if head == "http" or head == "market":
+        if s.attrs.get("cache_hit"):
+            return  # ingen nätverkstur — räknas i cache_lookups
+        service = tail if head == "http" else "market"
+        upstream_duration.observe(seconds, service)
+        if s.error or s.attrs.get("status", 0) >= 400:
+            upstream_errors.inc(service)
+    elif head == "stage":
+        stage_duration.observe(seconds, tail)
+        if s.attrs.get("timeout"):
+            stage_timeouts.inc(tail)
+    elif head == "db":
+        db_duration.observe(seconds, tail)
+    elif s.name == "process_ticker":
+        ticker_duration.observe(seconds)
+    elif s.name == "trading_loop":
+        loop_duration.observe(seconds)
+
+
+tracing.on_finish(_observe_span)
+
+
+# ── Läses vid scrape ───────────────────────────────────────────────────
+
+def _state_lines() -> list[str]:
+    """Gauges and counters read from module state at scrape time."""
+    import events
+    import retention
+    import scheduler
+    from analysis import sentiment
+    from data import insider_fetcher, news_fetcher, yahoo_client
+
+    out = []
+
+    def emit(name: str, kind: str, help: str, samples: dict):
+        out.extend([f"# HELP {_PREFIX}{name} {help}", f"# TYPE {_PREFIX}{name} {kind}"])
+        for labels, v in samples.items():
+            out.append(f"{_PREFIX}{name}{labels} {v:g}")
+
+    emit("cache_entries", "gauge", "Entries held per in-memory cache", {
+        '{cache="market"}': len(yahoo_client._cache),
+        '{cache="news"}': len(news_fetcher._feeds),
+        '{cache="sentiment"}': len(sentiment._sentiment_cache),
+        '{cache="description"}': len(scheduler._description_cache),
+    })
+    emit("loop_runs_total", "counter", "Trading loop runs started", {"": scheduler.loop_stats["runs"]})
+    emit("loop_skipped_overlap_total", "counter", "Trading loop runs skipped while one was running",
+         {"": scheduler.loop_stats["skipped_overlap"]})
+    emit("tickers_total", "counter", "Tickers analysed or deferred by the adaptive cadence", {
+        '{result="processed"}': scheduler.loop_stats["tickers_processed"],
+        '{result="deferred"}': scheduler.loop_stats["tickers_deferred"],
+    })
+    emit("open_positions", "gauge", "Open positions", {"": len(scheduler.open_positions)})
+    emit("news_requests_total", "counter", "News feed polls by outcome", {
+        '{result="parsed"}': news_fetcher.news_stats["parsed"],
+        '{result="not_modified"}': news_fetcher.news_stats["not_modified"],
+    })
+    emit("insider_refreshes_total", "counter", "FI register refreshes", {
+        '{result="ok"}': insider_fetcher.insider_stats["refreshes"],
+        '{result="error"}': insider_fetcher.insider_stats["refresh_errors"],
+    })
+    emit("gemini_rate_limited", "gauge", "Gemini 429s this hour", {"": sentiment._ai_stats["calls_rate_limited"]})
+    emit("trace_spans_total", "counter", "Tracing spans recorded", {"": tracing.trace_stats["spans"]})
+    emit("retention_rows_deleted_total", "counter", "Raw intraday rows rolled up and deleted", {
+        f'{{table="{table}"}}': n for table, n in retention.retention_stats["rows_deleted"].items()
+    })
+    emit("sse_subscribers", "gauge", "Dashboard connections on /api/events", {"": events.subscribers()})
+    emit("events_total", "counter", "Live events by outcome", {
+        '{result="published"}': events.event_stats["published"],
+        '{result="unchanged"}': events.event_stats["unchanged"],
+        '{result="resync"}': events.event_stats["resyncs"],
+    })
+    return out
+
+
+def render() -> str:
+    """The Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(_state_lines())
+    return "\n".join(lines) + "\n"
@@ -4,6 +4,7 @@ import httpx
 import uuid as _uuid
 from datetime import datetime, timezone
 from config import NTFY_URL, PAPER_TRADING, FRONTEND_URL
+import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -118,19 +119,23 @@ async def _send(
     if click_url:
         headers["Click"] = click_url
 
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(
-                NTFY_URL,
-                content=message.encode("utf-8"),
-                headers=headers,
-                timeout=10,
-            )
-        except Exception as e:
-            logger.error(f"ntfy error: {e}")
-
-    # Log to Supabase regardless of ntfy success
-    await _log(notif_type, title, message, ticker)
+    with tracing.span("notify", type=notif_type, ticker=ticker or ""):
+        with tracing.span("http.ntfy") as sp:
+            async with httpx.AsyncClient() as client:
+                try:
+                    resp = await client.post(
+                        NTFY_URL,
+                        content=message.encode("utf-8"),
+                        headers=headers,
+                        timeout=10,
+                    )
+                    sp.attrs["status"] = resp.status_code
+                except Exception as e:
+                    sp.error = type(e).__name__
+                    logger.error(f"ntfy error: {e}")
+
+        # Log to Supabase regardless of ntfy success
+        await _log(notif_type, title, message, ticker)
 
 
 async def _log(notif_type: str, title: str, message: str, ticker: str = None):
@@ -0,0 +1,124 @@
+"""
+Portfolio valuation shared by /api/summary, /api/positions and the live push.
+
+summary() and positions() are what the endpoints used to compute inline.
+They live here so the trading loop can value the portfolio once per run and
+publish it to every dashboard tab (events.py). That way the tabs don't each
+poll Supabase and Yahoo for the same numbers.
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_summary_cache: dict = {}
+_SUMMARY_TTL = 60  # sekunder — minskar Supabase+Yahoo-anrop från 4–6/minut till 1/minut
+
+
+def invalidate():
+    """Drop the cached summary — call after a trade, close or deposit."""
+    _summary_cache.clear()
+
+
+async def summary(fresh: bool = False) -> dict:
+    """Portfolio summary: deposits → current value, with full P&L and available cash."""
+    from db.supabase_client import get_totals
+    from data.yahoo_client import get_current_price
+    from scheduler import open_positions
+
+    if not fresh and _summary_cache.get("data") and time.monotonic() < _summary_cache.get("expires", 0):
+        return _summary_cache["data"]
+
+    # Total deposited capital and realized P&L — running totals, one row read
+    try:
+        totals = await get_totals()
+        total_deposited, realized_pnl = totals["deposited"], totals["realized_pnl"]
+    except Exception:
+        from config import PAPER_BALANCE
+        total_deposited, realized_pnl = PAPER_BALANCE, 0.0
+
+    # Open positions: invested at cost + live market value
+    invested = 0.0
+    market_value = 0.0
+    for ticker, pos in open_positions.items():
+        qty = pos["quantity"]
+        entry = pos["price"]
+        invested += entry * qty
+        try:
+            current = await get_current_price(ticker)
+            live = current.get("price") or entry
+        except Exception:
+            live = entry
+        market_value += live * qty
+
+    unrealized_pnl = market_value - invested
+
+    # Cash = deposits + realized gains/losses - currently invested at cost
+    cash = max(0.0, total_deposited + realized_pnl - invested)
+
+    # Total portfolio value = cash + current market value of open positions
+    total_value = cash + market_value
+    total_pct = ((total_value - total_deposited) / total_deposited) * 100 if total_deposited else 0.0
+
+    result = {
+        "total_deposited": round(total_deposited, 2),   # What you put in total
+        "available_cash": round(cash, 2),               # Free to use right now
+        "invested": round(invested, 2),                 # Locked in open positions (at cost)
+        "market_value": round(market_value, 2),         # Current value of open positions
+        "realized_pnl": round(realized_pnl, 2),         # Locked-in gains/losses
+        "unrealized_pnl": round(unrealized_pnl, 2),     # Floating gains/losses
+        "total_value": round(total_value, 2),           # The number that matters
+        "total_pct": round(total_pct, 2),               # Return vs total deposited
+    }
+    _summary_cache["data"] = result
+    _summary_cache["expires"] = time.monotonic() + _SUMMARY_TTL
+    return result
+
+
+async def positions() -> dict:
+    """Open positions with live price and P&L."""
+    from scheduler import open_positions
+    from data.yahoo_client import get_current_price
+
+    result = {}
+    for ticker, pos in list(open_positions.items()):
+        try:
+            current = await get_current_price(ticker)
+            current_price = current.get("price") or pos["price"]
+        except Exception:
+            current_price = pos["price"]
+
+        entry = pos["price"]
+        qty = pos["quantity"]
+        pnl_kr = round((current_price - entry) * qty, 2)
+        pnl_pct = round(((current_price - entry) / entry) * 100, 2) if entry else 0.0
+
+        result[ticker] = {
+            **pos,
+            "current_price": current_price,
+            "pnl_kr": pnl_kr,
+            "pnl_pct": pnl_pct,
+        }
+    return result
+
+
+async def publish():
+    """Value the portfolio once and push summary + positions to the dashboards."""
+    import events
+    try:
+        events.publish("summary", await summary(fresh=True))
+        events.publish("positions", await positions())
+    except Exception as e:
+        logger.warning(f"Kunde inte värdera portföljen för dashboarden: {e}")
+
+
+_pending: set = set()
+
+
+def changed():
+    """A trade, close or deposit happened: revalue and push in the background."""
+    invalidate()
+    task = asyncio.create_task(publish())
+    _pending.add(task)  # håll en referens tills den är klar
+    task.add_done_callback(_pending.discard)
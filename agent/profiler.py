@@ -0,0 +1,210 @@
+"""
+On-demand sampling profiler for the running agent (GET /api/profile).
+
+Nothing runs until a profile is requested — there is no hook, signal
+handler or tracer installed, so the cost when inactive is zero. A request
+samples the process for `seconds` and returns the result in the collapsed
+stack format ("frame;frame;frame weight" per line) that flamegraph.pl,
+inferno, speedscope and Grafana/Pyroscope read directly.
+
+    wall     every `interval_ms`, the stack of every thread (weight = samples).
+             The event loop thread's stack is prefixed with the task that is
+             running; suspended asyncio tasks are sampled too, from their
+             await chain — so time spent waiting on Yahoo, Gemini or Supabase
+             shows up under the task that waits, not as an idle event loop.
+    cpu      the same stacks, weighted by the CPU time (µs) each thread used
+             since the previous sample (per-thread CPU clocks), so waiting
+             threads and suspended tasks drop out: pandas_ta, JSON parsing.
+    memory   tracemalloc for the window; stacks weighted by bytes allocated
+             during the window and still alive at its end.
+
+Sampling runs in a worker thread and walks sys._current_frames(); at the
+default 10 ms interval that costs on the order of 1 % of one core while active.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MODES = ("wall", "cpu", "memory")
+MAX_SECONDS = 120
+_MEMORY_FRAMES = 25
+
+_AGENT_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+_running = False
+
+
+def _short(filename: str) -> str:
+    if filename.startswith(_AGENT_DIR):
+        return filename[len(_AGENT_DIR):]
+    marker = "site-packages" + os.sep
+    i = filename.rfind(marker)
+    if i >= 0:
+        return filename[i + len(marker):]
+    return os.path.basename(filename)
+
+
+def _label(code, lineno) -> str:
+    return f"{code.co_name} ({_short(code.co_filename)}:{lineno})"
+
+
+def _thread_stack(frame) -> list[str]:
+    """Outermost first."""
+    out = []
+    while frame is not None:
+        out.append(_label(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+_POOL_WORKER = os.path.join("concurrent", "futures", "thread.py")
+
+
+def _is_idle(frame) -> bool:
+    # Trådpoolsarbetare (asyncio.to_thread) som väntar i work_queue.get() på nästa
+    # jobb — brus, inte arbete. get() är C-kod, så väntan syns som _worker överst.
+    code = frame.f_code
+    return code.co_name == "_worker" and code.co_filename.endswith(_POOL_WORKER)
+
+
+def _task_stack(task) -> list[str]:
+    """A suspended task's await chain, outermost coroutine first."""
+    out = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        out.append(_label(frame.f_code, frame.f_lineno))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+    if out and coro is not None:
+        out.append(f"<await {type(coro).__name__}>")
+    return out
+
+
+def _current_task(loop):
+    current = getattr(asyncio.tasks, "_current_tasks", None)
+    return current.get(loop) if current is not None else None
+
+
+def _sample(seconds: float, mode: str, interval_s: float, loop, loop_thread: int, own_task) -> tuple[Counter, int]:
+    """Sampler body — runs in its own thread. Returns (stack -> weight, number of samples)."""
+    me = threading.get_ident()
+    stacks: Counter = Counter()
+    cpu_prev: dict[int, int] = {}
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        samples += 1
+        names = {t.ident: t.name for t in threading.enumerate()}
+        running = _current_task(loop)
+        for ident, frame in sys._current_frames().items():
+            if ident == me or _is_idle(frame):
+                continue
+            weight = 1
+            if mode == "cpu":
+                try:
+                    now = time.clock_gettime_ns(time.pthread_getcpuclockid(ident))
+                except (OSError, AttributeError):
+                    continue
+                weight = (now - cpu_prev.get(ident, now)) // 1000
+                cpu_prev[ident] = now
+                if weight <= 0:
+                    continue
+            root = names.get(ident, f"thread-{ident}")
+            if ident == loop_thread and running is not None:
+                root += f";task:{running.get_name()}"
+            stacks[";".join([root] + _thread_stack(frame))] += weight
+
+        if mode == "wall":
+            try:
+                tasks = list(asyncio.all_tasks(loop))
+            except RuntimeError:
+                tasks = []
+            for task in tasks:
+                if task is running or task is own_task or task.done():
+                    continue
+                chain = _task_stack(task)
+                if chain:
+                    stacks[";".join([f"suspended;task:{task.get_name()}"] + chain)] += 1
+        time.sleep(interval_s)
+    return stacks, samples
+
+
+async def _memory(seconds: float) -> tuple[Counter, int]:
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(_MEMORY_FRAMES)
+    try:
+        await asyncio.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    stacks: Counter = Counter()
+    stats = snapshot.statistics("traceback")
+    for stat in stats:
+        frames = [f"{_short(f.filename)}:{f.lineno}" for f in stat.traceback]
+        stacks[";".join(frames)] += stat.size
+    return stacks, len(stats)
+
+
+async def profile(seconds: float = 10, mode: str = "wall", interval_ms: float = 10) -> dict:
+    """Sample the process for `seconds` and return {stacks, samples, unit, ...}.
+
+    Only one profile runs at a time (RuntimeError otherwise).
+    """
+    global _running
+    if mode not in MODES:
+        raise ValueError(f"okänt läge: {mode} (välj {', '.join(MODES)})")
+    if _running:
+        raise RuntimeError("En profilering pågår redan")
+    seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+    interval_s = max(0.001, min(float(interval_ms), 1000)) / 1000
+    _running = True
+    try:
+        if mode == "memory":
+            stacks, samples = await _memory(seconds)
+        else:
+            loop = asyncio.get_running_loop()
+            stacks, samples = await asyncio.to_thread(
+                _sample, seconds, mode, interval_s, loop, threading.get_ident(), asyncio.current_task(),
+            )
+    finally:
+        _running = False
+    return {
+        "mode": mode,
+        "seconds": seconds,
+        "interval_ms": None if mode == "memory" else round(interval_s * 1000, 3),
+        "samples": samples,
+        "unit": {"wall": "samples", "cpu": "microseconds", "memory": "bytes"}[mode],
+        "stacks": stacks,
+    }
+
+
+def collapsed(result: dict) -> str:
+    """Brendan Gregg's collapsed format: one 'a;b;c weight' line per stack."""
+    return "".join(f"{stack} {weight}\n" for stack, weight in result["stacks"].most_common())
+
+
+def summary(result: dict, top: int = 30) -> dict:
+    """JSON view: heaviest stacks and the frames with the most self weight (leaf of the stack)."""
+    stacks: Counter = result["stacks"]
+    total = sum(stacks.values()) or 1
+    leaves: Counter = Counter()
+    for stack, weight in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += weight
+    return {
+        **{k: v for k, v in result.items() if k != "stacks"},
+        "total": sum(stacks.values()),
+        "top_self": [{"frame": f, "weight": w, "pct": round(100 * w / total, 1)} for f, w in leaves.most_common(top)],
+        "top_stacks": [{"stack": s, "weight": w, "pct": round(100 * w / total, 1)} for s, w in stacks.most_common(top)],
+    }
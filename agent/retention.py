@@ -0,0 +1,248 @@
+"""
+Retention for the intraday tables stock_prices and stock_indicators.
+
+process_ticker writes one row to each table per ticker every 2 minutes,
+about 4,000 rows per table per trading day. Nothing reads raw rows older
+than a few minutes. The dashboard wants the latest price per ticker (the
+latest indicators live in stock_indicators_latest), and the cadence restore
+wants the last 10 minutes. So compact()
+rolls every day older than RAW_RETENTION_DAYS up into one row per ticker
+and day, then deletes that day's raw rows:
+
+    stock_prices_daily       open/high/low/close of the sampled prices,
+                             the day's highest (cumulative) volume, samples
+    stock_indicators_daily   the indicator values of the day's last row (the
+                             close), buy_score max/avg, samples
+
+A day is handled as a unit: its rows are read, the rollups are upserted,
+and then the raw rows are deleted with one range statement. A run that
+stops partway can be run again without losing or double-counting
+anything. At most _MAX_DAYS_PER_RUN days are done per run, so the first
+run after months without compaction is spread over a few nights. Days
+are Stockholm calendar days.
+
+Runs nightly (scheduler, 02:30) and on demand via POST /api/retention/run.
+
+Supabase tables and indexes (run once). The (ticker, timestamp DESC)
+indexes keep the order("timestamp", desc=True).limit(1) lookups to a
+single index probe. After the first large delete, run
+VACUUM (ANALYZE) stock_prices, stock_indicators; to return the space.
+
+    CREATE TABLE stock_prices_daily (
+      ticker TEXT NOT NULL,
+      day DATE NOT NULL,
+      open NUMERIC, high NUMERIC, low NUMERIC, close NUMERIC,
+      volume BIGINT,
+      samples INT NOT NULL,
+      PRIMARY KEY (ticker, day)
+    );
+    CREATE TABLE stock_indicators_daily (
+      ticker TEXT NOT NULL,
+      day DATE NOT NULL,
+      rsi NUMERIC, macd NUMERIC, macd_signal NUMERIC, macd_histogram NUMERIC,
+      ma20 NUMERIC, ma50 NUMERIC, ma200 NUMERIC, ema20 NUMERIC,
+      bollinger_upper NUMERIC, bollinger_lower NUMERIC, atr NUMERIC, volume_ratio NUMERIC,
+      buy_score INT, buy_score_max INT, buy_score_avg NUMERIC,
+      samples INT NOT NULL,
+      PRIMARY KEY (ticker, day)
+    );
+    CREATE INDEX IF NOT EXISTS stock_prices_ticker_ts ON stock_prices (ticker, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS stock_indicators_ticker_ts ON stock_indicators (ticker, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS stock_prices_ts ON stock_prices (timestamp);
+    CREATE INDEX IF NOT EXISTS stock_indicators_ts ON stock_indicators (timestamp);
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from postgrest.types import ReturnMethod
+
+from config import RAW_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+_TZ = ZoneInfo("Europe/Stockholm")
+_PAGE_SIZE = 1000          # PostgREST:s max-rows i Supabase
+_MAX_DAYS_PER_RUN = 30
+_MIN_RETENTION_DAYS = 2    # cadence-återställningen och "senaste raden" måste alltid finnas kvar
+
+_running = False
+
+retention_stats = {
+    "runs": 0,
+    "days_compacted": 0,
+    "rows_deleted": {"stock_prices": 0, "stock_indicators": 0},
+    "last_run_at": None,
+    "last_duration_s": None,
+    "last_result": None,
+    "last_error": None,
+}
+
+
+def _day_bounds(day: date) -> tuple[str, str]:
+    """[start, end) of a Stockholm calendar day as UTC ISO timestamps."""
+    start = datetime(day.year, day.month, day.day, tzinfo=_TZ)
+    end = start + timedelta(days=1)
+    return start.astimezone(timezone.utc).isoformat(), end.astimezone(timezone.utc).isoformat()
+
+
+def _local_day(timestamp: str) -> date:
+    return datetime.fromisoformat(timestamp).astimezone(_TZ).date()
+
+
+def _oldest_day(table: str) -> date | None:
+    from db.supabase_client import get_client
+    rows = get_client().table(table).select("timestamp").order("timestamp").limit(1).execute().data
+    return _local_day(rows[0]["timestamp"]) if rows else None
+
+
+def _read_day(table: str, columns: str, start: str, end: str) -> list[dict]:
+    from db.supabase_client import get_client
+    rows, offset = [], 0
+    while True:
+        page = (
+            get_client().table(table).select(columns)
+            .gte("timestamp", start).lt("timestamp", end)
+            .order("timestamp").order("id")
+            .range(offset, offset + _PAGE_SIZE - 1)
+            .execute().data or []
+        )
+        rows += page
+        if len(page) < _PAGE_SIZE:
+            return rows
+        offset += _PAGE_SIZE
+
+
+def _by_ticker(rows: list[dict]) -> dict[str, list[dict]]:
+    out: dict[str, list[dict]] = {}
+    for row in rows:
+        out.setdefault(row["ticker"], []).append(row)
+    return out
+
+
+def rollup_prices(day: date, rows: list[dict]) -> list[dict]:
+    """One OHLC row per ticker from the day's price samples (in timestamp order)."""
+    out = []
+    for ticker, samples in _by_ticker(rows).items():
+        prices = [r["price"] for r in samples if r.get("price") is not None]
+        volumes = [r["volume"] for r in samples if r.get("volume") is not None]
+        out.append({
+            "ticker": ticker,
+            "day": day.isoformat(),
+            "open": prices[0] if prices else None,
+            "high": max(prices) if prices else None,
+            "low": min(prices) if prices else None,
+            "close": prices[-1] if prices else None,
+            "volume": max(volumes) if volumes else None,  # intradagsvolymen är kumulativ
+            "samples": len(samples),
+        })
+    return out
+
+
+def rollup_indicators(day: date, rows: list[dict]) -> list[dict]:
+    """One row per ticker: the day's last indicator values plus buy_score max/avg."""
+    from db.supabase_client import INDICATOR_FIELDS
+    out = []
+    for ticker, samples in _by_ticker(rows).items():
+        last = samples[-1]
+        scores = [r["buy_score"] for r in samples if r.get("buy_score") is not None]
+        out.append({
+            "ticker": ticker,
+            "day": day.isoformat(),
+            **{k: last.get(k) for k in INDICATOR_FIELDS},
+            "buy_score_max": max(scores) if scores else None,
+            "buy_score_avg": round(sum(scores) / len(scores), 2) if scores else None,
+            "samples": len(samples),
+        })
+    return out
+
+
+def _compact_day(day: date) -> dict[str, int]:
+    """Roll up and delete one day of both tables. Blocking — runs in a worker thread."""
+    from db.supabase_client import INDICATOR_FIELDS, get_client
+    start, end = _day_bounds(day)
+    plan = (
+        ("stock_prices", "id,ticker,price,volume,timestamp", rollup_prices, "stock_prices_daily"),
+        ("stock_indicators", ",".join(("id", "ticker", "timestamp") + INDICATOR_FIELDS),
+         rollup_indicators, "stock_indicators_daily"),
+    )
+    deleted = {}
+    for table, columns, rollup, target in plan:
+        rows = _read_day(table, columns, start, end)
+        if not rows:
+            deleted[table] = 0
+            continue
+        # Först sammanfattningen, sedan raderingen — avbryts vi emellan gör nästa körning om dagen
+        get_client().table(target).upsert(
+            rollup(day, rows), on_conflict="ticker,day", returning=ReturnMethod.minimal,
+        ).execute()
+        # minimal: PostgREST skickar annars tillbaka varje raderad rad
+        get_client().table(table).delete(returning=ReturnMethod.minimal) \
+            .gte("timestamp", start).lt("timestamp", end).execute()
+        deleted[table] = len(rows)
+    return deleted
+
+
+async def compact(retention_days: int = RAW_RETENTION_DAYS, max_days: int = _MAX_DAYS_PER_RUN) -> dict:
+    """Roll up and delete raw rows older than `retention_days`, oldest day first.
+
+    Returns {"days": [...], "rows_deleted": {...}, "remaining": bool}.
+    Raises RuntimeError if a run is already in progress.
+    """
+    global _running
+    if _running:
+        raise RuntimeError("Kompakteringen körs redan")
+    _running = True
+    t0 = time.monotonic()
+    retention_days = max(_MIN_RETENTION_DAYS, int(retention_days))
+    cutoff = datetime.now(_TZ).date() - timedelta(days=retention_days)
+    result = {"cutoff": cutoff.isoformat(), "days": [], "rows_deleted": {"stock_prices": 0, "stock_indicators": 0},
+              "remaining": False}
+    retention_stats["runs"] += 1
+    retention_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    try:
+        while True:
+            oldest = [d for d in await asyncio.gather(
+                asyncio.to_thread(_oldest_day, "stock_prices"),
+                asyncio.to_thread(_oldest_day, "stock_indicators"),
+            ) if d is not None]
+            if not oldest or min(oldest) >= cutoff:
+                break
+            if len(result["days"]) >= max_days:
+                result["remaining"] = True
+                break
+            day = min(oldest)
+            deleted = await asyncio.to_thread(_compact_day, day)
+            if not any(deleted.values()):
+                logger.warning(f"[Retention] {day}: inga rader i dagens intervall — avbryter")
+                break
+            result["days"].append(day.isoformat())
+            for table, n in deleted.items():
+                result["rows_deleted"][table] += n
+                retention_stats["rows_deleted"][table] += n
+            retention_stats["days_compacted"] += 1
+            logger.info(f"[Retention] {day}: {deleted['stock_prices']} prisrader, "
+                        f"{deleted['stock_indicators']} indikatorrader → dagsrader")
+        retention_stats["last_error"] = None
+    except Exception as e:
+        retention_stats["last_error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _running = False
+        retention_stats["last_duration_s"] = round(time.monotonic() - t0, 2)
+        retention_stats["last_result"] = result
+    logger.info(
+        f"[Retention] Klar: {len(result['days'])} dagar före {cutoff} kompakterade"
+        f"{' (fler återstår)' if result['remaining'] else ''}"
+    )
+    return result
+
+
+async def nightly_compact():
+    """Scheduler job wrapper — logs instead of raising."""
+    try:
+        await compact()
+    except Exception as e:
+        logger.error(f"[Retention] Kompakteringen misslyckades: {e}", exc_info=True)
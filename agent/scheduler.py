@@ -1,15 +1,18 @@
+import asyncio
 import logging
 import time as _time
-from datetime import datetime, date, timezone, timedelta
+from datetime import datetime, timezone, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from config import PAPER_BALANCE
 import settings as _settings
-from data.yahoo_client import get_price_history, get_current_price, get_index_history, get_earnings_date
-from data.news_fetcher import fetch_news
-from data.insider_fetcher import fetch_insider_trades
+from data.yahoo_client import get_price_history, get_current_price, get_index_history
+from data import earnings_calendar
+from data.news_fetcher import fetch_news, ingest as ingest_news
+from data.insider_fetcher import fetch_insider_trades, refresh_insider_register
 from analysis.indicators import calculate_indicators, calculate_relative_strength, calculate_market_regime
+from analysis import signal_boundary
 from analysis.sentiment import analyze_sentiment, generate_signal_description, record_cache_hit
 from analysis.decision_engine import (
     score_buy_signal,
@@ -22,9 +25,18 @@ from analysis.decision_engine import (
     calculate_atr_take_profit,
     calculate_transaction_cost,
     calculate_round_trip_cost_pct,
+    render_reasons,
 )
 from notifications import ntfy
 from db import supabase_client as db
+from leader import singleton
+import instruments
+import events
+import metrics
+import portfolio
+import retention
+import tracing
+import triggers
 
 logger = logging.getLogger(__name__)
 
@@ -41,11 +53,17 @@ _description_cache: dict[str, tuple[str, float]] = {}
 _DESCRIPTION_TTL = 2 * 3600  # 2h — återanvänd samma beskrivning för upprepade signaler
 
 
+def _json_number(value):
+    return None if value is None or value != value else value  # NaN är inte giltig JSON
+
+
 async def _get_signal_description(ticker: str, signal_type: str, price: float, reasons: list[str], news_headline: str = "") -> str:
     """Hämtar signalbeskrivning från cache eller genererar ny via Gemini (max 1 anrop/2h per ticker+typ)."""
     key = f"{ticker}:{signal_type}"
     now = _time.monotonic()
     cached = _description_cache.get(key)
+    tracing.annotate(description_cache_hit=bool(cached and now < cached[1]))
+    metrics.cache_lookup("description", bool(cached and now < cached[1]))
     if cached and now < cached[1]:
         record_cache_hit("description")
         logger.info(f"[Gemini CACHE HIT] description:{ticker}:{signal_type} | TTL={cached[1] - now:.0f}s kvar")
@@ -57,6 +75,143 @@ async def _get_signal_description(ticker: str, signal_type: str, price: float, r
 
 scheduler = AsyncIOScheduler(timezone="Europe/Stockholm")
 
+# Överlappsskydd: en långsam loop (t.ex. när Yahoo-proxyn är seg) får inte
+# staplas på nästa 2-minuterskörning — då hade de slagits om samma rate limits.
+_loop_running = False
+_loop_seq = 0
+loop_stats = {
+    "runs": 0,
+    "skipped_overlap": 0,
+    "tickers_processed": 0,
+    "tickers_deferred": 0,
+    "last_duration_s": 0.0,
+    "last_started_at": None,
+}
+
+# Adaptiv kadens — hur ofta (i loopcykler) en ticker analyseras.
+# Innehav och aktier nära köptröskeln körs varje cykel, lugna bevakningsaktier
+# mer sällan, så att loopens nätverks- och CPU-budget hamnar där signaler är troliga.
+# ticker_state: ticker -> {buy_score, atr_pct, volume_ratio, last_seq}
+ticker_state: dict[str, dict] = {}
+
+# Tidsbudget per steg i process_ticker (sekunder). Ett steg som överskrider
+# budgeten avbryts och ersätts med sin fallback — en seg FI- eller nyhetskälla
+# får inte hålla uppe resten av analysen.
+_STAGE_TIMEOUTS = {
+    "history": 45,     # inkl. yahoo_clients retry med backoff
+    "quote": 25,
+    "db_price": 10,    # DB-skrivningarna körs i tråd (db._execute) — annars kan budgeten inte hållas
+    "news": 15,
+    "sentiment": 30,   # Gemini inkl. en retry vid 429
+    "db_news": 10,
+    "insider": 10,
+}
+_SELL_NEWS_WAIT = 2.0  # sekunder säljbeslutet väntar på nyhetssteget innan föregående sentiment används
+
+# Senaste körningens latens per steg (sekunder): ticker -> {steg: s, "total": s}
+stage_latency: dict[str, dict[str, float]] = {}
+
+
+async def _stage(timings: dict, ticker: str, name: str, coro, fallback=None, required: bool = False):
+    """Run one pipeline stage under its timeout and record its latency in `timings`.
+
+    On timeout or error the stage is cancelled and `fallback` is returned,
+    unless `required` — then the error propagates (no data, no analysis).
+    """
+    timeout = _STAGE_TIMEOUTS.get(name, 30)
+    t0 = _time.monotonic()
+    with tracing.span(f"stage.{name}", ticker=ticker) as sp:
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            sp.attrs["timeout"] = True
+            if required:
+                raise
+            logger.warning(f"{ticker}: steg '{name}' tog över {timeout}s — avbrutet, använder fallback")
+            return fallback
+        except Exception as e:
+            sp.error = type(e).__name__
+            if required:
+                raise
+            logger.warning(f"{ticker}: steg '{name}' misslyckades: {e}")
+            return fallback
+        finally:
+            timings[name] = round(_time.monotonic() - t0, 3)
+
+
+# Senaste loopens kontext — återanvänds av kurs-triggers (triggers.py) mellan looparna
+_loop_context: dict = {}
+
+# ticker -> (content_hash, sentiment) för den senast analyserade rubriken — varje rubrik går till Gemini en gång
+_scored_news: dict[str, tuple[str, dict]] = {}
+
+# Ett lås per ticker — loopen, triggers och manuella körningar analyserar aldrig samma ticker samtidigt
+_ticker_locks: dict[str, asyncio.Lock] = {}
+
+
+def _ticker_lock(ticker: str) -> asyncio.Lock:
+    return _ticker_locks.setdefault(ticker, asyncio.Lock())
+
+
+_CADENCE_NEAR_MARGIN = 15    # poäng under köptröskeln som räknas som "nära signal"
+_CADENCE_WATCH_MARGIN = 30   # poäng under köptröskeln — fortfarande värd att följa
+_CADENCE_VOLATILE_ATR = 0.04 # ATR/pris över 4% = rörlig aktie
+
+
+def _refresh_every(ticker: str) -> int:
+    """Number of loop cycles between analyses of `ticker` (1 = every cycle)."""
+    if ticker in open_positions:
+        return 1
+    state = ticker_state.get(ticker)
+    if not state or state.get("buy_score") is None:
+        return 1  # aldrig analyserad (eller misslyckades) — kör direkt
+    threshold = _settings.get_int("signal_threshold")
+    if state["buy_score"] >= threshold - _CADENCE_NEAR_MARGIN:
+        return 1
+    if state.get("atr_pct", 0) >= _CADENCE_VOLATILE_ATR or state.get("volume_ratio", 1.0) >= 1.5:
+        return 2
+    if state["buy_score"] >= threshold - _CADENCE_WATCH_MARGIN:
+        return 3
+    return 5  # lugn och långt från signal — var 10:e minut räcker
+
+
+_LOOP_INTERVAL_S = 120  # trading_loop körs varannan minut
+
+
+def restore_cadence(rows: list[dict]) -> int:
+    """Seed ticker_state from stock_indicators rows saved before a restart (newest first).
+
+    Without it the first loop after a deploy analyses every ticker; with it the
+    adaptive cadence carries on where the previous instance left off. Rows older
+    than the slowest cadence make the ticker due anyway. Returns tickers restored.
+    """
+    now = datetime.now(timezone.utc)
+    restored = 0
+    for row in rows:
+        ticker = row["ticker"]
+        if ticker in ticker_state or row.get("buy_score") is None:
+            continue
+        try:
+            age_s = (now - datetime.fromisoformat(row["timestamp"])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            continue
+        ref_price = row.get("ma20") or 0  # priset sparas inte i raden — MA20 räcker för ATR-andelen
+        ticker_state[ticker] = {
+            "buy_score": row["buy_score"],
+            "atr_pct": (row.get("atr") or 0) / ref_price if ref_price else 0.0,
+            "volume_ratio": float(row.get("volume_ratio") or 1.0),
+            "last_seq": _loop_seq - int(age_s // _LOOP_INTERVAL_S),
+        }
+        restored += 1
+    return restored
+
+
+def _is_due(ticker: str) -> bool:
+    state = ticker_state.get(ticker)
+    if not state or "last_seq" not in state:
+        return True
+    return _loop_seq - state["last_seq"] >= _refresh_every(ticker)
+
 
 async def load_open_positions():
     """Load confirmed open trades from DB into memory on startup."""
@@ -79,17 +234,31 @@ async def morning_check():
     global daily_signals, daily_trades
     daily_signals = 0
     daily_trades = 0
+
+    # Rapportvarning för bevakade aktier som rapporterar inom 48h (intervall-uppslag i kalendern)
+    try:
+        watchlist = await db.get_watchlist()
+        names = {s["ticker"]: s.get("name", s["ticker"]) for s in watchlist}
+        for report_date, ticker in earnings_calendar.reporting_within(2):
+            if ticker in names or ticker in open_positions:
+                await ntfy.send_report_warning(
+                    ticker, names.get(ticker, ticker), report_date.isoformat(), ticker in open_positions,
+                )
+    except Exception as e:
+        logger.warning(f"Rapportkontroll misslyckades: {e}")
     logger.info("Morning check complete.")
 
 
 async def morning_summary():
     """08:45 – Send morning push notification."""
     portfolio_value, portfolio_pct = await db.get_portfolio_summary(PAPER_BALANCE)
+    watched = {s["ticker"] for s in await db.get_watchlist()} | set(open_positions)
+    reports_today = [t for _, t in earnings_calendar.reporting_within(0) if t in watched]
     await ntfy.send_morning_summary(
         portfolio_value=portfolio_value,
         portfolio_pct=portfolio_pct,
         open_positions=len(open_positions),
-        reports_today=[],
+        reports_today=reports_today,
     )
 
 
@@ -114,7 +283,36 @@ async def morning_discovery():
 
 
 async def trading_loop():
-    """Every 2 minutes Mon–Fri 09:00–17:30 – main analysis loop."""
+    """Every 2 minutes Mon–Fri 09:00–17:30 – main analysis loop.
+
+    Skips (and counts) the firing if the previous run is still in progress.
+    """
+    global _loop_running, _loop_seq
+    if _loop_running:
+        loop_stats["skipped_overlap"] += 1
+        logger.warning(
+            f"Trading loop hoppas över — föregående körning pågår fortfarande "
+            f"({loop_stats['skipped_overlap']} överhoppade totalt)"
+        )
+        return
+    _loop_running = True
+    _loop_seq += 1
+    t0 = _time.monotonic()
+    loop_stats["runs"] += 1
+    loop_stats["last_started_at"] = datetime.now(timezone.utc).isoformat()
+    signals_before = metrics.signals.total()
+    try:
+        with tracing.span("trading_loop", seq=_loop_seq):
+            await _run_trading_loop()
+            # En värdering per körning till alla öppna dashboards — i stället för en per flik och poll
+            await portfolio.publish()
+    finally:
+        _loop_running = False
+        loop_stats["last_duration_s"] = round(_time.monotonic() - t0, 2)
+        metrics.loop_signals.observe(metrics.signals.total() - signals_before)
+
+
+async def _run_trading_loop():
     now = datetime.now(timezone.utc)
     logger.info(f"Trading loop tick: {now.strftime('%H:%M:%S')}")
 
@@ -129,7 +327,13 @@ async def trading_loop():
     logger.info(f"Marknadsregim: {market_regime}")
 
     watchlist = await db.get_watchlist()
+    tracing.annotate(market_regime=market_regime, watchlist=len(watchlist))
     stock_config_map = {s["ticker"]: s for s in watchlist}
+    for stock in watchlist:
+        instruments.ensure(stock["ticker"], stock.get("name"))  # ID även för tickers utanför universumet
+    _loop_context.update(index_df=index_df, market_regime=market_regime, stock_config_map=stock_config_map)
+    for ticker in set(triggers._bands) - set(stock_config_map):
+        triggers.remove(ticker)  # borttagen från watchlist — sluta bevaka
 
     for stock in watchlist:
         ticker = stock["ticker"]
@@ -138,35 +342,104 @@ async def trading_loop():
             logger.debug(f"{ticker}: cooldown aktiv till {cooldowns[ticker]}")
             continue
 
+        if not _is_due(ticker):
+            loop_stats["tickers_deferred"] += 1
+            logger.debug(f"{ticker}: lugn — analyseras var {_refresh_every(ticker)}:e cykel")
+            continue
+
+        ticker_state.setdefault(ticker, {})["last_seq"] = _loop_seq
+        loop_stats["tickers_processed"] += 1
         try:
             await process_ticker(ticker, stock_config=stock, index_df=index_df, market_regime=market_regime, stock_config_map=stock_config_map)
         except Exception as e:
             logger.error(f"Fel vid bearbetning av {ticker}: {e}", exc_info=True)
 
 
+async def process_triggered(ticker: str) -> bool:
+    """Run a full analysis for a ticker whose live price crossed a trigger level.
+
+    Reuses the index data and market regime from the latest trading loop.
+    Returns False (and does nothing) if the ticker is already being analysed.
+    """
+    stock_config_map = _loop_context.get("stock_config_map")
+    if stock_config_map is None or ticker not in stock_config_map:
+        return False
+    if ticker in cooldowns and cooldowns[ticker] > datetime.now(timezone.utc):
+        return False
+    # Ingen await mellan kontrollen och process_ticker — låset tas innan någon annan hinner
+    if _ticker_lock(ticker).locked():
+        logger.info(f"[Trigger] {ticker} analyseras redan — hoppar över")
+        return False
+    ticker_state.setdefault(ticker, {})["last_seq"] = _loop_seq
+    await process_ticker(
+        ticker,
+        stock_config=stock_config_map[ticker],
+        index_df=_loop_context.get("index_df"),
+        market_regime=_loop_context.get("market_regime", "NEUTRAL"),
+        stock_config_map=stock_config_map,
+    )
+    return True
+
+
 async def process_ticker(ticker: str, stock_config: dict | None = None, index_df=None, market_regime: str = "NEUTRAL", stock_config_map: dict | None = None, manual: bool = False):
+    """Full analysis of one ticker as a staged pipeline.
+
+    Independent fetches run concurrently, each stage has its own timeout and
+    fallback (see _STAGE_TIMEOUTS), and the per-stage latency of the latest
+    run is kept in stage_latency[ticker].
+    """
+    async with _ticker_lock(ticker):
+        timings: dict[str, float] = {}
+        t0 = _time.monotonic()
+        try:
+            with tracing.span("process_ticker", ticker=ticker, manual=manual):
+                await _process_ticker(ticker, timings, stock_config, index_df, market_regime, stock_config_map, manual)
+        finally:
+            timings["total"] = round(_time.monotonic() - t0, 3)
+            stage_latency[ticker] = timings
+
+
+def _report_soon(ticker: str) -> bool:
+    """True if the next earnings report is within 48h (0–2 days) — in-memory calendar lookup."""
+    report = earnings_calendar.get_report_date(ticker)
+    if report and earnings_calendar.has_report_soon(ticker, days=2):
+        logger.info(f"{ticker}: rapport {report.isoformat()} — köp-penalty aktiv")
+        return True
+    return False
+
+
+async def _process_ticker(ticker: str, timings: dict, stock_config: dict | None, index_df, market_regime: str, stock_config_map: dict | None, manual: bool):
     global daily_signals, daily_trades
     now = datetime.now(timezone.utc)
     cfg = stock_config or {}
     stock_config_map = stock_config_map or {}
     company = cfg.get("name", ticker)
 
-    # 1. Price history + indicators
-    df = await get_price_history(ticker, days=220)
+    # 1. Price history + live quote (parallellt) → indicators
+    df, current = await asyncio.gather(
+        _stage(timings, ticker, "history", get_price_history(ticker, days=220), required=True),
+        _stage(timings, ticker, "quote", get_current_price(ticker), fallback={}),
+    )
     if df.empty:
         logger.warning(f"{ticker}: tom DataFrame fran Yahoo Finance.")
         return
 
-    indicators = calculate_indicators(df)
+    t_ind = _time.monotonic()
+    with tracing.span("indicators", ticker=ticker, bars=len(df)):
+        indicators = calculate_indicators(df)
+    timings["indicators"] = round(_time.monotonic() - t_ind, 3)
     if not indicators:
         logger.warning(f"{ticker}: kunde inte berakna indikatorer.")
         return
 
-    current = await get_current_price(ticker)
     price = current.get("price") or indicators["current_price"]
     volume = current.get("volume") or 0
+    events.publish("quote", {"ticker": ticker, "price": price, "change_pct": current.get("change_pct")})
 
-    await db.save_price(ticker, price, volume)
+    # Prisraden sparas i bakgrunden medan nyheter/FI/rapport hämtas
+    price_task = asyncio.create_task(
+        _stage(timings, ticker, "db_price", db.save_price(ticker, price, volume))
+    )
 
     # 2. Relative strength vs OMXS30
     rs = calculate_relative_strength(df, index_df) if index_df is not None else None
@@ -176,6 +449,7 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
     in_position = ticker in open_positions
 
     # 3. Pre-score (tekniska indikatorer utan sentiment) — gate för AI-anrop
+    t_score = _time.time_ns()
     pre_buy_score, _ = score_buy_signal(
         ticker, indicators, news_sentiment=None, insider_trades=None,
         has_open_report_soon=False, relative_strength=rs, market_regime=market_regime,
@@ -186,62 +460,115 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
             ticker, indicators, open_positions[ticker], news_sentiment=None, relative_strength=rs
         )
 
-    # Hämta nyheter (cachas 30 min — billigt)
-    # Kör Gemini-sentimentanalys BARA om teknisk signal redan är lovande
-    _SENTIMENT_GATE = 20  # poäng utan sentiment för att motivera AI-anrop
-    needs_sentiment = manual or in_position or pre_buy_score >= _SENTIMENT_GATE or pre_sell_score >= _SENTIMENT_GATE
-
-    news_list = await fetch_news(ticker, company)
-    latest_sentiment = None
-
-    if needs_sentiment:
-        for item in news_list[:1]:  # max 1 Gemini-anrop per ticker per loop
-            sentiment = await analyze_sentiment(ticker, item["headline"])
-            # save_news har inbyggd dedup — sparar bara om rubriken inte redan finns
-            await db.save_news(
-                ticker=ticker,
-                headline=item["headline"],
-                url=item["url"],
-                sentiment=sentiment["sentiment"],
-                sentiment_score=sentiment["score"],
-                reason=sentiment["reason"],
-                source=item["source"],
-                published_at=item["published_at"],
-            )
-            if latest_sentiment is None:
-                latest_sentiment = sentiment
-        logger.info(f"{ticker}: sentimentanalys körd{' (manuell)' if manual else ''} | resultat={latest_sentiment.get('sentiment') if latest_sentiment else 'NONE'} (pre_score buy={pre_buy_score} sell={pre_sell_score})")
-    else:
-        logger.debug(f"{ticker}: Gemini hoppas over (pre_score={pre_buy_score}p < {_SENTIMENT_GATE}p)")
-
-    # 4. Insider data
-    insider_trades = await fetch_insider_trades(ticker, company_name=company)
-
-    # 5. Earnings date — avoid buying within 48h of a report
-    has_report_soon = False
+    # Adaptiva trösklar (regim + likviditet) — behövs för signal-gränsen nedan
+    base_threshold = _settings.get_int("signal_threshold")
     try:
-        earnings_str = await get_earnings_date(ticker)
-        if earnings_str:
-            report_date = date.fromisoformat(earnings_str[:10])
-            delta = (report_date - date.today()).days
-            has_report_soon = 0 <= delta <= 2
-            if has_report_soon:
-                logger.info(f"{ticker}: rapport om {delta} dag(ar) — köp-penalty aktiv")
-    except Exception as e:
-        logger.debug(f"{ticker}: Kunde inte hämta rapportdatum: {e}")
+        avg_turnover = (df["close"] * df["volume"]).mean()
+        signal_threshold = get_effective_buy_threshold(
+            base_threshold,
+            market_regime=market_regime,
+            avg_turnover=float(avg_turnover),
+        )
+        logger.debug(
+            f"{ticker}: adaptiv köp-tröskel {signal_threshold}p "
+            f"(regim={market_regime}, omsättning={avg_turnover/1e6:.0f}M/dag)"
+        )
+    except Exception:
+        signal_threshold = get_effective_buy_threshold(base_threshold, market_regime=market_regime)
+    effective_sell_threshold = get_effective_sell_threshold(
+        _settings.get_int("sell_threshold"), market_regime=market_regime
+    )
 
-    # Spara live-score till stock_indicators MED sentiment inkluderat
-    # Beräkna full buy-score (med sentiment, insider, rapport) för korrekt dashboard-visning
-    full_buy_score, _ = score_buy_signal(
-        ticker, indicators, latest_sentiment, insider_trades,
-        has_open_report_soon=has_report_soon,
+    # Signal-gräns: kan tickern nå köp-/säljtröskeln vid nuvarande kurs ens med
+    # bästa tänkbara sentiment och insiderdata? Om inte hoppar vi över nyheter,
+    # Gemini, FI och rapportdatum — de kan inte ändra utfallet.
+    # (Dashboardens buy_score blir då rent teknisk, utan rapport-penalty.)
+    buy_boundary, sell_boundary = signal_boundary.get_boundaries(
+        ticker, indicators,
+        bar_key=(str(df["date"].iloc[-1]), indicators["current_price"], len(df)),
         relative_strength=rs,
         market_regime=market_regime,
+        position=open_positions.get(ticker),
     )
-    indicators["buy_score"] = full_buy_score
-    await db.save_indicators(ticker, indicators)
+    could_buy, could_sell = signal_boundary.could_signal(
+        buy_boundary, sell_boundary, [price, indicators["current_price"]],
+        signal_threshold, effective_sell_threshold,
+    )
+    could_buy = could_buy and not in_position
+    needs_context = manual or could_buy or could_sell
+    tracing.record("scoring", t_score, ticker=ticker, phase="pre", pre_buy_score=pre_buy_score,
+                   could_buy=could_buy, could_sell=could_sell)
+
+    news_list = []
+    latest_sentiment = None
+    insider_trades = []
+    has_report_soon = False
+
+    insider_task = None
+    news_task = None
+    if needs_context:
+        # Kör Gemini-sentimentanalys BARA om teknisk signal redan är lovande
+        _SENTIMENT_GATE = 20  # poäng utan sentiment för att motivera AI-anrop
+        needs_sentiment = manual or in_position or pre_buy_score >= _SENTIMENT_GATE or pre_sell_score >= _SENTIMENT_GATE
+
+        async def news_stage():
+            # Nyheter (cachas 30 min — billigt) → sentiment för den senaste rubriken
+            news = await _stage(timings, ticker, "news", fetch_news(ticker, company), fallback=[])
+            sentiment_result = None
+            if not needs_sentiment:
+                logger.debug(f"{ticker}: Gemini hoppas over (pre_score={pre_buy_score}p < {_SENTIMENT_GATE}p)")
+                return news, None
+            reused = False
+            for item in news[:1]:  # max 1 Gemini-anrop per ticker per loop
+                scored = _scored_news.get(ticker)
+                if scored and item.get("content_hash") and scored[0] == item["content_hash"]:
+                    # Redan analyserad och sparad — bara nya rubriker skickas till sentimentsteget
+                    sentiment_result, reused = scored[1], True
+                    continue
+                sentiment = await _stage(
+                    timings, ticker, "sentiment", analyze_sentiment(ticker, item["headline"])
+                )
+                if sentiment is None:
+                    continue
+                # save_news har inbyggd dedup — sparar bara om rubriken inte redan finns
+                await _stage(timings, ticker, "db_news", db.save_news(
+                    ticker=ticker,
+                    headline=item["headline"],
+                    url=item["url"],
+                    sentiment=sentiment["sentiment"],
+                    sentiment_score=sentiment["score"],
+                    reason=sentiment["reason"],
+                    source=item["source"],
+                    published_at=item["published_at"],
+                ))
+                if item.get("content_hash"):
+                    _scored_news[ticker] = (item["content_hash"], sentiment)
+                if sentiment_result is None:
+                    sentiment_result = sentiment
+            if reused:
+                logger.debug(f"{ticker}: ingen ny rubrik — återanvänder sentiment {sentiment_result.get('sentiment')}")
+                return news, sentiment_result
+            logger.info(f"{ticker}: sentimentanalys körd{' (manuell)' if manual else ''} | resultat={sentiment_result.get('sentiment') if sentiment_result else 'NONE'} (pre_score buy={pre_buy_score} sell={pre_sell_score})")
+            return news, sentiment_result
+
+        # 4. Nyheter+sentiment och insiderdata körs i bakgrunden — säljbeslutet nedan väntar inte på dem
+        news_task = asyncio.create_task(news_stage())
+        insider_task = asyncio.create_task(
+            _stage(timings, ticker, "insider", fetch_insider_trades(ticker, company_name=company), fallback=[])
+        )
+        # 5. Earnings date — undvik köp inom 48h före rapport (rapportkalendern i minnet)
+        with tracing.span("stage.earnings", ticker=ticker, cache_hit=True):
+            has_report_soon = _report_soon(ticker)
+    else:
+        logger.debug(
+            f"{ticker}: kan inte nå tröskel vid {price:.2f} kr "
+            f"(max köp {buy_boundary.score_at(price)}+{signal_boundary.OPTIMISTIC_BUY_BONUS}p < {signal_threshold}p) "
+            f"— hoppar över nyheter/FI/rapport"
+        )
 
-    # 4a. SELL logic — indicator-based sell recommendations
+    # 4a. SELL logic — indicator-based sell recommendations.
+    # Väntar högst _SELL_NEWS_WAIT s på nyhetssteget (FI och rapport påverkar inte
+    # säljbeslutet); är det inte klart används sentimentet från föregående rubrik.
     if in_position:
         position = open_positions[ticker]
         trade_id = position.get("trade_id")
@@ -250,17 +577,24 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
         pnl_kr = (price - buy_price) * qty
         pnl_pct = ((price - buy_price) / buy_price) * 100
 
+        sell_sentiment = None
+        if news_task is not None:
+            try:
+                news_list, latest_sentiment = await asyncio.wait_for(asyncio.shield(news_task), _SELL_NEWS_WAIT)
+                sell_sentiment = latest_sentiment
+            except asyncio.TimeoutError:
+                previous = _scored_news.get(ticker)
+                sell_sentiment = previous[1] if previous else None
+                logger.info(f"{ticker}: nyhetssteget inte klart — säljbeslut med föregående sentiment")
+
         # Check indicator-based sell signal
         sell_score, sell_reasons = score_sell_signal(
-            ticker, indicators, position, latest_sentiment, relative_strength=rs
+            ticker, indicators, position, sell_sentiment, relative_strength=rs
         )
 
-        # Adaptive sell threshold by market regime
-        effective_sell_threshold = get_effective_sell_threshold(
-            _settings.get_int("sell_threshold"), market_regime=market_regime
-        )
         if sell_score >= effective_sell_threshold:
             confidence = min(99.0, float(sell_score))
+            sell_reasons = render_reasons(sell_reasons)
             sell_reasons.append("Salj pa Avanza och stang positionen i appen")
             news_headline = news_list[0]["headline"] if news_list else ""
             description = await _get_signal_description(ticker, "SELL", price, sell_reasons, news_headline)
@@ -282,8 +616,44 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
                 f"SALJ-SIGNAL {ticker} | score={sell_score} | P&L={pnl_pct:+.1f}% | anvandaren maste salja pa Avanza"
             )
 
+    if news_task is not None:
+        news_list, latest_sentiment = await news_task
+    if insider_task is not None:
+        insider_trades = await insider_task
+    await price_task
+
+    # Spara live-score till stock_indicators MED sentiment inkluderat
+    # Beräkna full buy-score (med sentiment, insider, rapport) för korrekt dashboard-visning
+    t_score = _time.time_ns()
+    full_buy_score, _ = score_buy_signal(
+        ticker, indicators, latest_sentiment, insider_trades,
+        has_open_report_soon=has_report_soon,
+        relative_strength=rs,
+        market_regime=market_regime,
+    )
+    tracing.record("scoring", t_score, ticker=ticker, phase="full", buy_score=full_buy_score)
+    indicators["buy_score"] = full_buy_score
+    await db.save_indicators(ticker, indicators)
+    events.publish("indicators", {
+        "ticker": ticker,
+        "price": price,
+        **{k: _json_number(indicators.get(k)) for k in db.INDICATOR_FIELDS},
+    })
+
+    atr_value = indicators.get("atr") or 0
+    ticker_state.setdefault(ticker, {}).update({
+        "buy_score": full_buy_score,
+        "atr_pct": (atr_value / price) if price else 0.0,
+        "volume_ratio": float(indicators.get("volume_ratio") or 1.0),
+    })
+    try:
+        avg_volume = float(df["volume"].tail(20).mean())
+    except Exception:
+        avg_volume = 0.0
+    triggers.update_bands(ticker, indicators, price, open_positions.get(ticker), avg_volume)
+
     # 4b. BUY logic — generates a PENDING signal; user must confirm via dashboard
-    else:
+    if not in_position:
         buy_score, buy_reasons = score_buy_signal(
             ticker, indicators, latest_sentiment, insider_trades,
             has_open_report_soon=has_report_soon,
@@ -291,24 +661,9 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
             market_regime=market_regime,
         )
 
-        # Adaptive buy threshold by market regime + liquidity segment
-        base_threshold = _settings.get_int("signal_threshold")
-        try:
-            avg_turnover = (df["close"] * df["volume"]).mean()
-            signal_threshold = get_effective_buy_threshold(
-                base_threshold,
-                market_regime=market_regime,
-                avg_turnover=float(avg_turnover),
-            )
-            logger.debug(
-                f"{ticker}: adaptiv köp-tröskel {signal_threshold}p "
-                f"(regim={market_regime}, omsättning={avg_turnover/1e6:.0f}M/dag)"
-            )
-        except Exception:
-            signal_threshold = get_effective_buy_threshold(base_threshold, market_regime=market_regime)
-
         if buy_score < signal_threshold:
             return
+        buy_reasons = render_reasons(buy_reasons)
 
         candidate_atr = indicators.get("atr", 0)
         candidate_atr_pct = (candidate_atr / price) if (candidate_atr and price > 0) else 0.0
@@ -479,6 +834,24 @@ async def process_ticker(ticker: str, stock_config: dict | None = None, index_df
         )
 
 
+async def news_ingest():
+    """Every 5 minutes during trading hours – poll all watchlist feeds in one batch.
+
+    Keeps the per-feed cache warm (conditional GET) so process_ticker's
+    news stage is a memory lookup. Runs on every instance: the cache is local.
+    Tickers with new headlines are analysed in the next trading loop even if
+    their cadence would defer them; headlines already scored are not resent.
+    """
+    with tracing.span("news_ingest") as sp:
+        watchlist = await db.get_watchlist()
+        fresh = await ingest_news({s["ticker"]: s.get("name", s["ticker"]) for s in watchlist})
+        sp.attrs.update(feeds=len(watchlist), fresh_tickers=len(fresh))
+    for ticker, items in fresh.items():
+        # Gör tickern "due" — den nya rubriken når sentimentsteget i nästa loop
+        ticker_state.get(ticker, {}).pop("last_seq", None)
+        logger.debug(f"{ticker}: {len(items)} nya rubriker — {items[0]['headline'][:80]}")
+
+
 async def evening_summary():
     """17:35 – Send evening push notification."""
     portfolio_value, portfolio_pct = await db.get_portfolio_summary(PAPER_BALANCE)
@@ -499,27 +872,60 @@ async def weekly_scan():
 
 def setup_scheduler() -> AsyncIOScheduler:
     tz = "Europe/Stockholm"
+    # Varje jobb körs bara på den instans som håller jobbets lease (se leader.py)
+    # — skyddar mot dubbla körningar när gammal och ny container överlappar vid deploy.
+    # Lease-TTL är kortare än intervallet så att en standby tar över nästa körning.
     # 08:30 – Morgonkontroll
-    scheduler.add_job(morning_check, CronTrigger(day_of_week="mon-fri", hour=8, minute=30, timezone=tz))
+    scheduler.add_job(singleton("morning_check", morning_check), CronTrigger(day_of_week="mon-fri", hour=8, minute=30, timezone=tz))
     # 08:45 – Morgonsummering
-    scheduler.add_job(morning_summary, CronTrigger(day_of_week="mon-fri", hour=8, minute=45, timezone=tz))
+    scheduler.add_job(singleton("morning_summary", morning_summary), CronTrigger(day_of_week="mon-fri", hour=8, minute=45, timezone=tz))
     # 08:55 – Discovery scan (bred sökning när positioner < max)
-    scheduler.add_job(morning_discovery, CronTrigger(day_of_week="mon-fri", hour=8, minute=55, timezone=tz))
+    scheduler.add_job(singleton("morning_discovery", morning_discovery), CronTrigger(day_of_week="mon-fri", hour=8, minute=55, timezone=tz))
     # 09:00–16:58 – Handelsloop var 2:a minut
     scheduler.add_job(
-        trading_loop,
+        singleton("trading_loop", trading_loop),
         CronTrigger(day_of_week="mon-fri", hour="9-16", minute="*/2", timezone=tz),
+        max_instances=1, coalesce=True,
     )
     # 17:00–17:28 – Handelsloop (sista 15 minuter, inte 17:30+)
     scheduler.add_job(
-        trading_loop,
+        singleton("trading_loop", trading_loop),
         CronTrigger(day_of_week="mon-fri", hour=17, minute="0,2,4,6,8,10,12,14,16,18,20,22,24,26,28", timezone=tz),
+        max_instances=1, coalesce=True,
+    )
+    # 07:15 – Rapportkalender för hela universumet i en batch (sparas i Supabase)
+    scheduler.add_job(
+        singleton("earnings_calendar", earnings_calendar.refresh_earnings_calendar),
+        CronTrigger(day_of_week="mon-fri", hour=7, minute=15, timezone=tz),
+    )
+    # 07:45 – Alla instanser laddar om kalendern från DB
+    scheduler.add_job(
+        earnings_calendar.load_earnings_calendar,
+        CronTrigger(day_of_week="mon-fri", hour=7, minute=45, timezone=tz),
+    )
+    # 07:00–18:30 var 30:e minut – FI:s insiderregister i bulk (per instans: indexet ligger i minnet)
+    scheduler.add_job(
+        refresh_insider_register,
+        CronTrigger(day_of_week="mon-fri", hour="7-18", minute="0,30", timezone=tz),
+        max_instances=1, coalesce=True,
+    )
+    # 09:00–17:25 var 5:e minut – alla nyhetsflöden i en batch (per instans: cachen ligger i minnet)
+    scheduler.add_job(
+        news_ingest,
+        CronTrigger(day_of_week="mon-fri", hour="9-17", minute="*/5", timezone=tz),
+        max_instances=1, coalesce=True,
     )
     # 17:35 – Kvallssummering
-    scheduler.add_job(evening_summary, CronTrigger(day_of_week="mon-fri", hour=17, minute=35, timezone=tz))
+    scheduler.add_job(singleton("evening_summary", evening_summary), CronTrigger(day_of_week="mon-fri", hour=17, minute=35, timezone=tz))
     # 17:45 – Daglig skanning av hela universumet
-    scheduler.add_job(daily_scan, CronTrigger(day_of_week="mon-fri", hour=17, minute=45, timezone=tz))
+    scheduler.add_job(singleton("daily_scan", daily_scan), CronTrigger(day_of_week="mon-fri", hour=17, minute=45, timezone=tz))
     # Sondag 18:00 – veckovis aktiesskanning
-    scheduler.add_job(weekly_scan, CronTrigger(day_of_week="sun", hour=18, minute=0, timezone=tz))
+    scheduler.add_job(singleton("weekly_scan", weekly_scan), CronTrigger(day_of_week="sun", hour=18, minute=0, timezone=tz))
+    # 02:30 varje natt – rulla upp och radera gamla intradagsrader (retention.py)
+    scheduler.add_job(
+        singleton("retention", retention.nightly_compact),
+        CronTrigger(hour=2, minute=30, timezone=tz),
+        max_instances=1, coalesce=True,
+    )
 
     return scheduler
@@ -0,0 +1,224 @@
+"""
+Cold start — get /health answering first, load the heavy subsystems after.
+
+main.py imports only FastAPI; lifespan starts boot() as a background task
+and yields at once, so uvicorn accepts requests within a fraction of a
+second. boot() then imports the heavy modules (pandas, pandas_ta/numba,
+google-genai, supabase, apscheduler and the agent's own modules on top of
+them) in a worker thread, timing each one, so the event loop stays free to
+answer /health meanwhile. After that it runs what lifespan used to do:
+settings, scheduler, open positions and the background tasks.
+
+Once running, warm() primes the caches the first trading loop and the
+first dashboard requests read: the OMXS30 index and every watchlist and
+open-position history (during market hours — the history cache lives 5
+minutes), and open-position quotes, all fetched concurrently. /ready
+answers 503 until that is done, so a deploy can be gated on it.
+
+startup_stats (shown in /health) reports the phase, per-module import time,
+boot time and the warm-up. Measure the import cost alone in a fresh process:
+
+    cd agent
+    python -m startup
+"""
+import asyncio
+import importlib
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# I beroendeordning: varje tid är modulens egen kostnad utöver de tidigare
+_HEAVY_MODULES = (
+    "pandas",
+    "pandas_ta",
+    "supabase",
+    "google.genai",
+    "feedparser",
+    "apscheduler.schedulers.asyncio",
+    "analysis.indicators",
+    "analysis.sentiment",
+    "db.supabase_client",
+    "scheduler",
+    "stock_scanner",
+    "triggers",
+    "leader",
+)
+
+_WARM_CONCURRENCY = 8
+_WARM_TIMEOUT = 120  # sekunder — en seg upstream får inte hålla readiness nere för alltid
+
+_t0 = time.monotonic()
+
+startup_stats = {
+    "phase": "starting",   # starting -> importing -> loading -> ready | failed
+    "ready": False,        # allt är laddat och schemalagt
+    "warm": False,         # cacharna är fyllda (eller uppvärmningen gav upp) — se /ready
+    "imports_s": {},
+    "import_total_s": None,
+    "boot_s": None,
+    "warm_up": {},
+    "error": None,
+}
+
+_tasks: list[asyncio.Task] = []
+_scheduler = None
+
+
+def _import_all(modules=_HEAVY_MODULES) -> dict[str, float]:
+    timings = {}
+    for name in modules:
+        t = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = round(time.perf_counter() - t, 3)
+    return timings
+
+
+def _build_clients():
+    from analysis import sentiment
+    from db import supabase_client
+    for build in (sentiment.get_client, supabase_client.get_client):
+        try:
+            build()
+        except Exception as e:
+            # Samma beteende som tidigare: felet syns vid första anropet, inte som krasch här
+            logger.warning(f"Kunde inte skapa klient i förväg ({build.__module__}): {e}")
+
+
+async def boot():
+    """Background part of lifespan: imports, clients, settings, scheduler, background tasks."""
+    global _scheduler
+    t0 = time.monotonic()
+    try:
+        startup_stats["phase"] = "importing"
+        # Importerna i en tråd — event loop svarar på /health under tiden
+        timings = await asyncio.to_thread(_import_all)
+        startup_stats["imports_s"] = timings
+        startup_stats["import_total_s"] = round(sum(timings.values()), 3)
+        await asyncio.to_thread(_build_clients)
+
+        startup_stats["phase"] = "loading"
+        import settings
+        import scheduler
+        import tracing
+        import triggers
+        from data import earnings_calendar
+        from data.insider_fetcher import refresh_insider_register
+        await settings.load()
+        _scheduler = scheduler.setup_scheduler()
+        _scheduler.start()
+        await scheduler.load_open_positions()
+        logger.info("Scheduler igång.")
+        _tasks.extend([
+            asyncio.create_task(refresh_insider_register()),
+            asyncio.create_task(earnings_calendar.load_or_refresh()),
+            asyncio.create_task(triggers.watch()),
+            asyncio.create_task(tracing.export_loop()),
+        ])
+    except Exception as e:
+        startup_stats.update(phase="failed", error=f"{type(e).__name__}: {e}")
+        logger.error(f"Uppstarten misslyckades: {e}", exc_info=True)
+        return
+    startup_stats.update(phase="ready", ready=True, boot_s=round(time.monotonic() - t0, 3))
+    logger.info(
+        f"AKTIEMOTOR redo efter {time.monotonic() - _t0:.1f}s "
+        f"(importer {startup_stats['import_total_s']}s, uppstart {startup_stats['boot_s']}s)"
+    )
+    await warm()
+
+
+async def warm():
+    """Prime the caches read by the first trading loop, /api/summary and /api/positions."""
+    import portfolio
+    import scheduler
+    import triggers
+    from analysis import sentiment
+    from data import news_fetcher
+    from data.yahoo_client import get_current_price, get_index_history, get_price_history
+    from db import supabase_client as db
+
+    t0 = time.monotonic()
+    stats = startup_stats["warm_up"] = {
+        "histories": 0, "quotes": 0, "feeds": 0, "sentiments": 0, "cadence": 0, "errors": 0, "timed_out": False,
+    }
+    sem = asyncio.Semaphore(_WARM_CONCURRENCY)
+
+    async def one(kind: str, fetch, *args, **kwargs):
+        async with sem:
+            try:
+                await fetch(*args, **kwargs)
+                stats[kind] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                logger.debug(f"Uppvärmning {kind} {args}: {e}")
+
+    async def restore():
+        # Sparat tillstånd från föregående instans: Gemini-svar (6 h) och kadens (10 min)
+        now = datetime.now(timezone.utc)
+        news_rows, indicator_rows = await asyncio.gather(
+            db.get_recent_sentiments((now - timedelta(seconds=sentiment._SENTIMENT_TTL)).isoformat()),
+            db.get_recent_indicators((now - timedelta(minutes=10)).isoformat()),
+        )
+        stats["sentiments"] = sentiment.restore_cache(news_rows)
+        stats["cadence"] = scheduler.restore_cadence(indicator_rows)
+
+    async def feeds():
+        await scheduler.news_ingest()
+        stats["feeds"] = len(news_fetcher._feeds)
+
+    positions = list(scheduler.open_positions)
+    jobs = [one("quotes", get_current_price, t) for t in positions]
+    if triggers.is_market_open():
+        try:
+            watchlist = [s["ticker"] for s in await db.get_watchlist()]
+        except Exception as e:
+            logger.warning(f"Uppvärmning: kunde inte läsa watchlist: {e}")
+            watchlist = []
+        # Samma nycklar som process_ticker läser (days=220)
+        jobs.append(one("histories", get_index_history))
+        jobs += [one("histories", get_price_history, t, days=220) for t in dict.fromkeys([*watchlist, *positions])]
+        jobs += [_guarded(stats, restore()), _guarded(stats, feeds())]
+    else:
+        stats["skipped"] = "börsen stängd — cacharna hade gått ut före första loopen"
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*jobs), timeout=_WARM_TIMEOUT)
+    except asyncio.TimeoutError:
+        stats["timed_out"] = True
+        logger.warning(f"Uppvärmningen avbröts efter {_WARM_TIMEOUT}s")
+    # Första snapshot för /api/events — kurserna ligger nu i cachen
+    await _guarded(stats, portfolio.publish())
+    stats["seconds"] = round(time.monotonic() - t0, 2)
+    startup_stats["warm"] = True
+    logger.info(
+        f"Cacharna varma efter {stats['seconds']}s: {stats['histories']} historiker, {stats['quotes']} kurser, "
+        f"{stats['feeds']} nyhetsflöden, {stats['sentiments']} sentiment, {stats['cadence']} kadenser, {stats['errors']} fel"
+    )
+
+
+async def _guarded(stats: dict, coro):
+    try:
+        await coro
+    except Exception as e:
+        stats["errors"] += 1
+        logger.warning(f"Uppvärmning misslyckades delvis: {e}")
+
+
+async def shutdown(boot_task: asyncio.Task):
+    boot_task.cancel()
+    for task in _tasks:
+        task.cancel()
+    if _scheduler is not None:
+        _scheduler.shutdown()
+        logger.info("Scheduler stoppad.")
+
+
+if __name__ == "__main__":
+    before = set(sys.modules)
+    timings = _import_all()
+    width = max(map(len, timings))
+    for name, s in timings.items():
+        print(f"{name:<{width}}  {s * 1000:8.1f} ms")
+    print(f"{'totalt':<{width}}  {sum(timings.values()) * 1000:8.1f} ms  ({len(set(sys.modules) - before)} moduler)")
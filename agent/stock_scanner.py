@@ -13,157 +13,26 @@ Rotation mode (positions >= MAX_POSITIONS):
 import asyncio
 import logging
 from datetime import datetime, timezone
+import numpy as np
 from data.yahoo_client import get_price_history, get_index_history
-from analysis.indicators import calculate_indicators, calculate_relative_strength, calculate_market_regime
-from analysis.decision_engine import score_buy_signal
+from analysis.indicators import calculate_indicators, calculate_relative_strength, calculate_market_regime, column, stack
+from analysis.decision_engine import score_buy_signal, score_buy_batch, render_reasons
 from db.supabase_client import get_client, get_watchlist, bulk_update_watchlist
 from notifications import ntfy
+import instruments
+import tracing
 
 logger = logging.getLogger(__name__)
 
-# Broad universe of Swedish stocks to evaluate.
-# Covers all Nasdaq Stockholm Large Cap + Mid Cap (124 aktier).
-# The liquidity filter (MIN_DAILY_TURNOVER_SEK) automatically removes
-# any stock that doesn't meet the turnover threshold.
-# Unified stock data — single source of truth.
-# Each entry: (ticker, display_name, avanza_url, yahoo_symbol)
-# Backward-compatible dicts (STOCK_UNIVERSE, AVANZA_URLS, YAHOO_SYMBOLS)
-# are derived at the bottom — never define them separately.
-_STOCK_DATA: list[tuple[str, str, str, str]] = [
-    # ── Large Cap ──────────────────────────────────────────────
-    ("AAK", "AAK", "https://www.avanza.se/aktier/om-aktien.html/26268/aak", "AAK.ST"),
-    ("ABB", "ABB", "https://www.avanza.se/aktier/om-aktien.html/5447/abb", "ABB.ST"),
-    ("AFRY", "AFRY", "https://www.avanza.se/aktier/om-aktien.html/5765/afry", "AFRY.ST"),
-    ("ALFA", "Alfa Laval", "https://www.avanza.se/aktier/om-aktien.html/5580/alfa-laval", "ALFA.ST"),
-    ("ALIV SDB", "Autoliv SDB", "https://www.avanza.se/aktier/om-aktien.html/5236/autoliv-sdb", "ALIV-SDB.ST"),
-    ("ASSA B", "Assa Abloy B", "https://www.avanza.se/aktier/om-aktien.html/5271/assa-abloy-b", "ASSA-B.ST"),
-    ("ATCO A", "Atlas Copco A", "https://www.avanza.se/aktier/om-aktien.html/5234/atlas-copco-a", "ATCO-A.ST"),
-    ("ATCO B", "Atlas Copco B", "https://www.avanza.se/aktier/om-aktien.html/5235/atlas-copco-b", "ATCO-B.ST"),
-    ("AZN", "AstraZeneca", "https://www.avanza.se/aktier/om-aktien.html/5361/astrazeneca", "AZN.ST"),
-    ("AXFO", "Axfood", "https://www.avanza.se/aktier/om-aktien.html/5465/axfood", "AXFO.ST"),
-    ("BALD B", "Balder B", "https://www.avanza.se/aktier/om-aktien.html/5519/balder-b", "BALD-B.ST"),
-    ("BILL", "Billerud", "https://www.avanza.se/aktier/om-aktien.html/5253/billerud", "BILL.ST"),
-    ("BOL", "Boliden", "https://www.avanza.se/aktier/om-aktien.html/5564/boliden", "BOL.ST"),
-    ("CAST", "Castellum", "https://www.avanza.se/aktier/om-aktien.html/5353/castellum", "CAST.ST"),
-    ("DOME", "Dometic", "https://www.avanza.se/aktier/om-aktien.html/549782/dometic-group", "DOME.ST"),
-    ("EKTA B", "Elekta B", "https://www.avanza.se/aktier/om-aktien.html/5280/elekta-b", "EKTA-B.ST"),
-    ("ELUX B", "Electrolux B", "https://www.avanza.se/aktier/om-aktien.html/5238/electrolux-b", "ELUX-B.ST"),
-    ("EMBRAC B", "Embracer Group B", "https://www.avanza.se/aktier/om-aktien.html/707695/embracer-group-b", "EMBRAC-B.ST"),
-    ("EPRO A", "Epiroc A", "https://www.avanza.se/aktier/om-aktien.html/831540/epiroc-a", "EPRO-A.ST"),
-    ("EPRO B", "Epiroc B", "https://www.avanza.se/aktier/om-aktien.html/831541/epiroc-b", "EPRO-B.ST"),
-    ("EQT", "EQT", "https://www.avanza.se/aktier/om-aktien.html/956272/eqt", "EQT.ST"),
-    ("ERIC B", "Ericsson B", "https://www.avanza.se/aktier/om-aktien.html/5240/ericsson-b", "ERIC-B.ST"),
-    ("ESSITY B", "Essity B", "https://www.avanza.se/aktier/om-aktien.html/764241/essity-b", "ESSITY-B.ST"),
-    ("EVO", "Evolution", "https://www.avanza.se/aktier/om-aktien.html/549768/evolution", "EVO.ST"),
-    ("GETI B", "Getinge B", "https://www.avanza.se/aktier/om-aktien.html/5282/getinge-b", "GETI-B.ST"),
-    ("HEXA B", "Hexagon B", "https://www.avanza.se/aktier/om-aktien.html/5286/hexagon-b", "HEXA-B.ST"),
-    ("HM B", "H&M B", "https://www.avanza.se/aktier/om-aktien.html/5364/h-m-b", "HM-B.ST"),
-    ("HOLMEN B", "Holmen B", "https://www.avanza.se/aktier/om-aktien.html/5244/holmen-b", "HOLM-B.ST"),
-    ("HPOL B", "Hexpol B", "https://www.avanza.se/aktier/om-aktien.html/39498/hexpol-b", "HPOL-B.ST"),
-    ("HUSQ B", "Husqvarna B", "https://www.avanza.se/aktier/om-aktien.html/45189/husqvarna-b", "HUSQ-B.ST"),
-    ("INDU C", "Industrivärden C", "https://www.avanza.se/aktier/om-aktien.html/5245/industrivarden-c", "INDU-C.ST"),
-    ("INDT", "Indutrade", "https://www.avanza.se/aktier/om-aktien.html/26607/indutrade", "INDT.ST"),
-    ("INVE B", "Investor B", "https://www.avanza.se/aktier/om-aktien.html/5247/investor-b", "INVE-B.ST"),
-    ("INTRUM", "Intrum", "https://www.avanza.se/aktier/om-aktien.html/5223/intrum", "INTRUM.ST"),
-    ("KINV B", "Kinnevik B", "https://www.avanza.se/aktier/om-aktien.html/5369/kinnevik-b", "KINV-B.ST"),
-    ("LAGR B", "Lagercrantz Group B", "https://www.avanza.se/aktier/om-aktien.html/5514/lagercrantz-group-b", "LAGR-B.ST"),
-    ("LATO B", "Latour B", "https://www.avanza.se/aktier/om-aktien.html/5321/latour-b", "LATO-B.ST"),
-    ("LIFCO B", "Lifco B", "https://www.avanza.se/aktier/om-aktien.html/520898/lifco-b", "LIFCO-B.ST"),
-    ("LOOMIS", "Loomis", "https://www.avanza.se/aktier/om-aktien.html/154930/loomis", "LOOMIS.ST"),
-    ("LUND B", "Lundbergföretagen B", "https://www.avanza.se/aktier/om-aktien.html/5375/lundbergforetagen-b", "LUND-B.ST"),
-    ("MTRS", "Munters Group", "https://www.avanza.se/aktier/om-aktien.html/753399/munters-group", "MTRS.ST"),
-    ("NDA SE", "Nordea", "https://www.avanza.se/aktier/om-aktien.html/5249/nordea-bank", "NDA-SE.ST"),
-    ("NIBE B", "NIBE B", "https://www.avanza.se/aktier/om-aktien.html/5325/nibe-industrier-b", "NIBE-B.ST"),
-    ("SAAB B", "Saab B", "https://www.avanza.se/aktier/om-aktien.html/5260/saab-b", "SAAB-B.ST"),
-    ("SAND", "Sandvik", "https://www.avanza.se/aktier/om-aktien.html/5471/sandvik", "SAND.ST"),
-    ("SBB B", "Samhällsbyggnadsbolaget B", "https://www.avanza.se/aktier/om-aktien.html/808046/sbb-b", "SBB-B.ST"),
-    ("SCA B", "SCA B", "https://www.avanza.se/aktier/om-aktien.html/5263/sca-b", "SCA-B.ST"),
-    ("SEB A", "SEB A", "https://www.avanza.se/aktier/om-aktien.html/5255/seb-a", "SEB-A.ST"),
-    ("SECU B", "Securitas B", "https://www.avanza.se/aktier/om-aktien.html/5270/securitas-b", "SECU-B.ST"),
-    ("SECT B", "Sectra B", "https://www.avanza.se/aktier/om-aktien.html/16226/sectra-b", "SECT-B.ST"),
-    ("SHB A", "Handelsbanken A", "https://www.avanza.se/aktier/om-aktien.html/5264/handelsbanken-a", "SHB-A.ST"),
-    ("SINCH", "Sinch", "https://www.avanza.se/aktier/om-aktien.html/599956/sinch", "SINCH.ST"),
-    ("SKF B", "SKF B", "https://www.avanza.se/aktier/om-aktien.html/5259/skf-b", "SKF-B.ST"),
-    ("SOBI", "Swedish Orphan Biovitrum", "https://www.avanza.se/aktier/om-aktien.html/51308/swedish-orphan-biovitrum", "SOBI.ST"),
-    ("SSAB A", "SSAB A", "https://www.avanza.se/aktier/om-aktien.html/5261/ssab-a", "SSAB-A.ST"),
-    ("SSAB B", "SSAB B", "https://www.avanza.se/aktier/om-aktien.html/495284/ssab-b", "SSAB-B.ST"),
-    ("STE R", "Stora Enso R", "https://www.avanza.se/aktier/om-aktien.html/5256/stora-enso-r", "STE-R.ST"),
-    ("SWEC B", "Sweco B", "https://www.avanza.se/aktier/om-aktien.html/5409/sweco-b", "SWEC-B.ST"),
-    ("SWED A", "Swedbank A", "https://www.avanza.se/aktier/om-aktien.html/5241/swedbank-a", "SWED-A.ST"),
-    ("TELE2 B", "Tele2 B", "https://www.avanza.se/aktier/om-aktien.html/5386/tele2-b", "TELE2-B.ST"),
-    ("TELIA", "Telia", "https://www.avanza.se/aktier/om-aktien.html/5479/telia-company", "TELIA.ST"),
-    ("TIGO SDB", "Millicom SDB", "https://www.avanza.se/aktier/om-aktien.html/5384/millicom-sdb", "TIGO-SDB.ST"),
-    ("TREL B", "Trelleborg B", "https://www.avanza.se/aktier/om-aktien.html/5267/trelleborg-b", "TREL-B.ST"),
-    ("VOLCAR B", "Volvo Cars B", "https://www.avanza.se/aktier/om-aktien.html/1041480/volvo-cars-b", "VOLCAR-B.ST"),
-    ("VOLV A", "Volvo A", "https://www.avanza.se/aktier/om-aktien.html/5268/volvo-a", "VOLV-A.ST"),
-    ("VOLV B", "Volvo B", "https://www.avanza.se/aktier/om-aktien.html/5269/volvo-b", "VOLV-B.ST"),
-    # ── Mid Cap ────────────────────────────────────────────────
-    ("ACAD", "Academedia", "https://www.avanza.se/aktier/om-aktien.html/560907/academedia", "ACAD.ST"),
-    ("ADDT B", "AddTech B", "https://www.avanza.se/aktier/om-aktien.html/5537/addtech-b", "ADDT-B.ST"),
-    ("AMBEA", "Ambea", "https://www.avanza.se/aktier/om-aktien.html/753387/ambea", "AMBEA.ST"),
-    ("ARJO B", "Arjo B", "https://www.avanza.se/aktier/om-aktien.html/831548/arjo-b", "ARJO-B.ST"),
-    ("ATRLJ B", "Atrium Ljungberg B", "https://www.avanza.se/aktier/om-aktien.html/5272/atrium-ljungberg-b", "ATRLJ-B.ST"),
-    ("BETS B", "Betsson B", "https://www.avanza.se/aktier/om-aktien.html/5482/betsson-b", "BETS-B.ST"),
-    ("BIOG B", "BioGaia B", "https://www.avanza.se/aktier/om-aktien.html/5507/biogaia-b", "BIOG-B.ST"),
-    ("BONAV B", "Bonava B", "https://www.avanza.se/aktier/om-aktien.html/764238/bonava-b", "BONAV-B.ST"),
-    ("BOOZT", "Boozt", "https://www.avanza.se/aktier/om-aktien.html/780423/boozt", "BOOZT.ST"),
-    ("BRAV", "Bravida Holding", "https://www.avanza.se/aktier/om-aktien.html/753395/bravida-holding", "BRAV.ST"),
-    ("BUFAB", "Bufab", "https://www.avanza.se/aktier/om-aktien.html/518131/bufab", "BUFAB.ST"),
-    ("BURE", "Bure Equity", "https://www.avanza.se/aktier/om-aktien.html/5277/bure-equity", "BURE.ST"),
-    ("CAMX", "Camurus", "https://www.avanza.se/aktier/om-aktien.html/521499/camurus", "CAMX.ST"),
-    ("CATE", "Catena", "https://www.avanza.se/aktier/om-aktien.html/5484/catena", "CATE.ST"),
-    ("CIBUS", "Cibus Nordic Real Estate", "https://www.avanza.se/aktier/om-aktien.html/867390/cibus-nordic", "CIBUS.ST"),
-    ("CINT", "Cint Group", "https://www.avanza.se/aktier/om-aktien.html/1061965/cint-group", "CINT.ST"),
-    ("CLAS B", "Clas Ohlson B", "https://www.avanza.se/aktier/om-aktien.html/5276/clas-ohlson-b", "CLAS-B.ST"),
-    ("COOR", "Coor Service Management", "https://www.avanza.se/aktier/om-aktien.html/523418/coor-service-management", "COOR.ST"),
-    ("CTM", "CellaVision", "https://www.avanza.se/aktier/om-aktien.html/5490/cellavision", "CTM.ST"),
-    ("DIOS", "Dios Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/45191/dios-fastigheter", "DIOS.ST"),
-    ("ELAN B", "Elanders B", "https://www.avanza.se/aktier/om-aktien.html/5485/elanders-b", "ELAN-B.ST"),
-    ("FABG", "Fabege", "https://www.avanza.se/aktier/om-aktien.html/5300/fabege", "FABG.ST"),
-    ("GREP", "Gränges", "https://www.avanza.se/aktier/om-aktien.html/510194/granges", "GREP.ST"),
-    ("HEBA B", "HEBA Fastigheter B", "https://www.avanza.se/aktier/om-aktien.html/5506/heba-b", "HEBA-B.ST"),
-    ("HMS", "HMS Networks", "https://www.avanza.se/aktier/om-aktien.html/98412/hms-networks", "HMS.ST"),
-    ("HTRO", "Hexatronic", "https://www.avanza.se/aktier/om-aktien.html/299737/hexatronic-group", "HTRO.ST"),
-    ("HUFV A", "Hufvudstaden A", "https://www.avanza.se/aktier/om-aktien.html/5287/hufvudstaden-a", "HUFV-A.ST"),
-    ("JM", "JM", "https://www.avanza.se/aktier/om-aktien.html/5501/jm", "JM.ST"),
-    ("KABE B", "KABE B", "https://www.avanza.se/aktier/om-aktien.html/5308/kabe-b", "KABE-B.ST"),
-    ("KNOW", "Knowit", "https://www.avanza.se/aktier/om-aktien.html/5515/knowit", "KNOW.ST"),
-    ("LIME", "Lime Technologies", "https://www.avanza.se/aktier/om-aktien.html/867393/lime-technologies", "LIME.ST"),
-    ("MEKO", "Meko", "https://www.avanza.se/aktier/om-aktien.html/5324/meko", "MEKO.ST"),
-    ("MEDIO B", "Medicover B", "https://www.avanza.se/aktier/om-aktien.html/788849/medicover-b", "MEDIO-B.ST"),
-    ("MYCR", "Mycronic", "https://www.avanza.se/aktier/om-aktien.html/5383/mycronic", "MYCR.ST"),
-    ("NCAB", "NCAB Group", "https://www.avanza.se/aktier/om-aktien.html/856458/ncab-group", "NCAB.ST"),
-    ("NEWA B", "New Wave Group B", "https://www.avanza.se/aktier/om-aktien.html/5326/new-wave-group-b", "NEWA-B.ST"),
-    ("NOLA B", "Nolato B", "https://www.avanza.se/aktier/om-aktien.html/5327/nolato-b", "NOLA-B.ST"),
-    ("NOTE", "NOTE", "https://www.avanza.se/aktier/om-aktien.html/5328/note", "NOTE.ST"),
-    ("NP3", "NP3 Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/519504/np3-fastigheter", "NP3.ST"),
-    ("NYFOSA", "Nyfosa", "https://www.avanza.se/aktier/om-aktien.html/907825/nyfosa", "NYFOSA.ST"),
-    ("OEM B", "OEM International B", "https://www.avanza.se/aktier/om-aktien.html/5329/oem-international-b", "OEM-B.ST"),
-    ("PEAB B", "Peab B", "https://www.avanza.se/aktier/om-aktien.html/5330/peab-b", "PEAB-B.ST"),
-    ("PLAZ B", "Platzer Fastigheter B", "https://www.avanza.se/aktier/om-aktien.html/519508/platzer-fastigheter-b", "PLAZ-B.ST"),
-    ("PNDX B", "Pandox B", "https://www.avanza.se/aktier/om-aktien.html/720476/pandox-b", "PNDX-B.ST"),
-    ("RATO B", "Ratos B", "https://www.avanza.se/aktier/om-aktien.html/5397/ratos-b", "RATO-B.ST"),
-    ("RESURS", "Resurs Holding", "https://www.avanza.se/aktier/om-aktien.html/569437/resurs-holding", "RESURS.ST"),
-    ("RVRC", "Revolution Race", "https://www.avanza.se/aktier/om-aktien.html/1041388/rvrc-holding", "RVRC.ST"),
-    ("SAGAX B", "Sagax B", "https://www.avanza.se/aktier/om-aktien.html/405815/sagax-b", "SAGAX-B.ST"),
-    ("SAVE", "Nordnet", "https://www.avanza.se/aktier/om-aktien.html/325295/nordnet", "SAVE.ST"),
-    ("SDIP B", "Sdiptech B", "https://www.avanza.se/aktier/om-aktien.html/784434/sdiptech-b", "SDIP-B.ST"),
-    ("SYSR", "Synsam Group", "https://www.avanza.se/aktier/om-aktien.html/956279/synsam-group", "SYSR.ST"),
-    ("THULE", "Thule Group", "https://www.avanza.se/aktier/om-aktien.html/521491/thule-group", "THULE.ST"),
-    ("TOBS B", "Tobii B", "https://www.avanza.se/aktier/om-aktien.html/625680/tobii-b", "TOBS-B.ST"),
-    ("TROAX", "Troax Group", "https://www.avanza.se/aktier/om-aktien.html/549766/troax-group", "TROAX.ST"),
-    ("VBG B", "VBG Group B", "https://www.avanza.se/aktier/om-aktien.html/5342/vbg-group-b", "VBG-B.ST"),
-    ("WALL B", "Wallenstam B", "https://www.avanza.se/aktier/om-aktien.html/5344/wallenstam-b", "WALL-B.ST"),
-    ("WIHL", "Wihlborgs Fastigheter", "https://www.avanza.se/aktier/om-aktien.html/5345/wihlborgs-fastigheter", "WIHL.ST"),
-    ("XVIVO", "XVIVO Perfusion", "https://www.avanza.se/aktier/om-aktien.html/376275/xvivo-perfusion", "XVIVO.ST"),
-]
-
-STOCK_UNIVERSE = {t[0]: t[1] for t in _STOCK_DATA}
-AVANZA_URLS    = {t[0]: t[2] for t in _STOCK_DATA}
-YAHOO_SYMBOLS  = {t[0]: t[3] for t in _STOCK_DATA}
+# Broad universe of Swedish stocks to evaluate — defined in instruments.py.
+# Backward-compatible dicts derived from the registry; never define them separately.
+STOCK_UNIVERSE = {i.ticker: i.name for i in instruments.universe()}
+AVANZA_URLS    = {i.ticker: i.avanza_url for i in instruments.universe()}
+YAHOO_SYMBOLS  = {i.ticker: i.yahoo_symbol for i in instruments.universe()}
 
 MIN_DAILY_TURNOVER_SEK = 30_000_000   # 30M SEK/dag — filtrerar bort illikvida mikrokap
 MIN_HISTORY_DAYS      = 50            # Minst 50 handelsdagar för tillförlitlig bedömning
+SCAN_THROTTLE_S       = 0.5           # paus mellan tickers i skanningarna (Yahoo rate limit)
 
 
 def score_candidate(ticker: str, indicators: dict, df) -> tuple[float, list[str]]:
@@ -235,6 +104,79 @@ def score_candidate(ticker: str, indicators: dict, df) -> tuple[float, list[str]
     return round(score, 1), reasons
 
 
+def score_candidate_batch(X: np.ndarray, avg_turnover, history_days) -> np.ndarray:
+    """score_candidate for every row of an indicator matrix (analysis.indicators.stack).
+
+    avg_turnover (NaN = unknown) and history_days are per-row arrays.
+    Filtered rows score 0. No reasons — call score_candidate for those.
+    """
+    n = len(X)
+    price = X[:, column("current_price")]
+    atr = X[:, column("atr")]
+    ma50 = X[:, column("ma50")]
+    ma200 = X[:, column("ma200")]
+    rsi = X[:, column("rsi")]
+    vol_ratio = np.nan_to_num(X[:, column("volume_ratio")], nan=0.0)
+    turnover = np.asarray(avg_turnover, dtype=np.float64)
+    days = np.asarray(history_days)
+
+    def truthy(x):
+        return ~np.isnan(x) & (x != 0)
+
+    score = np.zeros(n, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        filtered = (turnover < MIN_DAILY_TURNOVER_SEK) | (days < MIN_HISTORY_DAYS)
+        score += np.where(turnover >= 200_000_000, 20, np.where(turnover >= 80_000_000, 10, 0))
+
+        daily_vol_pct = atr / price * 100
+        has_vol = truthy(price) & truthy(atr)
+        score += np.where(has_vol & (daily_vol_pct >= 2) & (daily_vol_pct <= 8), 25,
+                          np.where(has_vol & (daily_vol_pct > 8), 10, 0))
+
+        score += np.where(vol_ratio >= 1.5, 20, np.where(vol_ratio >= 1.0, 10, 0))
+        score += np.where(truthy(price) & truthy(ma50) & (price > ma50), 20, 0)
+        score += np.where(truthy(price) & truthy(ma200) & (price > ma200), 15, 0)
+        score += np.where(truthy(rsi) & (rsi >= 30) & (rsi <= 70), 10, 0)
+    return np.where(filtered, 0.0, np.round(score, 1))
+
+
+def _avg_turnover(df) -> float:
+    if df.empty or "close" not in df.columns or "volume" not in df.columns:
+        return float("nan")
+    return float((df["close"] * df["volume"]).mean())
+
+
+def _score_rows(rows: list[dict], market_regime: str):
+    """Vectorized candidate and pre-buy scores for all scanned tickers.
+
+    Sets candidate_score, buy_pre_score and combined_score on each row.
+    Reasons are left for _explain() so only rows that are shown pay for them.
+    """
+    if not rows:
+        return
+    X = stack([r["indicators"] for r in rows])
+    rs = np.array([np.nan if r["rs"] is None else r["rs"] for r in rows])
+    cand = score_candidate_batch(X, [_avg_turnover(r["df"]) for r in rows], [len(r["df"]) for r in rows])
+    buy = score_buy_batch(X, relative_strength=rs)
+    for r, c, b in zip(rows, cand, buy):
+        r["candidate_score"] = float(c)
+        r["buy_pre_score"] = int(b)
+        r["combined_score"] = r["candidate_score"] * 0.4 + r["buy_pre_score"] * 0.6
+
+
+def _explain(r: dict, market_regime: str):
+    """Fill in the human-readable reasons for one scored row (scalar scorers)."""
+    _, r["reasons"] = score_candidate(r["ticker"], r["indicators"], r["df"])
+    _, buy_reasons = score_buy_signal(
+        r["ticker"], r["indicators"],
+        news_sentiment=None, insider_trades=None,
+        has_open_report_soon=False,
+        relative_strength=r["rs"],
+        market_regime=market_regime,
+    )
+    r["buy_reasons"] = render_reasons(buy_reasons)
+
+
 def _derive_stock_config(indicators: dict, df) -> dict:
     """
     Derive per-stock trading config (strategy, SL%, TP%, ATR-multiplier)
@@ -280,6 +222,11 @@ async def discovery_scan():
     then sets the top DISCOVERY_WATCHLIST_SIZE as the active watchlist.
     Stocks with open positions are always kept.
     """
+    with tracing.span("scan.discovery"):
+        return await _discovery_scan()
+
+
+async def _discovery_scan():
     logger.info("=== DISCOVERY SCAN START ===")
     logger.info(f"Skannar {len(STOCK_UNIVERSE)} aktier för att hitta bästa handels­kandidaterna...")
 
@@ -303,6 +250,7 @@ async def discovery_scan():
     market_regime = calculate_market_regime(index_df)
     logger.info(f"Marknadsregim: {market_regime}")
 
+    rows = []        # Hämtade tickers — poängsätts tillsammans efter loopen
     results = []
     filtered = []    # Tickers filtered by liquidity/history/data
     error_tickers = []  # Tickers that threw exceptions
@@ -326,60 +274,49 @@ async def discovery_scan():
                 filtered.append({"ticker": ticker, "reason": "Indikatorberäkning misslyckades"})
                 continue
 
-            # 1. Candidate score (liquidity, volatility, trend)
-            cand_score, cand_reasons = score_candidate(ticker, indicators, df)
-            if cand_score == 0:
-                reason = cand_reasons[0] if cand_reasons else "okänd"
-                filtered.append({"ticker": ticker, "reason": reason})
-                logger.debug(f"  {ticker}: filtrerad — {reason}")
-                continue
-
-            # 2. Technical buy pre-score (without sentiment — quick & free)
             rs = calculate_relative_strength(df, index_df) if index_df is not None else None
-            buy_pre_score, buy_reasons = score_buy_signal(
-                ticker, indicators,
-                news_sentiment=None, insider_trades=None,
-                has_open_report_soon=False,
-                relative_strength=rs,
-                market_regime=market_regime,
-            )
-
-            # Combined score: 40% candidate quality + 60% buy readiness
-            # This prioritizes stocks that are both good candidates AND close to a buy signal
-            combined_score = cand_score * 0.4 + buy_pre_score * 0.6
-
-            # Stability bonus: stocks already on the watchlist get a small boost
-            # to prevent unnecessary churn
-            if ticker in current_watchlist_tickers:
-                combined_score += 5
-                cand_reasons.append("Stabilitet: redan på watchlist (+5p)")
-
-            results.append({
+            rows.append({
                 "ticker": ticker,
                 "name": name,
-                "candidate_score": cand_score,
-                "buy_pre_score": buy_pre_score,
-                "combined_score": round(combined_score, 1),
-                "reasons": cand_reasons,
-                "buy_reasons": buy_reasons,
                 "indicators": indicators,
                 "df": df,
+                "rs": rs,
                 "is_positioned": ticker in positioned_tickers,
             })
-            scanned += 1
-
-            if buy_pre_score >= 30:
-                logger.info(f"  {ticker}: kandidat={cand_score:.0f}p  köp_pre={buy_pre_score:.0f}p  kombi={combined_score:.0f}p ★")
-            else:
-                logger.debug(f"  {ticker}: kandidat={cand_score:.0f}p  köp_pre={buy_pre_score:.0f}p  kombi={combined_score:.0f}p")
-
         except Exception as e:
             errors += 1
             error_tickers.append({"ticker": ticker, "error": str(e)})
             logger.warning(f"  {ticker}: fel — {e}")
 
         # Throttle to avoid Yahoo rate-limiting
-        await asyncio.sleep(0.5)
+        await asyncio.sleep(SCAN_THROTTLE_S)
+
+    # 1. Candidate score (liquidity, volatility, trend) och 2. teknisk köp-pre-score
+    # (utan sentiment) för hela universumet i ett vektoriserat svep
+    with tracing.span("scan.score", rows=len(rows)):
+        _score_rows(rows, market_regime)
+    for r in rows:
+        if r["candidate_score"] == 0:
+            _, cand_reasons = score_candidate(r["ticker"], r["indicators"], r["df"])
+            reason = cand_reasons[0] if cand_reasons else "okänd"
+            filtered.append({"ticker": r["ticker"], "reason": reason})
+            logger.debug(f"  {r['ticker']}: filtrerad — {reason}")
+            continue
+
+        # Combined score: 40% candidate quality + 60% buy readiness
+        # Stability bonus: stocks already on the watchlist get a small boost
+        # to prevent unnecessary churn
+        r["stability_bonus"] = r["ticker"] in current_watchlist_tickers
+        if r["stability_bonus"]:
+            r["combined_score"] += 5
+        r["combined_score"] = round(r["combined_score"], 1)
+        results.append(r)
+        scanned += 1
+
+        if r["buy_pre_score"] >= 30:
+            logger.info(f"  {r['ticker']}: kandidat={r['candidate_score']:.0f}p  köp_pre={r['buy_pre_score']:.0f}p  kombi={r['combined_score']:.0f}p ★")
+        else:
+            logger.debug(f"  {r['ticker']}: kandidat={r['candidate_score']:.0f}p  köp_pre={r['buy_pre_score']:.0f}p  kombi={r['combined_score']:.0f}p")
 
     if not results:
         logger.warning("Discovery scan returnerade inga resultat.")
@@ -397,6 +334,10 @@ async def discovery_scan():
     top_candidates = non_positioned[:max(0, slots_available)]
 
     final_selection = positioned_results + top_candidates
+    for r in final_selection:
+        _explain(r, market_regime)
+        if r["stability_bonus"]:
+            r["reasons"].append("Stabilitet: redan på watchlist (+5p)")
 
     # Build new watchlist entries
     new_entries = []
@@ -465,7 +406,7 @@ async def discovery_scan():
 
     await ntfy._send(
         msg,
-        title=f"Discovery — {len(final_selection)} aktier bevakas",
+        title=f"Discovery: {len(final_selection)} aktier bevakas",
         priority="default",
         tags=["mag", "bar_chart"],
         notif_type="discovery_scan",
@@ -515,6 +456,11 @@ async def discovery_scan():
 
 async def run_scan():
     """Main scan function — called daily/weekly by scheduler."""
+    with tracing.span("scan.rotation"):
+        return await _run_scan()
+
+
+async def _run_scan():
     logger.info("Startar aktiesskanning...")
     db = get_client()
 
@@ -522,6 +468,7 @@ async def run_scan():
     watchlist = await get_watchlist()
     current_tickers = {s["ticker"] for s in watchlist}
 
+    rows = []
     results = []
 
     # Fetch OMXS30 for relative strength + market regime
@@ -545,39 +492,33 @@ async def run_scan():
             indicators = calculate_indicators(df)
             if not indicators:
                 continue
-            score, reasons = score_candidate(ticker, indicators, df)
-            if score == 0:
-                logger.debug(f"  {ticker}: filtrerad – {reasons[0] if reasons else '?'}")
-                continue
-
-            # Calculate buy pre-score for combined ranking (same as discovery_scan)
             rs = calculate_relative_strength(df, index_df) if index_df is not None else None
-            buy_pre_score, _ = score_buy_signal(
-                ticker, indicators,
-                news_sentiment=None, insider_trades=None,
-                has_open_report_soon=False,
-                relative_strength=rs,
-                market_regime=market_regime,
-            )
-            combined_score = score * 0.4 + buy_pre_score * 0.6
-
-            results.append({
+            rows.append({
                 "ticker": ticker,
                 "name": name,
-                "score": score,
-                "combined_score": combined_score,
-                "buy_pre_score": buy_pre_score,
-                "reasons": reasons,
                 "indicators": indicators,
                 "df": df,
+                "rs": rs,
                 "in_watchlist": ticker in current_tickers,
             })
-            logger.info(f"  {ticker}: kandidat={score:.0f}p köp_pre={buy_pre_score:.0f}p kombi={combined_score:.0f}p")
         except Exception as e:
             logger.warning(f"  {ticker}: fel – {e}")
 
         # Throttle to avoid Yahoo rate-limiting
-        await asyncio.sleep(0.5)
+        await asyncio.sleep(SCAN_THROTTLE_S)
+
+    # Candidate- och köp-pre-score för alla i ett svep (same ranking as discovery_scan)
+    with tracing.span("scan.score", rows=len(rows)):
+        _score_rows(rows, market_regime)
+    for r in rows:
+        if r["candidate_score"] == 0:
+            if logger.isEnabledFor(logging.DEBUG):
+                _, reasons = score_candidate(r["ticker"], r["indicators"], r["df"])
+                logger.debug(f"  {r['ticker']}: filtrerad – {reasons[0] if reasons else '?'}")
+            continue
+        r["score"] = r["candidate_score"]
+        results.append(r)
+        logger.info(f"  {r['ticker']}: kandidat={r['score']:.0f}p köp_pre={r['buy_pre_score']:.0f}p kombi={r['combined_score']:.0f}p")
 
     if not results:
         logger.warning("Skanning returnerade inga resultat.")
@@ -651,6 +592,7 @@ async def run_scan():
     if replaced:
         sections = []
         for w, c in replaced[:3]:
+            _explain(c, market_regime)
             top_reasons = c["reasons"][:3]
             reasons_str = "\n".join(f"    ✓ {r}" for r in top_reasons)
             sections.append(
@@ -0,0 +1,308 @@
+"""
+Lightweight tracing for the hot paths — spans with parent/child structure.
+
+    with tracing.span("stage.history", ticker="VOLV B"):
+        ...
+        tracing.annotate(cache_hit=True)   # sätter attribut på aktuellt span
+
+Spans nest through a ContextVar, so tasks created with asyncio.create_task /
+gather / wait_for and threads started with asyncio.to_thread are attributed
+to the span that was active when they were created. A span without a parent
+starts a new trace; when it ends the finished trace is kept in an in-memory
+ring buffer (/api/traces) and queued for export.
+
+Export is configured with TRACE_EXPORT and runs in the background
+(export_loop, started from lifespan) — the hot path only appends to a list:
+
+    TRACE_EXPORT=file:/tmp/traces.jsonl           en rad JSON per span
+    TRACE_EXPORT=otlp:http://localhost:4318       OTLP/HTTP JSON till en collector (Jaeger, Tempo, ...)
+
+critical_path() walks a trace from the root, following at each level the
+child that finished last — the chain that decided the trace's duration.
+"""
+import asyncio
+import functools
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config import TRACE_EXPORT
+
+logger = logging.getLogger(__name__)
+
+_RECENT_TRACES = 50
+_MAX_SPANS_PER_TRACE = 10_000   # en trading loop med hundratals tickers ryms, en läcka gör det inte
+_EXPORT_INTERVAL_S = 5
+_MAX_PENDING = 50_000
+
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+_recent: deque[list["Span"]] = deque(maxlen=_RECENT_TRACES)
+_pending: list["Span"] = []
+_listeners: list = []
+
+trace_stats = {"traces": 0, "spans": 0, "dropped_spans": 0, "exported_spans": 0, "export_errors": 0}
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attrs", "error", "_trace")
+
+    def __init__(self, name: str, parent: "Span | None", attrs: dict):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self._trace = parent._trace if parent else []
+        self.attrs = attrs
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "end_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attrs,
+            "error": self.error,
+        }
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block as a child of the current span (or as a new trace)."""
+    parent = _current.get()
+    s = Span(name, parent, attrs)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = type(e).__name__
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        _finish(s)
+
+
+def traced(name: str):
+    """Decorator: run an async function inside span(name)."""
+    def wrap(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def record(name: str, start_ns: int, **attrs) -> Span:
+    """Record an already-timed block (start_ns = time.time_ns() at its start) as a finished child span."""
+    s = Span(name, _current.get(), attrs)
+    s.start_ns = start_ns
+    s.end_ns = time.time_ns()
+    _finish(s)
+    return s
+
+
+def annotate(**attrs):
+    """Set attributes on the current span (no-op outside a span)."""
+    s = _current.get()
+    if s is not None:
+        s.attrs.update(attrs)
+
+
+def on_finish(fn):
+    """Call fn(span) for every finished span — must be cheap, it runs on the hot path."""
+    _listeners.append(fn)
+
+
+def current_trace_id() -> str | None:
+    s = _current.get()
+    return s.trace_id if s else None
+
+
+def _finish(s: Span):
+    trace = s._trace
+    if len(trace) >= _MAX_SPANS_PER_TRACE:
+        trace_stats["dropped_spans"] += 1
+    else:
+        trace.append(s)
+        trace_stats["spans"] += 1
+    for fn in _listeners:
+        fn(s)
+    if s.parent_id is None:
+        trace_stats["traces"] += 1
+        _recent.append(trace)
+        if TRACE_EXPORT and len(_pending) < _MAX_PENDING:
+            _pending.extend(trace)
+
+
+# ── Läsning ────────────────────────────────────────────────────────────
+
+def _root(trace: list[Span]) -> Span | None:
+    return next((s for s in reversed(trace) if s.parent_id is None), None)
+
+
+def _children(trace: list[Span]) -> dict[str, list[Span]]:
+    out: dict[str, list[Span]] = {}
+    for s in trace:
+        if s.parent_id:
+            out.setdefault(s.parent_id, []).append(s)
+    return out
+
+
+def _walk(node: Span, children: dict[str, list[Span]], depth: int, out: list[dict]):
+    # Bakåt från förälderns slut: det barn som slutade sist före markören blockerade,
+    # sedan flyttas markören till dess start. Parallella syskon som hann klart faller bort.
+    chain = []
+    cursor = node.end_ns
+    for child in sorted(children.get(node.span_id, []), key=lambda c: c.end_ns, reverse=True):
+        if child.end_ns <= cursor:
+            chain.append(child)
+            cursor = child.start_ns
+    chain.reverse()
+    covered = sum(c.end_ns - c.start_ns for c in chain)
+    out.append({
+        "name": node.name,
+        "depth": depth,
+        "duration_ms": round(node.duration_ms, 2),
+        "self_ms": round(max(0.0, (node.end_ns - node.start_ns - covered) / 1e6), 2),
+        **({"ticker": node.attrs["ticker"]} if "ticker" in node.attrs else {}),
+    })
+    for child in chain:
+        _walk(child, children, depth + 1, out)
+
+
+def critical_path(trace: list[Span]) -> list[dict]:
+    """The chain of spans that decided the trace's duration, in start order.
+
+    At each level, walking back from the parent's end, the child that
+    finished last before the cursor is on the path; concurrent siblings
+    that finished earlier are not. self_ms is the part of a span's time
+    not spent in its own children on the path — where the time went.
+    """
+    root = _root(trace)
+    if root is None:
+        return []
+    out: list[dict] = []
+    _walk(root, _children(trace), 0, out)
+    return out
+
+
+def summaries(limit: int = 10, name: str | None = None, top: int = 10) -> list[dict]:
+    """Latest finished traces, newest first, with the `top` critical-path spans by self time."""
+    out = []
+    for trace in reversed(_recent):
+        root = _root(trace)
+        if root is None or (name and root.name != name):
+            continue
+        out.append({
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "started_at": root.start_ns // 1_000_000,
+            "duration_ms": round(root.duration_ms, 2),
+            "spans": len(trace),
+            "attributes": root.attrs,
+            "critical_path": sorted(critical_path(trace), key=lambda p: p["self_ms"], reverse=True)[:top],
+        })
+        if len(out) >= limit:
+            break
+    return out
+
+
+def get_trace(trace_id: str) -> dict | None:
+    """All spans of a trace in start order, plus its full critical path."""
+    for trace in _recent:
+        if trace and trace[0].trace_id == trace_id:
+            return {
+                "spans": [s.to_dict() for s in sorted(trace, key=lambda s: s.start_ns)],
+                "critical_path": critical_path(trace),
+            }
+    return None
+
+
+# ── Export ─────────────────────────────────────────────────────────────
+
+def _otlp_value(v) -> dict:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_payload(spans: list[Span]) -> dict:
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "aktiemotor"}}]},
+        "scopeSpans": [{
+            "scope": {"name": "aktiemotor.tracing"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attrs.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            } for s in spans],
+        }],
+    }]}
+
+
+def _write_file(path: str, spans: list[Span]):
+    with open(path, "a", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+async def flush():
+    """Export queued spans to TRACE_EXPORT (file: or otlp:)."""
+    if not _pending or not TRACE_EXPORT:
+        return
+    batch = _pending[:]
+    del _pending[:len(batch)]
+    kind, _, target = TRACE_EXPORT.partition(":")
+    try:
+        if kind == "file":
+            await asyncio.to_thread(_write_file, target, batch)
+        elif kind == "otlp":
+            import httpx
+            async with httpx.AsyncClient(timeout=10) as client:
+                resp = await client.post(f"{target.rstrip('/')}/v1/traces", json=_otlp_payload(batch))
+                resp.raise_for_status()
+        else:
+            logger.warning(f"[Trace] Okänt TRACE_EXPORT-format: {TRACE_EXPORT}")
+            return
+        trace_stats["exported_spans"] += len(batch)
+    except Exception as e:
+        trace_stats["export_errors"] += 1
+        logger.warning(f"[Trace] Export av {len(batch)} spans misslyckades: {e}")
+
+
+async def export_loop(interval_s: float = _EXPORT_INTERVAL_S):
+    """Background task started from lifespan — runs until cancelled."""
+    if not TRACE_EXPORT:
+        return
+    logger.info(f"[Trace] Exporterar spans till {TRACE_EXPORT} (var {interval_s:.0f}s)")
+    try:
+        while True:
+            await asyncio.sleep(interval_s)
+            await flush()
+    finally:
+        await flush()
@@ -0,0 +1,178 @@
+"""
+Price-move triggers — cheap live-quote watching between trading loop runs.
+
+After every full process_ticker run the ticker's price levels are stored
+("bands", see analysis.signal_boundary.price_levels): the edges of the
+MA50/MA200 bounce zones, the Bollinger touch level, ATR stop/take-profit
+and the ATR P&L levels of held positions.
+A background watcher polls live quotes every WATCH_INTERVAL_S seconds and
+runs the full analysis only for tickers whose price crossed one of these
+levels since the last check, or whose intraday volume spiked. Everything
+else is a handful of float comparisons per ticker.
+
+The quote source is pluggable: ProxyQuoteSource uses the Vercel proxy
+(concurrently, bypassing the 60 s price cache), StaticQuoteSource is a
+local stand-in fed by hand in tests or the simulator.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from analysis.signal_boundary import price_levels
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL_S = 20
+_QUOTE_CONCURRENCY = 5
+_VOLUME_SPIKE_RATIO = 1.5   # intradagsvolym vs 20-dagars snitt
+
+# ticker -> {"levels": {name: price}, "avg_volume": float, "last_price": float|None, "volume_spiked": bool}
+_bands: dict[str, dict] = {}
+
+trigger_stats = {
+    "checks": 0,
+    "quotes": 0,
+    "fired": 0,
+    "skipped": 0,      # upptagen ticker, cooldown eller inte längre bevakad
+    "last_check_at": None,
+}
+
+
+class ProxyQuoteSource:
+    """Live quotes through the Vercel proxy, fetched concurrently."""
+
+    async def quotes(self, tickers: list[str]) -> dict[str, dict]:
+        from data.yahoo_client import get_current_price
+        sem = asyncio.Semaphore(_QUOTE_CONCURRENCY)
+
+        async def one(ticker):
+            async with sem:
+                try:
+                    return ticker, await get_current_price(ticker, refresh=True)
+                except Exception as e:
+                    logger.debug(f"[Trigger] Kunde inte hämta kurs för {ticker}: {e}")
+                    return ticker, None
+
+        results = await asyncio.gather(*(one(t) for t in tickers))
+        return {t: q for t, q in results if q and q.get("price")}
+
+
+class StaticQuoteSource:
+    """Local stand-in: quotes are set by hand (tests, simulator)."""
+
+    def __init__(self, quotes: dict[str, dict] | None = None):
+        self._quotes = dict(quotes or {})
+
+    def set(self, ticker: str, price: float, volume: int = 0):
+        self._quotes[ticker] = {"price": price, "volume": volume}
+
+    async def quotes(self, tickers: list[str]) -> dict[str, dict]:
+        return {t: self._quotes[t] for t in tickers if t in self._quotes}
+
+
+_source = ProxyQuoteSource()
+
+
+def set_source(source):
+    """Replace the quote source (e.g. StaticQuoteSource in tests)."""
+    global _source
+    _source = source
+
+
+def update_bands(ticker: str, indicators: dict, price: float, position: dict | None = None, avg_volume: float = 0.0):
+    """Store fresh trigger levels for `ticker`. Called after each full analysis."""
+    prev = _bands.get(ticker, {})
+    _bands[ticker] = {
+        "levels": price_levels(indicators, position),
+        "avg_volume": avg_volume,
+        "last_price": price,
+        "volume_spiked": prev.get("volume_spiked", False) and prev.get("day") == _today(),
+        "day": _today(),
+    }
+
+
+def remove(ticker: str):
+    _bands.pop(ticker, None)
+
+
+def _today() -> str:
+    return datetime.now(ZoneInfo("Europe/Stockholm")).date().isoformat()
+
+
+def detect(ticker: str, price: float, volume: int | None = None) -> list[str]:
+    """Return the names of levels crossed since the last observed price (and 'volume_spike').
+
+    Updates the ticker's last observed price.
+    """
+    band = _bands.get(ticker)
+    if not band or not price:
+        return []
+    events = []
+    last = band["last_price"]
+    if last and last != price:
+        for name, level in band["levels"].items():
+            if (last - level) * (price - level) <= 0:
+                events.append(name)
+    band["last_price"] = price
+
+    if volume and band["avg_volume"] > 0 and not band["volume_spiked"]:
+        if volume / band["avg_volume"] >= _VOLUME_SPIKE_RATIO:
+            band["volume_spiked"] = True  # en gång per dag räcker
+            events.append("volume_spike")
+    return events
+
+
+def is_market_open() -> bool:
+    now_swe = datetime.now(ZoneInfo("Europe/Stockholm"))
+    minutes = now_swe.hour * 60 + now_swe.minute
+    return now_swe.weekday() < 5 and 9 * 60 <= minutes < 17 * 60 + 30
+
+
+async def check_once() -> dict[str, list[str]]:
+    """Poll quotes for all tracked tickers and run the full analysis for those that crossed a level."""
+    import leader
+    from scheduler import process_triggered
+
+    tickers = list(_bands)
+    if not tickers:
+        return {}
+    quotes = await _source.quotes(tickers)
+    trigger_stats["checks"] += 1
+    trigger_stats["quotes"] += len(quotes)
+    trigger_stats["last_check_at"] = datetime.now().isoformat()
+
+    import events as live
+    for ticker, quote in quotes.items():
+        live.publish("quote", {"ticker": ticker, "price": quote["price"], "change_pct": quote.get("change_pct")})
+
+    fired = {}
+    for ticker, quote in quotes.items():
+        events = detect(ticker, quote.get("price"), quote.get("volume"))
+        if not events:
+            continue
+        # Samma lease-mekanism som cron-jobben — max en trigger per ticker och minut i klustret
+        if not await leader.try_acquire(f"trigger:{ticker}", ttl_s=50):
+            continue
+        fired[ticker] = events
+        trigger_stats["fired"] += 1
+        logger.info(f"[Trigger] {ticker} @ {quote['price']:.2f} korsade {', '.join(events)} — kör full analys")
+        try:
+            if not await process_triggered(ticker):
+                trigger_stats["skipped"] += 1
+        except Exception as e:
+            logger.error(f"[Trigger] Analys av {ticker} misslyckades: {e}", exc_info=True)
+    return fired
+
+
+async def watch(interval_s: float = WATCH_INTERVAL_S):
+    """Background task started from lifespan — runs until cancelled."""
+    logger.info(f"[Trigger] Kursbevakning startad (var {interval_s:.0f}s)")
+    while True:
+        await asyncio.sleep(interval_s)
+        if not is_market_open():
+            continue
+        try:
+            await check_once()
+        except Exception as e:
+            logger.warning(f"[Trigger] Kontroll misslyckades: {e}")
@@ -1,82 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { YAHOO_SYMBOLS } from '@/lib/instruments'
 
-const YAHOO_SYMBOLS: Record<string, string> = {
-  'EVO':      'EVO.ST',
-  'SINCH':    'SINCH.ST',
-  'EMBRAC B': 'EMBRAC-B.ST',
-  'HTRO':     'HTRO.ST',
-  'SSAB B':   'SSAB-B.ST',
-  'ERIC B':   'ERIC-B.ST',
-  'VOLV B':   'VOLV-B.ST',
-  'INVE B':   'INVE-B.ST',
-  'SEB A':    'SEB-A.ST',
-  'SHB A':    'SHB-A.ST',
-  'SWED A':   'SWED-A.ST',
-  'AZN':      'AZN.ST',
-  'ATCO A':   'ATCO-A.ST',
-  'ABB':      'ABB.ST',
-  'ALFA':     'ALFA.ST',
-  'SAND':     'SAND.ST',
-  'SKF B':    'SKF-B.ST',
-  'HEXA B':   'HEXA-B.ST',
-  'NIBE B':   'NIBE-B.ST',
-  'BOL':      'BOL.ST',
-  'TELE2 B':  'TELE2-B.ST',
-  'TELIA':    'TELIA.ST',
-  'HM B':     'HM-B.ST',
-  'ASSA B':   'ASSA-B.ST',
-  'ESSITY B': 'ESSITY-B.ST',
-  'LUND B':   'LUND-B.ST',
-  'FABG':     'FABG.ST',
-  'BETS B':   'BETS-B.ST',
-  'CINT':     'CINT.ST',
-  'LATO B':   'LATO-B.ST',
-  'NOLA B':   'NOLA-B.ST',
-  'PEAB B':   'PEAB-B.ST',
-  'SWMA':     'SWMA.ST',
-  'TOBS B':   'TOBS-B.ST',
-  'XVIVO':    'XVIVO.ST',
-  'VOLV A':   'VOLV-A.ST',
-  'ATCO B':   'ATCO-B.ST',
-  'GETI B':   'GETI-B.ST',
-  'HUSQ B':   'HUSQ-B.ST',
-  'LIFCO B':  'LIFCO-B.ST',
-  'LOOMIS':   'LOOMIS.ST',
-  'NDA SE':   'NDA-SE.ST',
-  'SCA B':    'SCA-B.ST',
-  'SECU B':   'SECU-B.ST',
-  'SWEC B':   'SWEC-B.ST',
-  'TREL B':   'TREL-B.ST',
-  'EQT':      'EQT.ST',
-  'AXFO':     'AXFO.ST',
-  'AAK':      'AAK.ST',
-  'CAST':     'CAST.ST',
-  'ELUX B':   'ELUX-B.ST',
-  'INDU C':   'INDU-C.ST',
-  'KINV B':   'KINV-B.ST',
-  'ALIV SDB': 'ALIV-SDB.ST',
-  'EKTA B':   'EKTA-B.ST',
-  'THULE':    'THULE.ST',
-  'HUFV A':   'HUFV-A.ST',
-  'SAGAX B':  'SAGAX-B.ST',
-  'WALL B':   'WALL-B.ST',
-  'INDT':     'INDT.ST',
-  'JM':       'JM.ST',
-  'BURE':     'BURE.ST',
-  'DIOS':     'DIOS.ST',
-  'HMS':      'HMS.ST',
-  'KABE B':   'KABE-B.ST',
-  'NCAB':     'NCAB.ST',
-  'NOTE':     'NOTE.ST',
-  'NYFOSA':   'NYFOSA.ST',
-  'OEM B':    'OEM-B.ST',
-  'PNDX B':   'PNDX-B.ST',
-  'RATO B':   'RATO-B.ST',
-  'VBG B':    'VBG-B.ST',
-  'ADDT B':   'ADDT-B.ST',
-  'HOLMEN B': 'HOLM-B.ST',
-  'OMXS30':   '^OMX',
-}
+// Symboltabellen genereras från agentens instrumentregister (agent/instruments.py)
 
 // Smart fallback for tickers not in the explicit map:
 // "ARJO B" → "ARJO-B.ST", "CAMX" → "CAMX.ST"
@@ -3,17 +3,26 @@ import Link from "next/link";
 
 export const revalidate = 30;
 
-export default async function HistoryPage() {
+export default async function HistoryPage({
+  searchParams,
+}: {
+  searchParams: Promise<{ cursor?: string }>;
+}) {
+  const { cursor } = await searchParams;
   let trades: any[] = [];
+  let next: string | null = null;
+  let stats = { closed: 0, wins: 0, losses: 0, realized_pnl: 0 };
   try {
-    trades = await api.trades("closed");
+    // Statistiken räknas i agenten — listan hämtas en sida i taget
+    [{ items: trades, next }, stats] = await Promise.all([
+      api.trades("closed", 100, cursor),
+      api.tradeStats(),
+    ]);
   } catch {}
 
-  const totalPnlKr = trades.reduce((s, t) => s + (t.pnl_kr ?? 0), 0);
-  const winners = trades.filter((t) => (t.pnl_kr ?? 0) > 0);
-  const losers = trades.filter((t) => (t.pnl_kr ?? 0) <= 0);
+  const totalPnlKr = stats.realized_pnl;
   const winRate =
-    trades.length > 0 ? Math.round((winners.length / trades.length) * 100) : 0;
+    stats.closed > 0 ? Math.round((stats.wins / stats.closed) * 100) : 0;
 
   const closeReasonLabel: Record<string, string> = {
     stop_loss: "Stop-loss nådd",
@@ -39,7 +48,7 @@ export default async function HistoryPage() {
         </div>
         <div className="bg-gray-900 border border-gray-800 rounded-xl p-4 text-center">
           <p className="text-gray-500 text-xs mb-1">Affärer</p>
-          <p className="text-2xl font-bold">{trades.length}</p>
+          <p className="text-2xl font-bold">{stats.closed}</p>
         </div>
         <div className="bg-gray-900 border border-gray-800 rounded-xl p-4 text-center">
           <p className="text-gray-500 text-xs mb-1">Vinstprocent</p>
@@ -52,9 +61,9 @@ export default async function HistoryPage() {
         <div className="bg-gray-900 border border-gray-800 rounded-xl p-4 text-center">
           <p className="text-gray-500 text-xs mb-1">Vinst / Förlust</p>
           <p className="text-lg font-bold">
-            <span className="text-green-400">{winners.length}</span>
+            <span className="text-green-400">{stats.wins}</span>
             <span className="text-gray-600 mx-1">/</span>
-            <span className="text-red-400">{losers.length}</span>
+            <span className="text-red-400">{stats.losses}</span>
           </p>
         </div>
       </div>
@@ -255,6 +264,26 @@ export default async function HistoryPage() {
           );
         })}
       </div>
+
+      {(cursor || next) && (
+        <div className="flex justify-between text-sm">
+          {cursor ? (
+            <Link href="/dashboard/history" className="text-gray-400 hover:text-white transition">
+              ← Senaste
+            </Link>
+          ) : (
+            <span />
+          )}
+          {next && (
+            <Link
+              href={`/dashboard/history?cursor=${encodeURIComponent(next)}`}
+              className="text-gray-400 hover:text-white transition"
+            >
+              Äldre affärer →
+            </Link>
+          )}
+        </div>
+      )}
     </div>
   );
 }
@@ -1,5 +1,6 @@
 import Sidebar from "@/components/layout/Sidebar";
 import PaperTradingBanner from "@/components/layout/PaperTradingBanner";
+import LiveRefresh from "@/components/layout/LiveRefresh";
 
 export default function DashboardLayout({ children }: { children: React.ReactNode }) {
   return (
@@ -9,6 +10,7 @@ export default function DashboardLayout({ children }: { children: React.ReactNod
         {/* Spacer that pushes content below the fixed mobile top bar */}
         <div className="md:hidden h-[52px] shrink-0" />
         <PaperTradingBanner />
+        <LiveRefresh />
         <main className="flex-1 overflow-y-auto p-4 md:p-6">{children}</main>
       </div>
     </div>
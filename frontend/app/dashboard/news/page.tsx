@@ -1,4 +1,5 @@
 import { api } from "@/lib/api";
+import Link from "next/link";
 
 export const revalidate = 60;
 
@@ -14,10 +15,16 @@ const sentimentLabel: Record<string, string> = {
   NEUTRAL: "Neutral",
 };
 
-export default async function NewsPage() {
+export default async function NewsPage({
+  searchParams,
+}: {
+  searchParams: Promise<{ cursor?: string }>;
+}) {
+  const { cursor } = await searchParams;
   let news: any[] = [];
+  let next: string | null = null;
   try {
-    news = await api.news(undefined, 100);
+    ({ items: news, next } = await api.news(undefined, 100, cursor));
   } catch {}
 
   return (
@@ -67,6 +74,26 @@ export default async function NewsPage() {
           </div>
         ))}
       </div>
+
+      {(cursor || next) && (
+        <div className="flex justify-between text-sm">
+          {cursor ? (
+            <Link href="/dashboard/news" className="text-gray-400 hover:text-white transition">
+              ← Senaste
+            </Link>
+          ) : (
+            <span />
+          )}
+          {next && (
+            <Link
+              href={`/dashboard/news?cursor=${encodeURIComponent(next)}`}
+              className="text-gray-400 hover:text-white transition"
+            >
+              Äldre nyheter →
+            </Link>
+          )}
+        </div>
+      )}
     </div>
   );
 }
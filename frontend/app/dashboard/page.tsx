@@ -22,11 +22,11 @@ const notifColor: Record<string, string> = {
 };
 
 export default async function DashboardPage() {
-  const [signals, positions, trades, summary, portfolioNotifs] =
+  const [signals, positions, tradeStats, summary, portfolioNotifs] =
     await Promise.allSettled([
       api.signals(50),
       api.positions(),
-      api.trades("closed"),
+      api.tradeStats(),
       api.summary(),
       supabase
         .from("stock_notifications")
@@ -39,7 +39,7 @@ export default async function DashboardPage() {
 
   const signalData = signals.status === "fulfilled" ? signals.value : [];
   const positionsData = positions.status === "fulfilled" ? positions.value : {};
-  const tradesData = trades.status === "fulfilled" ? trades.value : [];
+  const statsData = tradeStats.status === "fulfilled" ? tradeStats.value : null;
   const summaryData = summary.status === "fulfilled" ? summary.value : null;
   const notifData =
     portfolioNotifs.status === "fulfilled" ? portfolioNotifs.value : [];
@@ -48,11 +48,8 @@ export default async function DashboardPage() {
     (s: any) => s.signal_type === "BUY" && s.status === "pending",
   );
   const openCount = Object.keys(positionsData).length;
-  const totalTrades = tradesData.length;
-  const totalPnlKr = tradesData.reduce(
-    (s: number, t: any) => s + (t.pnl_kr ?? 0),
-    0,
-  );
+  const totalTrades = statsData?.closed ?? 0;
+  const totalPnlKr = statsData?.realized_pnl ?? 0;
 
   // Invested value from open positions
   const invested = Object.values(positionsData as Record<string, any>).reduce(
@@ -82,11 +79,7 @@ export default async function DashboardPage() {
           value={`${totalPnlKr >= 0 ? "+" : ""}${totalPnlKr.toFixed(0)} kr`}
           sub={
             totalTrades > 0
-              ? `${Math.round(
-                  (tradesData.filter((t: any) => (t.pnl_kr ?? 0) > 0).length /
-                    totalTrades) *
-                    100,
-                )}% vinst`
+              ? `${Math.round(((statsData?.wins ?? 0) / totalTrades) * 100)}% vinst`
               : undefined
           }
         />
@@ -137,9 +130,9 @@ export default async function DashboardPage() {
                     {(s.price * s.quantity)?.toFixed(0)} kr &middot; Score{" "}
                     {s.score}p
                   </p>
-                  {s.indicators?.signal_description && (
+                  {s.signal_description && (
                     <p className="text-xs text-gray-400 mt-1 leading-relaxed">
-                      {s.indicators.signal_description}
+                      {s.signal_description}
                     </p>
                   )}
                 </div>
@@ -2,6 +2,7 @@
 
 import { useEffect, useState, useTransition } from "react";
 import AiStatsChart from "@/components/dashboard/AiStatsChart";
+import { useAgentEvents } from "@/lib/events";
 
 const API = process.env.NEXT_PUBLIC_AGENT_URL ?? "http://localhost:8000";
 
@@ -158,6 +159,34 @@ export default function SettingsPage() {
       .catch(() => {});
   }, []);
 
+  // Agenten pushar när discovery-scannen är klar — hämta då det sparade resultatet
+  useAgentEvents({
+    discovery: async (d) => {
+      if (!discoveryRunning) return;
+      try {
+        const latest = d.ok
+          ? await fetch(`${API}/api/discovery-scan/latest`, {
+              cache: "no-store",
+            }).then((r) => r.json())
+          : d;
+        setDiscoveryResult(
+          latest.ok
+            ? latest
+            : {
+                ok: false,
+                error: latest.error ?? "Scan klar men kunde inte hämta resultat.",
+              },
+        );
+      } catch {
+        setDiscoveryResult({
+          ok: false,
+          error: "Scan klar men kunde inte hämta resultat.",
+        });
+      }
+      setDiscoveryRunning(false);
+    },
+  });
+
   const handleSave = () => {
     setError("");
     setSaved(false);
@@ -274,41 +303,9 @@ export default function SettingsPage() {
                 setDiscoveryRunning(false);
                 return;
               }
-              // Poll for result every 10 seconds
-              const poll = setInterval(async () => {
-                try {
-                  const statusRes = await fetch(
-                    `${API}/api/discovery-scan/status`,
-                    { cache: "no-store" },
-                  );
-                  const status = await statusRes.json();
-                  if (!status.running) {
-                    clearInterval(poll);
-                    // Fetch the saved result
-                    const latestRes = await fetch(
-                      `${API}/api/discovery-scan/latest`,
-                      { cache: "no-store" },
-                    );
-                    const latest = await latestRes.json();
-                    if (latest.ok) {
-                      setDiscoveryResult(latest);
-                    } else {
-                      setDiscoveryResult({
-                        ok: false,
-                        error: "Scan klar men kunde inte hämta resultat.",
-                      });
-                    }
-                    setDiscoveryRunning(false);
-                  }
-                } catch {
-                  // Keep polling on network errors
-                }
-              }, 10000);
-              // Safety timeout after 8 minutes
-              setTimeout(() => {
-                clearInterval(poll);
-                setDiscoveryRunning(false);
-              }, 480000);
+              // Resultatet kommer som en "discovery"-händelse (useAgentEvents ovan).
+              // Säkerhetstimeout efter 8 minuter om händelsen aldrig kommer.
+              setTimeout(() => setDiscoveryRunning(false), 480000);
             } catch {
               setDiscoveryResult({
                 ok: false,
@@ -79,9 +79,9 @@ export default async function SignalsPage() {
               </div>
 
               {/* Description */}
-              {s.indicators?.signal_description && (
+              {s.signal_description && (
                 <p className="text-sm text-gray-300 leading-relaxed">
-                  {s.indicators.signal_description}
+                  {s.signal_description}
                 </p>
               )}
 
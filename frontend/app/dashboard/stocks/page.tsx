@@ -54,19 +54,10 @@ export default async function StocksPage() {
 
   // 2. Hämta senaste indikatorer, priser och signaler i parallell från Supabase
   // INGA anrop till Railway eller Yahoo Finance — datan skrivs av trading-loopen var 2:a minut
-  // Kör individuella queries per ticker med limit(1) för garanterat senaste per ticker
-  const [indicatorResults, priceResults, signalResults] = await Promise.all([
-    Promise.all(
-      tickers.map((t: string) =>
-        supabase
-          .from("stock_indicators")
-          .select("*")
-          .eq("ticker", t)
-          .order("timestamp", { ascending: false })
-          .limit(1)
-          .single(),
-      ),
-    ),
+  // Indikatorerna: en läsning av stock_indicators_latest (en rad per ticker).
+  // Priser och signaler: individuella queries per ticker med limit(1) för garanterat senaste
+  const [indicatorResult, priceResults, signalResults] = await Promise.all([
+    supabase.from("stock_indicators_latest").select("*").in("ticker", tickers),
     Promise.all(
       tickers.map((t: string) =>
         supabase
@@ -95,8 +86,20 @@ export default async function StocksPage() {
 
   // Bygg map: ticker -> senaste rad
   const indMap: Record<string, any> = {};
-  for (const { data } of indicatorResults) {
-    if (data) indMap[data.ticker] = data;
+  for (const row of indicatorResult.data ?? []) {
+    indMap[row.ticker] = row;
+  }
+  // stock_indicators_latest saknas eller är inte fylld än — en begränsad läsning av historiken
+  if (Object.keys(indMap).length === 0) {
+    const { data: history } = await supabase
+      .from("stock_indicators")
+      .select("*")
+      .in("ticker", tickers)
+      .order("timestamp", { ascending: false })
+      .limit(tickers.length * 20);
+    for (const row of history ?? []) {
+      if (!indMap[row.ticker]) indMap[row.ticker] = row;
+    }
   }
   const priceMap: Record<string, any> = {};
   for (const { data } of priceResults) {
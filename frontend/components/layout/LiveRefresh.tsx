@@ -0,0 +1,31 @@
+"use client";
+
+import { useRef } from "react";
+import { useRouter } from "next/navigation";
+import { useAgentEvents } from "@/lib/events";
+
+const DEBOUNCE_MS = 2_000;
+
+// Hämtar om server-sidorna (signaler, positioner, historik) när agenten
+// pushar en ändring — i stället för att de pollas. Flera händelser i
+// samma loop slås ihop till en refresh.
+export default function LiveRefresh() {
+  const router = useRouter();
+  const timer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  const refresh = () => {
+    if (timer.current) return;
+    timer.current = setTimeout(() => {
+      timer.current = null;
+      router.refresh();
+    }, DEBOUNCE_MS);
+  };
+
+  useAgentEvents({
+    signal: refresh,
+    signal_status: refresh,
+    positions: refresh,
+  });
+
+  return null;
+}
@@ -1,9 +1,9 @@
 "use client";
 
 import { useEffect, useState } from "react";
+import { useAgentEvents } from "@/lib/events";
 
 const API = process.env.NEXT_PUBLIC_AGENT_URL ?? "http://localhost:8000";
-const REFRESH_MS = 30_000;
 
 interface Summary {
   total_deposited: number;
@@ -44,10 +44,14 @@ export default function PaperTradingBanner() {
 
   useEffect(() => {
     load();
-    const id = setInterval(load, REFRESH_MS);
-    return () => clearInterval(id);
   }, []);
 
+  // Agenten pushar ny värdering efter varje loop, affär och insättning
+  useAgentEvents({
+    snapshot: (d) => d.summary && setS(d.summary),
+    summary: setS,
+  });
+
   const addDeposit = async () => {
     const amount = parseFloat(depositAmount);
     if (!amount || amount <= 0) return;
@@ -61,7 +65,6 @@ export default function PaperTradingBanner() {
       setShowDeposit(false);
       setDepositAmount("");
       setDepositNote("");
-      await load();
     } catch {}
     setSaving(false);
   };
@@ -9,6 +9,29 @@ async function get<T>(path: string, revalidate = 0): Promise<T> {
   return res.json();
 }
 
+// Listendpoints är sidade: nästa sidas cursor kommer i X-Next-Cursor
+async function getPage<T>(path: string): Promise<{ items: T[]; next: string | null }> {
+  const res = await fetch(`${API_BASE}${path}`, { cache: "no-store" });
+  if (!res.ok) throw new Error(`API error ${res.status}: ${path}`);
+  return { items: await res.json(), next: res.headers.get("X-Next-Cursor") };
+}
+
+function query(params: Record<string, string | number | undefined>): string {
+  const q = Object.entries(params)
+    .filter(([, v]) => v !== undefined && v !== "")
+    .map(([k, v]) => `${k}=${encodeURIComponent(String(v))}`)
+    .join("&");
+  return q ? `?${q}` : "";
+}
+
+// Kolumnerna som listvyerna visar — resten hämtas inte
+const SIGNAL_FIELDS =
+  "ticker,signal_type,price,quantity,confidence,score,reasons,status,stop_loss_price,take_profit_price,signal_description";
+const TRADE_FIELDS =
+  "ticker,entry_price,exit_price,quantity,pnl_kr,pnl_pct,close_reason,opened_at,closed_at";
+const NEWS_FIELDS =
+  "ticker,headline,url,source,sentiment,sentiment_score,gemini_reason,published_at";
+
 async function post<T>(path: string, body?: unknown): Promise<T> {
   const res = await fetch(`${API_BASE}${path}`, {
     method: "POST",
@@ -24,16 +47,18 @@ export const api = {
   watchlist:      () => get<any[]>("/api/watchlist"),
   positions:      () => get<Record<string, any>>("/api/positions"),
   signals:        (limit = 50, status?: string) =>
-    get<any[]>(`/api/signals?limit=${limit}${status ? `&status=${status}` : ""}`),
-  news:           (ticker?: string, limit = 50) =>
-    get<any[]>(`/api/news?limit=${limit}${ticker ? `&ticker=${ticker}` : ""}`),
+    get<any[]>(`/api/signals${query({ limit, status, fields: SIGNAL_FIELDS })}`),
+  news:           (ticker?: string, limit = 50, cursor?: string) =>
+    getPage<any>(`/api/news${query({ limit, ticker, cursor, fields: NEWS_FIELDS })}`),
   portfolio:      () => get<any[]>("/api/portfolio"),
   indicators:     (ticker: string) => get<any>(`/api/indicators/${ticker}`),
+  allIndicators:  () => get<any[]>("/api/indicators"),
   suggestions:    () => get<any[]>("/api/suggestions"),
   summary:        () => get<any>("/api/summary"),
   testTicker:     (ticker: string) => get<any>(`/api/test/${ticker}`, 60),
-  trades:         (status?: string) =>
-    get<any[]>(`/api/trades${status ? `?status=${status}` : ""}`),
+  trades:         (status?: string, limit = 100, cursor?: string) =>
+    getPage<any>(`/api/trades${query({ status, limit, cursor, fields: TRADE_FIELDS })}`),
+  tradeStats:     () => get<{ closed: number; wins: number; losses: number; realized_pnl: number }>("/api/trades/stats"),
   confirmSignal:  (id: string) => post<any>(`/api/signals/${id}/confirm`),
   rejectSignal:   (id: string) => post<any>(`/api/signals/${id}/reject`),
   closeTrade:     (id: string) => post<any>(`/api/trades/${id}/close`),
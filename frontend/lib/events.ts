@@ -0,0 +1,76 @@
+"use client";
+
+import { useEffect, useRef } from "react";
+
+// Live-händelser från agenten (GET /api/events, Server-Sent Events).
+// En EventSource per flik, delad av alla komponenter som lyssnar —
+// den stängs när sista lyssnaren försvinner. EventSource återansluter
+// själv och skickar Last-Event-ID, så agenten fyller i det som missats.
+
+const API = process.env.NEXT_PUBLIC_AGENT_URL ?? "http://localhost:8000";
+
+export type AgentEvent =
+  | "snapshot"
+  | "quote"
+  | "indicators"
+  | "signal"
+  | "signal_status"
+  | "summary"
+  | "positions"
+  | "discovery";
+
+type Handler = (data: any) => void;
+
+const EVENTS: AgentEvent[] = [
+  "snapshot", "quote", "indicators", "signal", "signal_status", "summary", "positions", "discovery",
+];
+
+let source: EventSource | null = null;
+const listeners = new Map<AgentEvent, Set<Handler>>();
+
+function dispatch(event: AgentEvent, e: MessageEvent) {
+  let data: any;
+  try {
+    data = JSON.parse(e.data);
+  } catch {
+    return;
+  }
+  listeners.get(event)?.forEach((fn) => fn(data));
+}
+
+function connect() {
+  if (source) return;
+  source = new EventSource(`${API}/api/events`);
+  for (const event of EVENTS) {
+    source.addEventListener(event, (e) => dispatch(event, e as MessageEvent));
+  }
+}
+
+function subscribe(event: AgentEvent, fn: Handler): () => void {
+  if (!listeners.has(event)) listeners.set(event, new Set());
+  listeners.get(event)!.add(fn);
+  connect();
+  return () => {
+    listeners.get(event)?.delete(fn);
+    const remaining = [...listeners.values()].reduce((n, s) => n + s.size, 0);
+    if (remaining === 0 && source) {
+      source.close();
+      source = null;
+    }
+  };
+}
+
+/** Call handlers[event](data) for each live event from the agent while mounted. */
+export function useAgentEvents(handlers: Partial<Record<AgentEvent, Handler>>) {
+  // Senaste handlers via ref — inline-funktioner ska inte öppna om anslutningen vid varje render
+  const ref = useRef(handlers);
+  ref.current = handlers;
+  const events = Object.keys(handlers).sort().join(",");
+
+  useEffect(() => {
+    const unsubscribers = (events ? events.split(",") : []).map((event) =>
+      subscribe(event as AgentEvent, (data) => ref.current[event as AgentEvent]?.(data)),
+    );
+    return () => unsubscribers.forEach((off) => off());
+  }, [events]);
+}